@@ -0,0 +1,237 @@
+import argparse
+import datetime as dt
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy
+
+from definitions import DQLTRADER_PERFECT_PREDICTOR
+from evaluating.portfolio_evaluator import PortfolioEvaluator
+from model.CompanyEnum import CompanyEnum
+from model.ITrader import ITrader
+from model.Portfolio import Portfolio
+from model.StockData import StockData
+from model.StockMarketData import StockMarketData
+from predicting.predictor.reference.perfect_predictor import PerfectPredictor
+from predicting.predictor.reference.random_predictor import RandomPredictor
+from trading.trader.reference.buy_and_hold_trader import BuyAndHoldTrader
+from trading.trader.reference.dql_trader import DqlTrader
+from trading.trader.reference.simple_trader import SimpleTrader
+
+"""
+This file comprises a benchmark of `PortfolioEvaluator`: It generates synthetic stock market data and measures how many
+ticks per second the evaluator manages with each reference trader, and how much memory it needs at peak.
+
+Run it with `python -m benchmarks.backtest_benchmark`, see `--help` for the options. The results are printed as JSON
+and can be stored with `--output`. Passing such a file as `--baseline` compares the new results to it and exits with 1
+if a trader got slower or needs more memory than the tolerance allows, so that regressions in the simulation loop are
+caught between commits. Only compare results created with the same configuration on the same machine
+"""
+
+# Creates the trader to benchmark out of the (synthetic) market data
+TraderFactory = Callable[[StockMarketData], ITrader]
+
+# The benchmarked traders. Structure: {trader name => TraderFactory}
+TRADER_FACTORIES = {
+    'buy_and_hold': lambda market_data: BuyAndHoldTrader(),
+    'simple_perfect': lambda market_data: SimpleTrader(
+        PerfectPredictor(CompanyEnum.COMPANY_A, market_data[CompanyEnum.COMPANY_A]),
+        PerfectPredictor(CompanyEnum.COMPANY_B, market_data[CompanyEnum.COMPANY_B])),
+    'simple_random': lambda market_data: SimpleTrader(RandomPredictor(), RandomPredictor()),
+    'dql_perfect': lambda market_data: DqlTrader(
+        PerfectPredictor(CompanyEnum.COMPANY_A, market_data[CompanyEnum.COMPANY_A]),
+        PerfectPredictor(CompanyEnum.COMPANY_B, market_data[CompanyEnum.COMPANY_B]),
+        True, False, DQLTRADER_PERFECT_PREDICTOR),
+}
+
+# Geometric Brownian motion parameters of the synthetic prices: yearly drift and volatility, starting price
+DRIFT = 0.05
+VOLATILITY = 0.2
+START_PRICE = 100.0
+TRADE_DAYS_PER_YEAR = 252
+
+DEFAULT_DAYS = 2000
+DEFAULT_PORTFOLIOS = 1
+DEFAULT_REPEAT = 3
+DEFAULT_SEED = 42
+
+# Allowed relative deterioration before a result counts as regression
+DEFAULT_TOLERANCE = 0.2
+
+
+def generate_market_data(days: int, seed: int = DEFAULT_SEED,
+                         start_date: dt.date = dt.date(2000, 1, 3)) -> StockMarketData:
+    """
+    Generates synthetic stock market data for all companies of `CompanyEnum`. The prices follow independent geometric
+    Brownian motions (see `DRIFT` and `VOLATILITY`) on consecutive business days
+
+    Args:
+        days: The number of trade days
+        seed: The seed of the random number generator, so that the same data is generated for the same arguments
+        start_date: The first trade day. Default: 2000-01-03
+
+    Returns:
+        The market data
+    """
+    assert days > 1
+    random_state = numpy.random.RandomState(seed)
+    dates = numpy.busday_offset(numpy.datetime64(start_date, 'D'), numpy.arange(days), roll='forward')
+
+    time_step = 1.0 / TRADE_DAYS_PER_YEAR
+    data = {}
+    for company in CompanyEnum:
+        log_returns = (DRIFT - VOLATILITY ** 2 / 2) * time_step \
+            + VOLATILITY * numpy.sqrt(time_step) * random_state.standard_normal(days - 1)
+        prices = START_PRICE * numpy.exp(numpy.concatenate([[0.0], numpy.cumsum(log_returns)]))
+        data[company] = StockData.from_arrays(dates, prices)
+    return StockMarketData(data)
+
+
+def __evaluate(trader_name: str, market_data: StockMarketData, portfolios: int, seed: int) -> float:
+    """
+    Evaluates `portfolios` portfolios, each traded by its own trader, over all rows of `market_data`
+
+    Returns:
+        The wall time of the evaluation in seconds
+    """
+    # `RandomPredictor` uses the module `random`
+    random.seed(seed)
+    mappings = [(Portfolio(10000.0, [], f"{trader_name} {index}"), TRADER_FACTORIES[trader_name](market_data), None)
+                for index in range(portfolios)]
+
+    start = time.perf_counter()
+    PortfolioEvaluator([]).inspect_over_time_with_mapping(market_data, mappings)
+    return time.perf_counter() - start
+
+
+def run_benchmark(trader_name: str, market_data: StockMarketData, portfolios: int = DEFAULT_PORTFOLIOS,
+                  repeat: int = DEFAULT_REPEAT, seed: int = DEFAULT_SEED) -> Dict:
+    """
+    Benchmarks `PortfolioEvaluator` with the given trader. The time is measured `repeat` times and the fastest run
+    counts. The peak memory is measured in an additional run with `tracemalloc`, as tracing slows everything down
+
+    Args:
+        trader_name: The trader to use, a key of `TRADER_FACTORIES`
+        market_data: The market data to evaluate on. All rows but the last are traded on
+        portfolios: The number of portfolios, each with its own trader. Default: `DEFAULT_PORTFOLIOS`
+        repeat: The number of timed runs. Default: `DEFAULT_REPEAT`
+        seed: The seed for the module `random`. Default: `DEFAULT_SEED`
+
+    Returns:
+        The result. Structure: `{'ticks': int, 'seconds': float, 'ticks_per_second': float,
+         'portfolio_ticks_per_second': float, 'peak_memory_bytes': int}`
+    """
+    if trader_name not in TRADER_FACTORIES:
+        raise ValueError(f"Unknown trader {trader_name}, choose one of {list(TRADER_FACTORIES)}")
+
+    seconds = min(__evaluate(trader_name, market_data, portfolios, seed) for _ in range(repeat))
+
+    tracemalloc.start()
+    try:
+        __evaluate(trader_name, market_data, portfolios, seed)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ticks = market_data.get_row_count() - 1
+    return {
+        'ticks': ticks,
+        'seconds': seconds,
+        'ticks_per_second': ticks / seconds,
+        'portfolio_ticks_per_second': ticks * portfolios / seconds,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def run_suite(trader_names: List[str] = None, days: int = DEFAULT_DAYS, portfolios: int = DEFAULT_PORTFOLIOS,
+              repeat: int = DEFAULT_REPEAT, seed: int = DEFAULT_SEED) -> Dict:
+    """
+    Benchmarks all given traders on the same synthetic market data (see `#run_benchmark`)
+
+    Args:
+        trader_names: The traders to benchmark. Default: All of `TRADER_FACTORIES`
+        days: The number of trade days to generate. Default: `DEFAULT_DAYS`
+        portfolios: The number of portfolios per trader. Default: `DEFAULT_PORTFOLIOS`
+        repeat: The number of timed runs per trader. Default: `DEFAULT_REPEAT`
+        seed: The seed of the synthetic data and the module `random`. Default: `DEFAULT_SEED`
+
+    Returns:
+        The configuration, the environment and the results of all traders. Structure: `{'config': {...},
+         'environment': {...}, 'results': {trader name => result of `#run_benchmark`}}`
+    """
+    trader_names = trader_names or list(TRADER_FACTORIES)
+    market_data = generate_market_data(days, seed)
+    return {
+        'config': {'traders': trader_names, 'days': days, 'companies': market_data.get_number_of_companies(),
+                   'portfolios': portfolios, 'repeat': repeat, 'seed': seed},
+        'environment': {'python': platform.python_version(), 'numpy': numpy.__version__,
+                        'machine': platform.machine()},
+        'results': {name: run_benchmark(name, market_data, portfolios, repeat, seed) for name in trader_names},
+    }
+
+
+def compare_to_baseline(suite_result: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Compares the results of `#run_suite` to earlier results of it. Traders only contained in one of them are ignored
+
+    Args:
+        suite_result: The new results
+        baseline: The earlier results
+        tolerance: The allowed relative deterioration of ticks per second and peak memory. Default: `DEFAULT_TOLERANCE`
+
+    Returns:
+        One message per regression, empty if there is none
+
+    Raises:
+        ValueError: If the results were created with different configurations
+    """
+    config = dict(suite_result['config'], traders=None)
+    baseline_config = dict(baseline['config'], traders=None)
+    if config != baseline_config:
+        raise ValueError(f"Configurations differ: {config} vs. {baseline_config}")
+
+    regressions = []
+    for name, result in suite_result['results'].items():
+        expected = baseline['results'].get(name)
+        if expected is None:
+            continue
+        if result['ticks_per_second'] < expected['ticks_per_second'] * (1.0 - tolerance):
+            regressions.append(f"{name}: {result['ticks_per_second']:.0f} ticks/s "
+                               f"instead of {expected['ticks_per_second']:.0f} ticks/s")
+        if result['peak_memory_bytes'] > expected['peak_memory_bytes'] * (1.0 + tolerance):
+            regressions.append(f"{name}: {result['peak_memory_bytes']} bytes peak memory "
+                               f"instead of {expected['peak_memory_bytes']} bytes")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmarks PortfolioEvaluator with the reference traders')
+    parser.add_argument('--traders', nargs='+', choices=list(TRADER_FACTORIES), help='Default: all traders')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS)
+    parser.add_argument('--portfolios', type=int, default=DEFAULT_PORTFOLIOS, help='Number of portfolios per trader')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', help='File to store the results in')
+    parser.add_argument('--baseline', help='File with earlier results to compare to')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    arguments = parser.parse_args()
+
+    suite_result = run_suite(arguments.traders, arguments.days, arguments.portfolios, arguments.repeat,
+                             arguments.seed)
+    print(json.dumps(suite_result, indent=2))
+
+    if arguments.output is not None:
+        with open(arguments.output, 'w') as output_file:
+            json.dump(suite_result, output_file, indent=2)
+
+    if arguments.baseline is not None:
+        with open(arguments.baseline) as baseline_file:
+            regressions = compare_to_baseline(suite_result, json.load(baseline_file), arguments.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,81 @@
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+from definitions import ROOT_DIR
+
+"""
+This file measures how long importing the entry modules of this project takes in a fresh interpreter, and checks that
+no heavy dependency (Keras, TensorFlow, matplotlib, h5py) is imported on the way. Those are imported on first use only,
+i.e. when a Keras network is created or loaded, or when something is drawn.
+
+Run it with `python -m benchmarks.startup_benchmark [budget in seconds]`. It prints its measurement as JSON and exits
+with 1 if the budget is exceeded or a heavy dependency has been imported. Travis CI runs it after the unit tests (see
+`.travis.yml`)
+"""
+
+# The modules imported by `stock_exchange.py` and the evaluation of traders
+STARTUP_MODULES = ['dependency_injection_containers', 'evaluating.portfolio_evaluator', 'utils']
+
+# Modules which must not be imported at startup
+HEAVY_MODULES = ['keras', 'tensorflow', 'matplotlib', 'h5py']
+
+# Maximal time in seconds importing `STARTUP_MODULES` may take
+STARTUP_TIME_BUDGET = 1.5
+
+# Imports the given modules and prints the time this took and the heavy modules imported on the way as JSON
+__MEASUREMENT_SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'heavy_modules': [module for module in {heavy_modules!r} if module in sys.modules]}}))
+"""
+
+
+def measure_startup(modules: List[str] = None, repeat: int = 3) -> Dict:
+    """
+    Imports the given modules in fresh interpreters and measures the time this takes. The interpreter's own startup
+    is not included
+
+    Args:
+        modules: The modules to import. Default: `STARTUP_MODULES`
+        repeat: The number of interpreters to measure. The fastest one counts, as the others are slowed down by noise
+
+    Returns:
+        The measurement. Structure: `{'seconds': float, 'heavy_modules': [names of imported HEAVY_MODULES]}`
+    """
+    script = __MEASUREMENT_SCRIPT.format(modules=modules or STARTUP_MODULES, heavy_modules=HEAVY_MODULES)
+    measurements = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], cwd=ROOT_DIR, stdout=subprocess.PIPE,
+                                check=True).stdout
+        measurements.append(json.loads(output.decode('utf8').splitlines()[-1]))
+
+    fastest = min(measurements, key=lambda measurement: measurement['seconds'])
+    heavy_modules = sorted({module for measurement in measurements for module in measurement['heavy_modules']})
+    return {'seconds': fastest['seconds'], 'heavy_modules': heavy_modules}
+
+
+def check_startup(budget: float = STARTUP_TIME_BUDGET) -> Dict:
+    """
+    Measures the startup (see `measure_startup`) and compares it to the given budget
+
+    Args:
+        budget: The maximal time in seconds. Default: `STARTUP_TIME_BUDGET`
+
+    Returns:
+        The measurement with the additional entries `budget` and `passed`
+    """
+    result = measure_startup()
+    result['budget'] = budget
+    result['passed'] = result['seconds'] <= budget and not result['heavy_modules']
+    return result
+
+
+if __name__ == "__main__":
+    result = check_startup(float(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_TIME_BUDGET)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result['passed'] else 1)
@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from benchmarks.backtest_benchmark import generate_market_data, run_benchmark, run_suite, compare_to_baseline
+from model.CompanyEnum import CompanyEnum
+
+
+class BacktestBenchmarkTest(unittest.TestCase):
+    def test_generate_market_data(self):
+        market_data = generate_market_data(100, seed=1)
+
+        self.assertEqual(market_data.get_number_of_companies(), len(CompanyEnum))
+        self.assertTrue(market_data.check_data_length())
+        self.assertEqual(market_data.get_row_count(), 100)
+        prices = market_data[CompanyEnum.COMPANY_A].get_values_array()
+        self.assertEqual(prices[0], 100.0)
+        self.assertTrue(np.all(prices > 0.0))
+        dates = market_data[CompanyEnum.COMPANY_A].get_dates_array()
+        self.assertTrue(np.all(np.is_busday(dates)))
+        np.testing.assert_array_equal(generate_market_data(100, seed=1)[CompanyEnum.COMPANY_A].get_values_array(),
+                                      prices)
+        self.assertFalse(np.array_equal(market_data[CompanyEnum.COMPANY_B].get_values_array(), prices))
+
+    def test_run_benchmark(self):
+        result = run_benchmark('simple_perfect', generate_market_data(50), portfolios=2, repeat=1)
+
+        self.assertEqual(result['ticks'], 49)
+        self.assertGreater(result['ticks_per_second'], 0.0)
+        self.assertEqual(result['portfolio_ticks_per_second'], 2 * result['ticks_per_second'])
+        self.assertGreater(result['peak_memory_bytes'], 0)
+        self.assertRaises(ValueError, run_benchmark, 'unknown', generate_market_data(50))
+
+    def test_compare_to_baseline(self):
+        baseline = run_suite(['buy_and_hold', 'simple_random'], days=50, repeat=1)
+        self.assertEqual(compare_to_baseline(baseline, baseline), [])
+
+        slower = {'config': baseline['config'], 'results': {
+            name: dict(result, ticks_per_second=result['ticks_per_second'] / 2)
+            for name, result in baseline['results'].items()}}
+        self.assertEqual(len(compare_to_baseline(slower, baseline)), 2)
+
+        other_config = dict(baseline, config=dict(baseline['config'], days=51))
+        self.assertRaises(ValueError, compare_to_baseline, other_config, baseline)
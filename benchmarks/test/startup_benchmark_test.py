@@ -0,0 +1,17 @@
+import unittest
+
+from benchmarks.startup_benchmark import measure_startup
+
+
+class StartupBenchmarkTest(unittest.TestCase):
+    def test_measure_startup__no_heavy_modules(self):
+        # The time budget is checked by running `python -m benchmarks.startup_benchmark` on Travis CI, as it depends on
+        # the machine
+        result = measure_startup(repeat=1)
+
+        self.assertEqual(result['heavy_modules'], [])
+
+    def test_measure_startup__detects_heavy_modules(self):
+        result = measure_startup(['json', 'numpy_sequential', 'h5py'], repeat=1)
+
+        self.assertEqual(result['heavy_modules'], ['h5py'])
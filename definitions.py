@@ -9,6 +9,7 @@ import os
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 DATASETS_DIR = os.path.join(ROOT_DIR, 'datasets')
+DATASETS_CACHE_DIR = os.path.join(ROOT_DIR, 'datasets_cache')  # Binary cache of the parsed datasets
 JSON_DIR = os.path.join(ROOT_DIR, 'json')
 
 # Fixed periods for training and test data
@@ -0,0 +1,161 @@
+import csv
+import datetime as dt
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy
+
+# A single measurement: (date of the tick, portfolio name or None for the tick itself, phase, seconds)
+Sample = Tuple[dt.date, str, str, float]
+
+# The phases of a tick of `PortfolioEvaluator`, in this order
+MARKET_DATA = 'market_data'  # `get_data_up_to_offset`, once per tick
+TOTAL_VALUE = 'total_value'  # `Portfolio#total_value`, once per tick and portfolio
+DO_TRADE = 'do_trade'  # `ITrader#doTrade`, once per tick and portfolio
+UPDATE = 'update'  # `Portfolio#update`, once per tick and portfolio
+RECORD = 'record'  # Recording the updated portfolio in its history, once per tick and portfolio
+PHASES = [MARKET_DATA, TOTAL_VALUE, DO_TRADE, UPDATE, RECORD]
+
+
+class EvaluationTimer:
+    """
+    Collects the wall times of the phases of each tick of `PortfolioEvaluator`, per tick and per portfolio (i.e. per
+    trader). Hand an object of this class to `PortfolioEvaluator` to find out where the time of a slow evaluation goes.
+
+    The evaluator calls `#start` before a phase and `#lap` after it. Each lap is stored as raw `Sample`, which can be
+    summarized (`#get_summary`, `#print_summary`) or exported (`#to_csv`)
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """
+        Constructor
+
+        Args:
+            clock: The function returning the current time in seconds. Default: `time.perf_counter`
+        """
+        self.clock = clock
+        # The recorded samples in the order of recording
+        self.samples = []
+        self.__last_time = None
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def start(self):
+        """
+        Starts the time measurement of the next phase
+        """
+        self.__last_time = self.clock()
+
+    def lap(self, date: dt.date, portfolio_name: str, phase: str):
+        """
+        Records the time passed since the last call of `#start` or `#lap` as the duration of `phase` and starts the
+        measurement of the next phase
+
+        Args:
+            date: The date of the current tick
+            portfolio_name: The name of the portfolio the phase belongs to, or None if it belongs to the whole tick
+            phase: The phase, one of `PHASES`
+        """
+        now = self.clock()
+        self.samples.append((date, portfolio_name, phase, now - self.__last_time))
+        self.__last_time = now
+
+    def extend(self, samples: List[Sample]):
+        """
+        Adds samples recorded by another timer, e.g. in a worker process
+
+        Args:
+            samples: The samples to add
+        """
+        self.samples.extend(samples)
+
+    def get_summary(self, by_portfolio: bool = False) -> Dict:
+        """
+        Summarizes the recorded samples per phase
+
+        Args:
+            by_portfolio: Whether to summarize per portfolio and phase instead of per phase only. Default: `False`
+
+        Returns:
+            The statistics of each phase, ordered like `PHASES`. Structure: `{phase => {'count': int, 'total': float,
+             'share': float, 'p50': float, 'p95': float, 'max': float}}`, with `(portfolio name, phase)` as keys if
+             `by_portfolio` is set. All times are in seconds, `share` is the fraction of the total time of all samples
+        """
+        durations_by_key = {}
+        for _, portfolio_name, phase, seconds in self.samples:
+            key = (portfolio_name, phase) if by_portfolio else phase
+            durations_by_key.setdefault(key, []).append(seconds)
+
+        total_time = sum(seconds for _, _, _, seconds in self.samples)
+        summary = {}
+        for key in sorted(durations_by_key, key=lambda key: self.__get_sort_key(key, by_portfolio)):
+            durations = numpy.array(durations_by_key[key])
+            p50, p95 = numpy.percentile(durations, [50, 95]).tolist()
+            summary[key] = {
+                'count': len(durations),
+                'total': durations.sum().item(),
+                'share': durations.sum().item() / total_time if total_time > 0 else 0.0,
+                'p50': p50,
+                'p95': p95,
+                'max': durations.max().item(),
+            }
+        return summary
+
+    @staticmethod
+    def __get_sort_key(key, by_portfolio: bool):
+        """
+        Orders summary keys by portfolio name first (tick-wide phases first) and by the position of the phase in
+        `PHASES` then
+        """
+        portfolio_name, phase = key if by_portfolio else (None, key)
+        phase_index = PHASES.index(phase) if phase in PHASES else len(PHASES)
+        return portfolio_name is not None, portfolio_name or '', phase_index, phase
+
+    def format_summary(self, by_portfolio: bool = False) -> str:
+        """
+        Formats the summary of `#get_summary` as table, with times in milliseconds
+
+        Args:
+            by_portfolio: Whether to list each portfolio separately. Default: `False`
+
+        Returns:
+            The table
+        """
+        rows = []
+        for key, statistics in self.get_summary(by_portfolio).items():
+            name = ' / '.join(part or '(tick)' for part in key) if by_portfolio else key
+            rows.append([name, str(statistics['count']), f"{statistics['total'] * 1000:.1f}",
+                         f"{statistics['share'] * 100:.1f}%", f"{statistics['p50'] * 1000:.4f}",
+                         f"{statistics['p95'] * 1000:.4f}", f"{statistics['max'] * 1000:.4f}"])
+
+        header = ['phase', 'count', 'total [ms]', 'share', 'p50 [ms]', 'p95 [ms]', 'max [ms]']
+        widths = [max(len(row[column]) for row in [header] + rows) for column in range(len(header))]
+        lines = ['  '.join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                           for column, (cell, width) in enumerate(zip(row, widths)))
+                 for row in [header] + rows]
+        return '\n'.join(lines)
+
+    def print_summary(self, by_portfolio: bool = False, file=None):
+        """
+        Prints the table of `#format_summary`
+
+        Args:
+            by_portfolio: Whether to list each portfolio separately. Default: `False`
+            file: The stream to print to. Default: None, which prints to `sys.stdout`
+        """
+        print(self.format_summary(by_portfolio), file=file)
+
+    def to_csv(self, path: str):
+        """
+        Writes all raw samples to a CSV file with the columns `date`, `portfolio`, `phase` and `seconds`. Tick-wide
+        phases have an empty `portfolio`
+
+        Args:
+            path: The path of the CSV file
+        """
+        with open(path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['date', 'portfolio', 'phase', 'seconds'])
+            for date, portfolio_name, phase, seconds in self.samples:
+                writer.writerow([date.isoformat(), portfolio_name or '', phase, repr(seconds)])
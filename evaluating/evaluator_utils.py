@@ -1,28 +1,33 @@
 import datetime as dt
-from typing import Dict, List, Tuple
-
-from matplotlib import pyplot as plt
+import multiprocessing
+from typing import Callable, Dict, List, Mapping, Tuple
 
 from model.ITrader import ITrader
 from model.Portfolio import Portfolio
 from model.StockMarketData import StockMarketData
 
-PortfoliosOverTime = Dict[str, Dict[dt.datetime.date, Portfolio]]
+PortfoliosOverTime = Dict[str, Mapping[dt.date, Portfolio]]
 PortfolioNameTraderMappingList = List[Tuple[str, ITrader]]
 
 """
 This file comprises some helpful functions to work with `Portfolios` and `StockMarketData`
 """
 
+# The function and items currently processed by `#map_in_forked_processes`. Forked worker processes inherit them
+__forked_payload = None
+
 
 def draw(portfolio_over_time: PortfoliosOverTime, prices: StockMarketData, colors):
     """
     Draws all given portfolios based on the given `prices`
 
     Args:
-        portfolio_over_time: The portfolios to draw. Structure: `Dict[str, Dict[dt.datetime.date, Portfolio]]`
+        portfolio_over_time: The portfolios to draw. Structure: `Dict[str, Mapping[dt.date, Portfolio]]`
         prices: The prices on which the portfolios' performances should be calculated
     """
+    # matplotlib is imported on first use only, as it takes long to import
+    from matplotlib import pyplot as plt
+
     plt.figure()
 
     for name, portfolio in portfolio_over_time.items():
@@ -36,21 +41,22 @@ def draw(portfolio_over_time: PortfoliosOverTime, prices: StockMarketData, color
 def get_data_up_to_offset(stock_market_data: StockMarketData, offset: int):
     """
     Removes all data items *behind* the given `offset` - this emulates going through history in a list of
-    date->price items
+    date->price items. No data is copied: the returned object consists of views on the arrays of `stock_market_data`,
+    so each call costs O(1) per company regardless of the number of data rows
 
     Args:
         stock_market_data: The `market_data` to step through
         offset: The offset to apply
 
     Returns:
-        A copied `StockMarketData` object which only reaches from start to `offset`
+        A `StockMarketData` object which only reaches from start to `offset`
     """
     if offset == 0:
         return stock_market_data
 
     offset_data = {}
     for company in stock_market_data.get_companies():
-        offset_data[company] = stock_market_data[company].copy_to_offset(offset)
+        offset_data[company] = stock_market_data[company].view_to_offset(offset)
 
     return StockMarketData(offset_data)
 
@@ -73,3 +79,56 @@ def initialize_portfolios(cash: float, portfolio_trader_mappings: PortfolioNameT
         portfolios.append((Portfolio(cash, [], name), trader, color))
 
     return portfolios
+
+
+def map_in_forked_processes(function: Callable, items: List, processes: int) -> List:
+    """
+    Applies `function` to all `items` in up to `processes` forked worker processes and returns the results in the
+    order of `items`.
+
+    Neither `function` nor `items` are pickled: the worker processes are forked and inherit them, so they may contain
+    anything (e.g. traders with networks run by `numpy_sequential`). Large read-only data like the arrays of
+    `StockMarketData` is shared between the processes by the operating system (copy-on-write) and not copied at all.
+    Only the results are pickled and sent back. Any state changed by `function` in a worker process is lost.
+    Keras/TensorFlow state created before forking is not fork-safe, so `function` must not use Keras models created in
+    this process.
+
+    Falls back to applying `function` in this process if `processes` is 1 or less, if there is at most one item, if the
+    platform cannot fork, or if this is a worker process itself
+
+    Args:
+        function: The function to apply. Takes one item
+        items: The items to apply `function` to
+        processes: The maximal number of worker processes
+
+    Returns:
+        The results of `function`, one for each item
+    """
+    global __forked_payload
+
+    items = list(items)
+    if processes <= 1 or len(items) <= 1 or 'fork' not in multiprocessing.get_all_start_methods() \
+            or multiprocessing.current_process().daemon:
+        return [function(item) for item in items]
+
+    __forked_payload = (function, items)
+    try:
+        with multiprocessing.get_context('fork').Pool(min(processes, len(items))) as pool:
+            return pool.map(__apply_forked_payload, range(len(items)), chunksize=1)
+    finally:
+        __forked_payload = None
+
+
+def __apply_forked_payload(index: int):
+    """
+    Applies the function of `__forked_payload` to its `index`th item. This runs in a worker process forked by
+    `#map_in_forked_processes`
+
+    Args:
+        index: The index of the item
+
+    Returns:
+        The function's result
+    """
+    function, items = __forked_payload
+    return function(items[index])
@@ -0,0 +1,416 @@
+import datetime as dt
+import multiprocessing
+import time
+import traceback
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy
+
+from logger import logger
+from model.CompanyEnum import CompanyEnum
+from model.ITrader import ITrader
+from model.Order import OrderList
+from model.Portfolio import Portfolio
+from model.StockData import StockData
+from model.StockMarketData import StockMarketData
+
+# The market data rows sent to a worker. Structure: {CompanyEnum => (dates, prices)}
+MarketDataDelta = Dict[CompanyEnum, Tuple[numpy.ndarray, numpy.ndarray]]
+
+# A trade day on which the trader didn't deliver orders: (date, kind of violation, seconds waited)
+Violation = Tuple[dt.date, str, float]
+
+"""
+This file comprises `IsolatedTrader`, which runs another trader in a worker process of its own, so that a slow or hung
+trader (e.g. one training a neural network in `doTrade`) cannot stall a whole evaluation
+"""
+
+# The kinds of violations
+DEADLINE = 'deadline'  # The trader didn't answer within the deadline
+ERROR = 'error'  # The trader raised an exception, or its worker process died
+
+DEFAULT_DEADLINE = 1.0
+
+# The number of trade days in a row a trader may miss before its worker process is replaced by a new one
+DEFAULT_MAX_MISSED_DAYS = 10
+
+
+class IsolatedTrader(ITrader):
+    """
+    Runs a trader in a persistent worker process and gives it a time budget per trade day.
+
+    On each call of `#doTrade` only the market data rows the worker doesn't know yet are sent to it over a pipe, along
+    with the portfolio. If the trader doesn't answer within `deadline` seconds, an empty `OrderList` is returned and a
+    `Violation` is recorded. At most one request is sent at a time: while the worker is still busy with a missed day,
+    the next day's deadline is spent waiting for it, and the day is missed as well if it doesn't become free in time.
+    The late answer is discarded. After `max_missed_days` missed days in a row the worker is considered hung, and it
+    is terminated and replaced by a new one.
+
+    The worker process is forked on the first call of `#doTrade`, so it inherits everything prepared before (e.g.
+    precomputed predictions). As the trader runs in the worker process, any state it changes (e.g. while learning) is
+    not reflected in this process, and is lost when the worker is replaced. Traders holding Keras/TensorFlow models
+    must be created in the worker by passing a function creating them instead of the trader, as TensorFlow's state is
+    not fork-safe. Call `#close` to stop the worker. If the platform cannot fork, the trader is called in this
+    process: a late answer is still discarded, but a hung trader isn't interrupted
+    """
+
+    def __init__(self, trader: Union[ITrader, Callable[[], ITrader]], deadline: float = DEFAULT_DEADLINE,
+                 name: str = None, clock: Callable[[], float] = time.perf_counter,
+                 max_missed_days: Optional[int] = DEFAULT_MAX_MISSED_DAYS):
+        """
+        Constructor
+
+        Args:
+            trader: The trader to run in the worker process, or a function without arguments creating it. The function
+             is called in each new worker process
+            deadline: The time in seconds the trader has per trade day. Default: `DEFAULT_DEADLINE`
+            name: The name to report the trader's latencies under. Default: None, which uses the trader's class name,
+             or the name of the function creating it
+            clock: The function returning the current time in seconds. Default: `time.perf_counter`
+            max_missed_days: The number of trade days in a row after which a worker which didn't answer is replaced.
+             None never replaces it. Default: `DEFAULT_MAX_MISSED_DAYS`
+        """
+        self.trader = trader if isinstance(trader, ITrader) else None
+        self.trader_factory = None if isinstance(trader, ITrader) else trader
+        self.deadline = deadline
+        self.name = name or (type(trader).__name__ if isinstance(trader, ITrader) else trader.__name__)
+        self.clock = clock
+        self.max_missed_days = max_missed_days
+
+        # The time the trader took to answer per trade day, for answered days only. Structure: [(date, seconds)]
+        self.latencies = []
+        # The trade days without orders from the trader
+        self.violations = []
+        # The number of worker processes replaced because they didn't answer
+        self.restarts = 0
+
+        self.__process = None
+        self.__connection = None
+        self.__request_id = 0
+        # The id of the request the worker is still busy with, or None if it is free
+        self.__unanswered_request_id = None
+        # The number of trade days in a row the worker didn't answer
+        self.__missed_days = 0
+
+        # The companies and the number of rows the worker knows, and the date of the last row
+        self.__sent_companies = set()
+        self.__sent_row_count = 0
+        self.__sent_last_date = None
+
+    def doTrade(self, portfolio: Portfolio, current_portfolio_value: float,
+                stock_market_data: StockMarketData) -> OrderList:
+        """
+        Asks the trader in the worker process for its orders and waits at most `deadline` seconds for them
+
+        Args:
+            portfolio: The current portfolio of this trader
+            current_portfolio_value: The current value of `portfolio`
+            stock_market_data: The stock market data for evaluation
+
+        Returns:
+            The trader's orders, or an empty `OrderList` if it didn't answer in time or failed
+        """
+        current_date = stock_market_data.get_most_recent_trade_day()
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            return self.__trade_in_process(current_date, portfolio, current_portfolio_value, stock_market_data)
+
+        if self.__process is None:
+            self.__start()
+
+        start = self.clock()
+        try:
+            # Sending while the worker is busy would pile up requests until the pipe is full and `send` blocks
+            if self.__unanswered_request_id is not None and self.__wait_for_answer(start) is None:
+                return self.__miss(current_date, start)
+
+            reset, delta = self.__get_delta(stock_market_data)
+            self.__request_id += 1
+            self.__connection.send((self.__request_id, reset, delta, portfolio, current_portfolio_value))
+            self.__unanswered_request_id = self.__request_id
+
+            answer = self.__wait_for_answer(start)
+        except (OSError, EOFError):
+            self.__stop(0.0)
+            return self.__violate(current_date, ERROR, self.clock() - start,
+                                  f"The worker process of {self.name} is gone")
+        if answer is None:
+            return self.__miss(current_date, start)
+
+        self.__missed_days = 0
+        seconds = self.clock() - start
+        orders, error = answer
+        if error is not None:
+            return self.__violate(current_date, ERROR, seconds, f"{self.name} failed on {current_date}: {error}")
+        self.latencies.append((current_date, seconds))
+        return orders
+
+    def __wait_for_answer(self, start: float) -> Optional[Tuple[OrderList, str]]:
+        """
+        Waits until `deadline` seconds after `start` for the answer to the request the worker is busy with
+
+        Returns:
+            The orders and the error of the answer, or None if it didn't arrive in time
+
+        Raises:
+            EOFError: If the worker process is gone
+        """
+        while True:
+            remaining = start + self.deadline - self.clock()
+            if remaining <= 0.0 or not self.__connection.poll(remaining):
+                return None
+            request_id, orders, error = self.__connection.recv()
+            if request_id == self.__unanswered_request_id:
+                self.__unanswered_request_id = None
+                return orders, error
+
+    def __miss(self, current_date: dt.date, start: float) -> OrderList:
+        """
+        Records a missed deadline, and replaces the worker process if it missed `max_missed_days` days in a row
+
+        Returns:
+            An empty `OrderList` to use instead of the trader's orders
+        """
+        orders = self.__violate(current_date, DEADLINE, self.clock() - start,
+                                f"{self.name} missed the deadline on {current_date}")
+        self.__missed_days += 1
+        if self.max_missed_days is not None and self.__missed_days >= self.max_missed_days:
+            logger.warning(f"{self.name} missed {self.__missed_days} days in a row, replacing its worker process")
+            # The next call of `#doTrade` starts a new worker
+            self.__stop(0.0)
+            self.restarts += 1
+        return orders
+
+    def __trade_in_process(self, current_date: dt.date, portfolio: Portfolio, current_portfolio_value: float,
+                           stock_market_data: StockMarketData) -> OrderList:
+        """
+        Calls the trader in this process. Used if the platform cannot fork
+        """
+        if self.trader is None:
+            self.trader = self.trader_factory()
+
+        start = self.clock()
+        try:
+            orders = self.trader.doTrade(portfolio, current_portfolio_value, stock_market_data)
+        except Exception:
+            return self.__violate(current_date, ERROR, self.clock() - start,
+                                  f"{self.name} failed on {current_date}: {traceback.format_exc()}")
+
+        seconds = self.clock() - start
+        if seconds > self.deadline:
+            return self.__violate(current_date, DEADLINE, seconds, f"{self.name} missed the deadline on {current_date}")
+        self.latencies.append((current_date, seconds))
+        return orders
+
+    def __violate(self, current_date: dt.date, kind: str, seconds: float, message: str) -> OrderList:
+        """
+        Records a violation
+
+        Returns:
+            An empty `OrderList` to use instead of the trader's orders
+        """
+        logger.warning(message)
+        self.violations.append((current_date, kind, seconds))
+        return OrderList()
+
+    def __start(self):
+        """
+        Forks the worker process
+        """
+        self.__connection, worker_connection = multiprocessing.Pipe()
+        # Daemonic, so that the worker process ends with this process
+        self.__process = multiprocessing.get_context('fork').Process(
+            target=self.__run_worker, args=(self.trader, self.trader_factory, worker_connection, self.__connection),
+            name=f"IsolatedTrader {self.name}", daemon=True)
+        self.__process.start()
+        worker_connection.close()
+        self.__sent_companies, self.__sent_row_count, self.__sent_last_date = set(), 0, None
+        self.__unanswered_request_id, self.__missed_days = None, 0
+
+    def __get_delta(self, stock_market_data: StockMarketData) -> Tuple[bool, MarketDataDelta]:
+        """
+        Determines the rows of `stock_market_data` the worker doesn't know yet
+
+        Returns:
+            Whether the worker has to drop the rows it knows (because `stock_market_data` doesn't continue them or has
+             other companies) and the rows to send
+        """
+        companies = set(stock_market_data.get_companies())
+        first_company = next(iter(stock_market_data.get_companies()))
+        dates = stock_market_data[first_company].get_dates_array()
+        row_count = len(dates)
+
+        reset = not (companies == self.__sent_companies and 0 < self.__sent_row_count <= row_count
+                     and dates[self.__sent_row_count - 1] == self.__sent_last_date)
+        first_row = 0 if reset else self.__sent_row_count
+
+        delta = {}
+        for company in stock_market_data.get_companies():
+            company_data = stock_market_data[company]
+            delta[company] = (company_data.get_dates_array()[first_row:row_count],
+                              company_data.get_values_array()[first_row:row_count])
+
+        self.__sent_companies = companies
+        self.__sent_row_count = row_count
+        self.__sent_last_date = dates[row_count - 1] if row_count > 0 else None
+        return reset, delta
+
+    def close(self):
+        """
+        Stops the worker process. A worker which doesn't stop within a second is terminated. The next call of
+        `#doTrade` starts a new one
+        """
+        self.__stop(1.0)
+
+    def __stop(self, timeout: float):
+        """
+        Asks the worker process to stop, and terminates it if it doesn't stop within `timeout` seconds
+        """
+        if self.__process is None:
+            return
+
+        try:
+            self.__connection.send(None)
+        except OSError:
+            pass
+        self.__process.join(timeout)
+        if self.__process.is_alive():
+            self.__process.terminate()
+            self.__process.join()
+        self.__connection.close()
+        self.__process, self.__connection = None, None
+
+    @staticmethod
+    def __run_worker(trader: Optional[ITrader], trader_factory: Optional[Callable[[], ITrader]], connection,
+                     parent_connection):
+        """
+        The main loop of a worker process: Receives requests, rebuilds the market data out of the received rows and
+        answers with the trader's orders. Ends when receiving None or when the other end of `connection` is closed
+
+        Args:
+            trader: The trader to ask for orders, or None to create it with `trader_factory`
+            trader_factory: The function creating the trader in this process, or None
+            connection: The worker's end of the pipe
+            parent_connection: The other end of the pipe, inherited by forking. It is closed, so that `connection`
+             reports the end of the parent process
+        """
+        parent_connection.close()
+        buffers = MarketDataBuffer()
+        while True:
+            try:
+                request = connection.recv()
+            except EOFError:
+                return
+            if request is None:
+                return
+
+            request_id, reset, delta, portfolio, current_portfolio_value = request
+            buffers.add(reset, delta)
+            try:
+                if trader is None:
+                    trader = trader_factory()
+                orders, error = trader.doTrade(portfolio, current_portfolio_value, buffers.get_market_data()), None
+            except Exception:
+                orders, error = None, traceback.format_exc()
+
+            try:
+                connection.send((request_id, orders, error))
+            except OSError:
+                return
+
+    def get_latency_summary(self) -> Dict:
+        """
+        Summarizes the latencies of the answered trade days and the violations
+
+        Returns:
+            The summary. Structure: `{'days': int, 'answered': int, 'violations': int, 'deadline_violations': int,
+             'error_violations': int, 'mean': float, 'p50': float, 'p95': float, 'p99': float, 'max': float}`. The
+             latencies are in seconds and None if no day was answered
+        """
+        latencies = numpy.array([seconds for _, seconds in self.latencies], dtype='float64')
+        summary = {
+            'days': len(self.latencies) + len(self.violations),
+            'answered': len(self.latencies),
+            'violations': len(self.violations),
+            'deadline_violations': sum(1 for _, kind, _ in self.violations if kind == DEADLINE),
+            'error_violations': sum(1 for _, kind, _ in self.violations if kind == ERROR),
+        }
+        if len(latencies) == 0:
+            summary.update({'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None})
+        else:
+            p50, p95, p99 = numpy.percentile(latencies, [50, 95, 99]).tolist()
+            summary.update({'mean': latencies.mean().item(), 'p50': p50, 'p95': p95, 'p99': p99,
+                            'max': latencies.max().item()})
+        return summary
+
+
+def format_latency_summaries(traders: List[IsolatedTrader]) -> str:
+    """
+    Formats the latency summaries of the given traders as table, with times in milliseconds
+
+    Args:
+        traders: The traders to list
+
+    Returns:
+        The table
+    """
+    def format_milliseconds(seconds):
+        return '-' if seconds is None else f"{seconds * 1000:.2f}"
+
+    rows = []
+    for trader in traders:
+        summary = trader.get_latency_summary()
+        rows.append([trader.name, str(summary['days']), str(summary['deadline_violations']),
+                     str(summary['error_violations']), format_milliseconds(summary['p50']),
+                     format_milliseconds(summary['p95']), format_milliseconds(summary['p99']),
+                     format_milliseconds(summary['max'])])
+
+    header = ['trader', 'days', 'missed', 'failed', 'p50 [ms]', 'p95 [ms]', 'p99 [ms]', 'max [ms]']
+    widths = [max(len(row[column]) for row in [header] + rows) for column in range(len(header))]
+    lines = ['  '.join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                       for column, (cell, width) in enumerate(zip(row, widths)))
+             for row in [header] + rows]
+    return '\n'.join(lines)
+
+
+class MarketDataBuffer:
+    """
+    Collects the market data rows received by a worker process in growing arrays, so that appending a day costs O(1)
+    (amortized) instead of copying all rows
+    """
+
+    def __init__(self):
+        # Structure: {CompanyEnum => (dates, prices)}, both arrays with spare capacity
+        self.__buffers = {}
+        self.__row_count = 0
+
+    def add(self, reset: bool, delta: MarketDataDelta):
+        """
+        Appends the rows of `delta`, after dropping all rows if `reset` is set
+        """
+        if reset:
+            self.__buffers, self.__row_count = {}, 0
+
+        new_row_count = self.__row_count
+        for company, (dates, values) in delta.items():
+            new_row_count = self.__row_count + len(dates)
+            company_dates, company_values = self.__buffers.get(company, (None, None))
+            if company_dates is None or new_row_count > len(company_dates):
+                capacity = max(2 * new_row_count, 256)
+                grown_dates = numpy.empty(capacity, dtype='datetime64[D]')
+                grown_values = numpy.empty(capacity, dtype='float64')
+                if company_dates is not None:
+                    grown_dates[:self.__row_count] = company_dates[:self.__row_count]
+                    grown_values[:self.__row_count] = company_values[:self.__row_count]
+                company_dates, company_values = grown_dates, grown_values
+                self.__buffers[company] = (company_dates, company_values)
+            company_dates[self.__row_count:new_row_count] = dates
+            company_values[self.__row_count:new_row_count] = values
+        self.__row_count = new_row_count
+
+    def get_market_data(self) -> StockMarketData:
+        """
+        Returns the collected rows as `StockMarketData`. No data is copied
+        """
+        return StockMarketData({company: StockData.from_arrays(dates[:self.__row_count], values[:self.__row_count])
+                                for company, (dates, values) in self.__buffers.items()})
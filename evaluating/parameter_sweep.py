@@ -0,0 +1,296 @@
+import csv
+import datetime as dt
+import itertools
+import json
+import os
+import random
+import time
+import traceback
+from typing import Any, Callable, Dict, List
+
+from definitions import PERIOD_1, PERIOD_2
+from evaluating.evaluator_utils import map_in_forked_processes
+from evaluating.portfolio_evaluator import PortfolioEvaluator
+from logger import logger
+from model.CompanyEnum import CompanyEnum
+from model.Portfolio import Portfolio
+from predicting.predictor.reference.perfect_predictor import PerfectPredictor
+from predicting.predictor.reference.predictor_utils import create_model, get_data, LOSS_FUNCTION, OPTIMIZER, \
+    METRICS, INPUT_SIZE, FIRST_LAYER_SIZE, SECOND_LAYER_SIZE
+from trading.trader.reference.dql_trader import DqlTrader
+from utils import read_stock_market_data
+
+Configuration = Dict[str, Any]
+# Evaluates one configuration and returns its metrics. Structure: {metric name => value}
+EvaluationFunction = Callable[[Configuration], Dict[str, float]]
+
+"""
+This file comprises a runner for parameter sweeps: It evaluates many configurations (e.g. hyperparameters of
+`DqlTrader`) in worker processes and writes one row per configuration into a CSV file. A sweep which has been
+interrupted is resumed by running it again with the same results file: configurations already evaluated successfully
+are skipped, and failed ones are evaluated again.
+
+Search spaces are dicts {parameter name => candidate values}. `#grid_search` creates all combinations of them,
+`#random_search` draws a given number of configurations at random
+"""
+
+# The columns of the results file besides the parameters and metrics
+CONFIGURATION_COLUMN = 'configuration'
+SECONDS_COLUMN = 'seconds'
+ERROR_COLUMN = 'error'
+
+
+def grid_search(space: Dict[str, List]) -> List[Configuration]:
+    """
+    Creates all combinations of the candidate values in `space`
+
+    Args:
+        space: The candidate values of each parameter. Structure: {parameter name => list of values}
+
+    Returns:
+        The configurations, one per combination
+    """
+    names = list(space.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_search(space: Dict[str, Any], count: int, seed: int = 0) -> List[Configuration]:
+    """
+    Draws configurations at random from `space`. Duplicates are dropped, so fewer than `count` configurations are
+    returned if the space is small
+
+    Args:
+        space: The candidate values of each parameter. Structure: {parameter name => list of values, or a function
+         taking a `random.Random` and returning a value}, e.g. `lambda rng: 10 ** rng.uniform(-4, -2)`
+        count: The number of configurations to draw
+        seed: The seed of the random number generator, so that the same configurations are drawn again on resuming
+
+    Returns:
+        The configurations
+    """
+    rng = random.Random(seed)
+    configurations, keys = [], set()
+    for _ in range(count):
+        configuration = {name: values(rng) if callable(values) else rng.choice(values)
+                         for name, values in space.items()}
+        key = get_configuration_key(configuration)
+        if key not in keys:
+            keys.add(key)
+            configurations.append(configuration)
+    return configurations
+
+
+def get_configuration_key(configuration: Configuration) -> str:
+    """
+    Returns the identifier of a configuration in the results file
+
+    Args:
+        configuration: The configuration
+
+    Returns:
+        The configuration as JSON with sorted keys
+    """
+    return json.dumps(configuration, sort_keys=True)
+
+
+def run_sweep(evaluate: EvaluationFunction, configurations: List[Configuration], results_path: str,
+              metric_names: List[str], processes: int = 1, chunk_size: int = None) -> List[Dict[str, str]]:
+    """
+    Evaluates all configurations not yet evaluated successfully according to the results file and appends their
+    results to it. The results file only grows, so a configuration failed before keeps its old row besides the new one.
+
+    The configurations are evaluated in chunks by up to `processes` forked worker processes (see
+    `evaluator_utils#map_in_forked_processes`), and the results file is extended after each chunk. An interruption
+    therefore loses at most the current chunk. An exception raised by `evaluate` is recorded in the column `error`
+    instead of stopping the sweep
+
+    Args:
+        evaluate: The function evaluating one configuration. It runs in a worker process if `processes` is greater
+         than 1, so it may change global state without affecting the other configurations then
+        configurations: The configurations to evaluate
+        results_path: The CSV file to write the results to. If it exists, its configurations without error are skipped
+        metric_names: The names of the metrics returned by `evaluate`, used as columns
+        processes: The number of worker processes. Default: 1
+        chunk_size: The number of configurations evaluated between two writes of the results file. Default: None,
+         which uses twice the number of processes
+
+    Returns:
+        All rows of the results file except the rows of failed configurations which have been evaluated again
+
+    Raises:
+        ValueError: If the existing results file has other columns
+    """
+    parameter_names = sorted({name for configuration in configurations for name in configuration})
+    columns = [CONFIGURATION_COLUMN] + parameter_names + list(metric_names) + [SECONDS_COLUMN, ERROR_COLUMN]
+
+    rows = __read_results(results_path, columns)
+    done = {row[CONFIGURATION_COLUMN] for row in rows if not row[ERROR_COLUMN]}
+    pending = []
+    for configuration in configurations:
+        key = get_configuration_key(configuration)
+        if key not in done:
+            done.add(key)
+            pending.append(configuration)
+    # Rows of failed configurations are superseded by their evaluation succeeding later or being repeated now
+    rows = [row for row in rows if not row[ERROR_COLUMN] or row[CONFIGURATION_COLUMN] not in done]
+    logger.info(f"run_sweep: {len(pending)} of {len(configurations)} configurations to evaluate")
+
+    if not os.path.exists(results_path):
+        with open(results_path, 'w', newline='') as results_file:
+            csv.writer(results_file).writerow(columns)
+
+    chunk_size = chunk_size or 2 * max(processes, 1)
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        results = map_in_forked_processes(lambda configuration: __evaluate(evaluate, configuration), chunk, processes)
+
+        chunk_rows = [__to_row(configuration, parameter_names, metric_names, *result)
+                      for configuration, result in zip(chunk, results)]
+        with open(results_path, 'a', newline='') as results_file:
+            writer = csv.DictWriter(results_file, columns)
+            writer.writerows(chunk_rows)
+        rows.extend(chunk_rows)
+        logger.info(f"run_sweep: Evaluated {min(start + chunk_size, len(pending))} of {len(pending)} configurations")
+
+    return rows
+
+
+def __read_results(results_path: str, columns: List[str]) -> List[Dict[str, str]]:
+    """
+    Reads the rows of an existing results file
+
+    Returns:
+        The rows, or an empty list if the file doesn't exist
+
+    Raises:
+        ValueError: If the file has other columns than `columns`
+    """
+    if not os.path.exists(results_path):
+        return []
+
+    with open(results_path, newline='') as results_file:
+        reader = csv.DictReader(results_file)
+        if reader.fieldnames != columns:
+            raise ValueError(f"{results_path} has the columns {reader.fieldnames} instead of {columns}")
+        return list(reader)
+
+
+def __evaluate(evaluate: EvaluationFunction, configuration: Configuration):
+    """
+    Evaluates one configuration and measures the time this takes. This runs in a worker process
+
+    Returns:
+        The metrics (None on error), the wall time in seconds and the error (None on success)
+    """
+    start = time.perf_counter()
+    try:
+        return evaluate(configuration), time.perf_counter() - start, None
+    except Exception:
+        logger.error(f"run_sweep: Evaluation of {configuration} failed")
+        return None, time.perf_counter() - start, traceback.format_exc(limit=3).strip().splitlines()[-1]
+
+
+def __to_row(configuration: Configuration, parameter_names: List[str], metric_names: List[str], metrics: Dict,
+             seconds: float, error: str) -> Dict[str, str]:
+    """
+    Converts the result of one configuration into a row of the results file. Parameter values are stored as JSON
+    """
+    row = {CONFIGURATION_COLUMN: get_configuration_key(configuration), SECONDS_COLUMN: repr(seconds),
+           ERROR_COLUMN: error or ''}
+    for name in parameter_names:
+        row[name] = json.dumps(configuration[name]) if name in configuration else ''
+    for name in metric_names:
+        row[name] = repr(metrics[name]) if metrics is not None and name in metrics else ''
+    return row
+
+
+###############################################################################
+# Evaluation functions of the reference implementations
+###############################################################################
+
+DQL_TRADER_METRICS = ['final_value_training', 'final_value_test']
+
+
+def evaluate_dql_trader(configuration: Configuration) -> Dict[str, float]:
+    """
+    Trains a new `DqlTrader` with perfect predictors while trading from 2009 to 2011 and evaluates it from 2012 to
+    2015 (like `dql_trader.py` does per episode)
+
+    Args:
+        configuration: The keyword arguments of `DqlTrader`'s constructor (e.g. `hidden_size`, `epsilon_decay`,
+         `batch_size`, `stock_actions`) and optionally `episodes`, the number of training runs. Default: 1 episode
+
+    Returns:
+        The final portfolio values of the last training run and of the evaluation, see `DQL_TRADER_METRICS`
+
+    Raises:
+        ValueError: If `episodes` is less than 1
+    """
+    configuration = dict(configuration)
+    episodes = configuration.pop('episodes', 1)
+    if episodes < 1:
+        raise ValueError(f"At least one episode is needed, got {episodes}")
+    training_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_1])
+    test_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_1, PERIOD_2])
+
+    trader = DqlTrader(PerfectPredictor(CompanyEnum.COMPANY_A), PerfectPredictor(CompanyEnum.COMPANY_B), False, True,
+                       'parameter_sweep', **configuration)
+    evaluator = PortfolioEvaluator([trader])
+    for _ in range(episodes):
+        portfolio_over_time = evaluator.inspect_over_time(training_data, [Portfolio(10000.0, [], 'sweep')],
+                                                          date_offset=dt.date(2009, 1, 2))['sweep']
+    last_training_day = max(portfolio_over_time.keys())
+    final_value_training = portfolio_over_time[last_training_day].total_value(last_training_day, training_data)
+
+    trader.train_while_trading = False
+    portfolio_over_time = evaluator.inspect_over_time(test_data, [Portfolio(10000.0, [], 'sweep')],
+                                                      date_offset=dt.date(2012, 1, 3))['sweep']
+    last_test_day = max(portfolio_over_time.keys())
+    final_value_test = portfolio_over_time[last_test_day].total_value(last_test_day, test_data)
+
+    return {'final_value_training': final_value_training, 'final_value_test': final_value_test}
+
+
+NN_BINARY_PREDICTOR_METRICS = ['training_accuracy', 'test_accuracy']
+
+
+def evaluate_nn_binary_predictor(configuration: Configuration) -> Dict[str, float]:
+    """
+    Trains the network of the NN binary predictors for stock A on `PERIOD_1` and tests it on `PERIOD_2`
+
+    Args:
+        configuration: Optionally `input_size`, `first_layer_size`, `second_layer_size` (see
+         `predictor_utils#create_model`), `epochs` and `batch_size`. Defaults: the constants of `predictor_utils`,
+         10 epochs and a batch size of 128
+
+    Returns:
+        The accuracies on the training and the test data, see `NN_BINARY_PREDICTOR_METRICS`
+    """
+    input_size = configuration.get('input_size', INPUT_SIZE)
+    training_data = read_stock_market_data([CompanyEnum.COMPANY_A], [PERIOD_1])[CompanyEnum.COMPANY_A]
+    test_data = read_stock_market_data([CompanyEnum.COMPANY_A], [PERIOD_2])[CompanyEnum.COMPANY_A]
+    _, training_inputs, training_results = get_data(training_data.get_values_array(), input_size)
+    _, test_inputs, test_results = get_data(test_data.get_values_array(), input_size)
+
+    network = create_model(input_size, configuration.get('first_layer_size', FIRST_LAYER_SIZE),
+                           configuration.get('second_layer_size', SECOND_LAYER_SIZE))
+    network.compile(loss=LOSS_FUNCTION, optimizer=OPTIMIZER, metrics=METRICS)
+    batch_size = configuration.get('batch_size', 128)
+    network.fit(training_inputs, training_results, epochs=configuration.get('epochs', 10), batch_size=batch_size,
+                verbose=0)
+
+    training_accuracy = network.evaluate(training_inputs, training_results, batch_size=batch_size, verbose=0)[1]
+    test_accuracy = network.evaluate(test_inputs, test_results, batch_size=batch_size, verbose=0)[1]
+    return {'training_accuracy': float(training_accuracy), 'test_accuracy': float(test_accuracy)}
+
+
+if __name__ == "__main__":
+    # Sweep the hyperparameters of `DqlTrader`; run this again to resume an interrupted sweep
+    dql_trader_space = {
+        'hidden_size': [25, 50, 100],
+        'epsilon_decay': [0.99, 0.995, 0.999],
+        'batch_size': [32, 64, 128],
+        'learning_rate': [0.0001, 0.001, 0.01],
+    }
+    run_sweep(evaluate_dql_trader, grid_search(dql_trader_space), 'dql_trader_sweep.csv', DQL_TRADER_METRICS,
+              processes=os.cpu_count())
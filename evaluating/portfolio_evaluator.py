@@ -1,7 +1,12 @@
-from typing import List, Tuple
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict, Iterator, List, Tuple
 
 import datetime
-from evaluating.evaluator_utils import draw, get_data_up_to_offset
+from evaluating.evaluation_timer import EvaluationTimer, MARKET_DATA, TOTAL_VALUE, DO_TRADE, UPDATE, RECORD
+from evaluating.evaluator_utils import draw, get_data_up_to_offset, map_in_forked_processes, PortfoliosOverTime
+from evaluating.portfolio_history import PortfolioHistory
+from model.Order import OrderList
 from model.Portfolio import Portfolio
 from model.StockMarketData import StockMarketData
 from model.ITrader import ITrader
@@ -11,6 +16,14 @@ PortfolioList = List[Portfolio]
 TraderList = List[ITrader]
 PortfolioTraderMappingList = List[Tuple[Portfolio, ITrader]]
 
+# The state of all portfolios after one tick, as yielded by `PortfolioEvaluator#stream_over_time_with_mapping`.
+# Structure: `{'date': date, 'portfolios': {portfolio name => {'cash': float, 'holdings': {CompanyEnum => int},
+# 'total_value': float, 'orders': OrderList}}}`
+TickRecord = Dict
+
+# The outcome of one tick for one portfolio: (original portfolio, drawing color, updated portfolio, total value, orders)
+PortfolioStep = Tuple[Portfolio, str, Portfolio, float, OrderList]
+
 
 class PortfolioEvaluator:
     """
@@ -18,16 +31,27 @@ class PortfolioEvaluator:
     optionally demonstrates the results in a diagram
     """
 
-    def __init__(self, trader_list: TraderList, draw_results: bool = False):
+    def __init__(self, trader_list: TraderList, draw_results: bool = False, processes: int = 1,
+                 timer: EvaluationTimer = None):
         """
         Constructor
 
         Args:
             trader_list: The `ITrader` implementations to use for each portfolio respectively
             draw_results: If this is set to `True` a diagram is drawn. Default: `False`
+            processes: The number of processes to evaluate the portfolios in. If this is greater than 1 the portfolios
+             are distributed among forked worker processes (see `evaluator_utils#map_in_forked_processes`). Portfolios
+             sharing a name or a trader object are evaluated by the same process. As the traders then run in the worker
+             processes, any state they change (e.g. while learning) is not reflected in this process. Traders holding
+             Keras/TensorFlow models (e.g. DQL traders training while trading) must not be evaluated this way, as
+             TensorFlow's state is not fork-safe; networks run by `numpy_sequential` are fine. Default: 1
+            timer: If this is set, the wall time of each phase of each tick is recorded in it, per portfolio. Samples
+             recorded in worker processes are added to it, too. Default: None, which disables the time measurement
         """
         self.trader_list = trader_list
         self.draw_results = draw_results
+        self.processes = processes
+        self.timer = timer
 
     def inspect_over_time(self, market_data: StockMarketData, portfolios: PortfolioList, evaluation_offset: int = -1,
                           date_offset: datetime.date = None):
@@ -58,7 +82,7 @@ class PortfolioEvaluator:
     def inspect_over_time_with_mapping(self, market_data: StockMarketData,
                                        portfolio_trader_mapping: PortfolioTraderMappingList,
                                        evaluation_offset: int = -1,
-                                       date_offset: datetime.date = None):
+                                       date_offset: datetime.date = None) -> PortfoliosOverTime:
         """
         Behaves exactly as `#inspect_over_time *except* for the parameter `portfolio_trader_mapping`:
         While `#inspect_over_time` uses the traders provided to the constructor of this class, this method uses the
@@ -75,19 +99,244 @@ class PortfolioEvaluator:
         Returns:
 
         """
-        # Map that holds all portfolios in the course of time. Structure: {portfolio_name => {date => portfolio}}
-        all_portfolios = {}
+        if not market_data.check_data_length():
+            # Checks whether all data series are of the same length (i.e. have an equal count of date->price items)
+            return
 
-        # Cache that holds the latest object of each portfolio. Structure: {portfolio_name => portfolio}
-        portfolio_cache = {}
+        evaluation_offset = self.__get_evaluation_offset(market_data, evaluation_offset, date_offset)
+
+        if self.processes > 1:
+            # Portfolios with the same name share their state, and so do portfolios traded by the same trader object,
+            # so they have to be evaluated by the same process
+            groups = [[portfolio_trader_mapping[index] for index in indices]
+                      for indices in self.__group_mapping_indices(portfolio_trader_mapping)]
+
+            def inspect_in_worker(mappings: PortfolioTraderMappingList):
+                # Each worker records into a timer of its own, whose samples are sent back
+                timer = None if self.timer is None else EvaluationTimer(self.timer.clock)
+                process_portfolios, process_colors = self.__inspect_mapping_over_time(market_data, mappings,
+                                                                                      evaluation_offset, timer)
+                return process_portfolios, process_colors, None if timer is None else timer.samples
+
+            results = map_in_forked_processes(inspect_in_worker, groups, self.processes)
+
+            process_portfolios_by_name, colors = {}, {}
+            for process_portfolios, process_colors, samples in results:
+                process_portfolios_by_name.update(process_portfolios)
+                colors.update(process_colors)
+                if samples is not None:
+                    self.timer.extend(samples)
+
+            # Order the portfolios like a serial evaluation does
+            all_portfolios = {portfolio.name: process_portfolios_by_name[portfolio.name]
+                              for portfolio, _, _ in portfolio_trader_mapping}
+        else:
+            all_portfolios, colors = self.__inspect_mapping_over_time(market_data, portfolio_trader_mapping,
+                                                                      evaluation_offset, self.timer)
 
-        # Map that holds the drawing colors for each portfolio
-        colors = {}
+        # Draw a diagram of the portfolios' changes over time - if we're not unit testing
+        if self.draw_results:
+            draw(all_portfolios, market_data, colors)
+
+        return all_portfolios
 
+    @staticmethod
+    def __group_mapping_indices(portfolio_trader_mapping: PortfolioTraderMappingList) -> List[List[int]]:
+        """
+        Splits the mappings into groups which don't share any portfolio name or trader object. The mappings keep their
+        order within each group
+
+        Returns:
+            The indices of the mappings of each group, ordered by their first mapping
+        """
+        # Each mapping starts in a group of its own. Mappings sharing a name or trader are merged into the group of the
+        # first of them. Structure: [index of the group's first mapping]
+        group_indices = list(range(len(portfolio_trader_mapping)))
+
+        def find(index):
+            while group_indices[index] != index:
+                index = group_indices[index]
+            return index
+
+        first_index_by_key = {}
+        for index, (portfolio, trader, _) in enumerate(portfolio_trader_mapping):
+            for key in [('name', portfolio.name), ('trader', id(trader))]:
+                if key in first_index_by_key:
+                    first, own = find(first_index_by_key[key]), find(index)
+                    group_indices[max(first, own)] = min(first, own)
+                else:
+                    first_index_by_key[key] = index
+
+        groups = {}
+        for index in range(len(portfolio_trader_mapping)):
+            groups.setdefault(find(index), []).append(index)
+        return [groups[first] for first in sorted(groups)]
+
+    def stream_over_time(self, market_data: StockMarketData, portfolios: PortfolioList, evaluation_offset: int = -1,
+                         date_offset: datetime.date = None) -> Iterator[TickRecord]:
+        """
+        Behaves like `#stream_over_time_with_mapping`, but uses the traders provided to the constructor of this class
+        (like `#inspect_over_time` does)
+        """
+        portfolio_trader_mapping = list(zip(portfolios, self.trader_list, [None]*len(portfolios)))
+
+        return self.stream_over_time_with_mapping(market_data, portfolio_trader_mapping, evaluation_offset,
+                                                  date_offset)
+
+    def stream_over_time_with_mapping(self, market_data: StockMarketData,
+                                      portfolio_trader_mapping: PortfolioTraderMappingList,
+                                      evaluation_offset: int = -1,
+                                      date_offset: datetime.date = None) -> Iterator[TickRecord]:
+        """
+        Lets the clock tick like `#inspect_over_time_with_mapping`, but instead of collecting the portfolios' courses
+        and returning them at the end, a compact `TickRecord` is yielded after each tick. Nothing is kept from one tick
+        to the next, so the memory usage doesn't grow with the number of ticks. The ticks are computed on demand: if
+        the caller stops iterating (e.g. to stop early), no further trades are made.
+
+        The portfolios are always evaluated in this process, `self.processes` and `self.draw_results` are ignored
+
+        Args:
+            market_data: The stock market data with which to work
+            portfolio_trader_mapping: A mapping between portfolios and traders.
+             Structure: `List[Tuple[Portfolio, ITrader]]`
+            evaluation_offset: See `#inspect_over_time`
+            date_offset: See `#inspect_over_time`
+
+        Returns:
+            An iterator over the records of all ticks. The `total_value` of each portfolio is its value on the tick's
+             date. Nothing is yielded if the data series of `market_data` differ in length
+        """
         if not market_data.check_data_length():
-            # Checks whether all data series are of the same length (i.e. have an equal count of date->price items)
             return
 
+        evaluation_offset = self.__get_evaluation_offset(market_data, evaluation_offset, date_offset)
+
+        for current_date, steps in self.__tick_over_time(market_data, portfolio_trader_mapping, evaluation_offset,
+                                                         self.timer):
+            record = {'date': current_date, 'portfolios': {}}
+            for portfolio, _, updated_portfolio, total_value, orders in steps:
+                if self.timer is not None:
+                    self.timer.start()
+
+                record['portfolios'][portfolio.name] = {
+                    'cash': updated_portfolio.cash,
+                    'holdings': {share.company_enum: share.amount for share in updated_portfolio.shares},
+                    'total_value': total_value,
+                    'orders': orders,
+                }
+
+                if self.timer is not None:
+                    self.timer.lap(current_date, portfolio.name, RECORD)
+
+            yield record
+
+    async def inspect_over_time_async(self, market_data: StockMarketData, portfolios: PortfolioList,
+                                      evaluation_offset: int = -1, date_offset: datetime.date = None,
+                                      executor: Executor = None) -> PortfoliosOverTime:
+        """
+        Behaves like `#inspect_over_time_with_mapping_async`, but uses the traders provided to the constructor of this
+        class (like `#inspect_over_time` does)
+        """
+        portfolio_trader_mapping = list(zip(portfolios, self.trader_list, [None]*len(portfolios)))
+
+        return await self.inspect_over_time_with_mapping_async(market_data, portfolio_trader_mapping,
+                                                               evaluation_offset, date_offset, executor)
+
+    async def inspect_over_time_with_mapping_async(self, market_data: StockMarketData,
+                                                   portfolio_trader_mapping: PortfolioTraderMappingList,
+                                                   evaluation_offset: int = -1, date_offset: datetime.date = None,
+                                                   executor: Executor = None) -> PortfoliosOverTime:
+        """
+        Behaves like `#inspect_over_time_with_mapping`, but asks the traders for their orders concurrently on each tick
+        instead of one after another. This pays off for traders waiting for IO, e.g. for a remote service.
+
+        Traders whose `doTrade` is a coroutine function (`async def`) are awaited, all others are run in `executor`.
+        Portfolios sharing a name or a trader object are traded one after another in the order of
+        `portfolio_trader_mapping`, exactly like `#inspect_over_time_with_mapping` does, and only the others are traded
+        concurrently. So the results don't depend on which trader answers first.
+
+        The portfolios are always evaluated in this process, `self.processes` is ignored. The phase `DO_TRADE` recorded
+        by `self.timer` is the wall time from asking a trader until it answers. Run this with e.g.
+        `asyncio.get_event_loop().run_until_complete(...)`
+
+        Args:
+            market_data: The stock market data with which to work
+            portfolio_trader_mapping: A mapping between portfolios and traders.
+             Structure: `List[Tuple[Portfolio, ITrader]]`
+            evaluation_offset: See `#inspect_over_time`
+            date_offset: See `#inspect_over_time`
+            executor: The executor to run synchronous traders in. They have to be thread-safe if it is a thread pool.
+             Default: None, which uses the event loop's default executor (a thread pool)
+
+        Returns:
+            All portfolios' value courses, see `#inspect_over_time`
+        """
+        if not market_data.check_data_length():
+            return
+
+        evaluation_offset = self.__get_evaluation_offset(market_data, evaluation_offset, date_offset)
+        groups = self.__group_mapping_indices(portfolio_trader_mapping)
+
+        all_portfolios, colors = {}, {}
+        # Cache that holds the latest object of each portfolio. Structure: {portfolio_name => portfolio}
+        portfolio_cache = {}
+
+        for current_tick in range(-evaluation_offset, 0):
+            first_tick = current_tick == -evaluation_offset
+            current_market_data, current_date = self.__get_tick_market_data(market_data, current_tick, self.timer)
+
+            # Each group fills in the outcomes of its portfolios, so they keep the order of the mapping
+            steps = [None] * len(portfolio_trader_mapping)
+            await asyncio.gather(*(self.__trade_group_async(portfolio_trader_mapping, indices, steps, portfolio_cache,
+                                                            first_tick, current_date, current_market_data, executor,
+                                                            self.timer)
+                                   for indices in groups))
+
+            self.__record_steps(all_portfolios, colors, current_date, steps, first_tick, self.timer)
+
+        if self.draw_results:
+            draw(all_portfolios, market_data, colors)
+
+        return all_portfolios
+
+    @staticmethod
+    async def __trade_group_async(portfolio_trader_mapping: PortfolioTraderMappingList, indices: List[int],
+                                  steps: List[PortfolioStep], portfolio_cache: Dict[str, Portfolio], first_tick: bool,
+                                  current_date: datetime.date, current_market_data: StockMarketData,
+                                  executor: Executor, timer: EvaluationTimer):
+        """
+        Trades the portfolios of one group of `#__group_mapping_indices` one after another on one tick and stores
+        their outcomes in `steps` at the indices of their mappings
+        """
+        for index in indices:
+            portfolio, trader, color = portfolio_trader_mapping[index]
+            portfolio_to_update, total_value = PortfolioEvaluator.__get_total_value(
+                portfolio_cache, portfolio, first_tick, current_date, current_market_data, timer)
+
+            # Other groups run while this one waits, so the phase is measured on its own
+            start = None if timer is None else timer.clock()
+            if asyncio.iscoroutinefunction(trader.doTrade):
+                update = await trader.doTrade(portfolio_to_update, total_value, current_market_data)
+            else:
+                update = await asyncio.get_event_loop().run_in_executor(executor, trader.doTrade, portfolio_to_update,
+                                                                        total_value, current_market_data)
+            if timer is not None:
+                timer.extend([(current_date, portfolio.name, DO_TRADE, timer.clock() - start)])
+
+            steps[index] = PortfolioEvaluator.__update_portfolio(portfolio_cache, portfolio, color, portfolio_to_update,
+                                                                 total_value, update, current_date,
+                                                                 current_market_data, timer)
+
+    @staticmethod
+    def __get_evaluation_offset(market_data: StockMarketData, evaluation_offset: int,
+                                date_offset: datetime.date) -> int:
+        """
+        Calculates the number of data rows (from the end of `market_data`) to trade on out of the arguments of
+        `#inspect_over_time`
+
+        Raises:
+            ValueError: If `date_offset` is not contained in `market_data`
+        """
         if evaluation_offset == -1 and date_offset is None:
             # `evaluation_offset` has the 'disabled' value, so we calculate it based on the underlying data
             evaluation_offset = market_data.get_row_count()
@@ -96,56 +345,205 @@ class PortfolioEvaluator:
             # `date_offset` is set, so the `evaluation_offset` is calculated based on the given date
             first_company = next(iter(market_data.get_companies()))
             market_data_for_company = market_data[first_company]
-            index = market_data_for_company.get_dates().index(date_offset)
+            index = market_data_for_company.get_index_by_date(date_offset)
+            if index is None:
+                raise ValueError(f"{date_offset} is not contained in the given market data")
             evaluation_offset = market_data.get_row_count() - index
 
         # Reading should start one day later, because we also save the initial portfolio value in our return data.
         # Therefore the return data contains `evaluation_offset` rows which includes `evaluation_offset`-1 trades
-        evaluation_offset = evaluation_offset - 1
+        return evaluation_offset - 1
+
+    def __inspect_mapping_over_time(self, market_data: StockMarketData,
+                                    portfolio_trader_mapping: PortfolioTraderMappingList,
+                                    evaluation_offset: int,
+                                    timer: EvaluationTimer) -> Tuple[PortfoliosOverTime, Dict[str, str]]:
+        """
+        Lets the clock tick for the given portfolios and traders
+
+        Args:
+            market_data: The stock market data with which to work
+            portfolio_trader_mapping: A mapping between portfolios and traders.
+             Structure: `List[Tuple[Portfolio, ITrader]]`
+            evaluation_offset: How many data rows (from the end of `market_data`) should be traded on
+            timer: The timer to record the phases' wall times in, or None
+
+        Returns:
+            All portfolios' value courses and the drawing colors of all portfolios
+        """
+        # Map that holds all portfolios in the course of time. Structure: {portfolio_name => PortfolioHistory}. Each
+        # `PortfolioHistory` behaves like a dict {date => portfolio} but only records the changes from day to day
+        all_portfolios = {}
+
+        # Map that holds the drawing colors for each portfolio
+        colors = {}
+
+        first_tick = True
+        for current_date, steps in self.__tick_over_time(market_data, portfolio_trader_mapping, evaluation_offset,
+                                                         timer):
+            self.__record_steps(all_portfolios, colors, current_date, steps, first_tick, timer)
+            first_tick = False
+
+        return all_portfolios, colors
+
+    @staticmethod
+    def __record_steps(all_portfolios: PortfoliosOverTime, colors: Dict[str, str], current_date: datetime.date,
+                       steps: List[PortfolioStep], first_tick: bool, timer: EvaluationTimer):
+        """
+        Records the outcomes of one tick in the portfolios' histories
+
+        Args:
+            all_portfolios: The histories to record in. Structure: {portfolio_name => PortfolioHistory}
+            colors: The drawing colors to update. Structure: {portfolio_name => color}
+            current_date: The date of the tick
+            steps: The outcomes of all portfolios on `current_date`
+            first_tick: Whether this is the first tick, which creates the histories with the portfolios' initial states
+            timer: The timer to record the phases' wall times in, or None
+        """
+        for portfolio, color, updated_portfolio, _, _ in steps:
+            if timer is not None:
+                timer.start()
+
+            if first_tick:
+                # Save the starting state of this portfolio
+                yesterday = current_date - datetime.timedelta(days=1)
+                history = PortfolioHistory(portfolio.name)
+                history.record(yesterday, portfolio)
+                all_portfolios.update({portfolio.name: history})
+
+            # Record the updated portfolio in its history under the current date
+            all_portfolios[updated_portfolio.name].record(current_date, updated_portfolio)
+
+            if timer is not None:
+                timer.lap(current_date, portfolio.name, RECORD)
+
+            colors[portfolio.name] = color
+
+    @staticmethod
+    def __tick_over_time(market_data: StockMarketData, portfolio_trader_mapping: PortfolioTraderMappingList,
+                         evaluation_offset: int,
+                         timer: EvaluationTimer) -> Iterator[Tuple[datetime.date, List[PortfolioStep]]]:
+        """
+        Lets the clock tick for the given portfolios and traders and yields the outcome of each tick. This is the
+        common core of `#inspect_over_time_with_mapping` and `#stream_over_time_with_mapping`, which decide what to
+        keep of the outcomes
+
+        Args:
+            market_data: The stock market data with which to work
+            portfolio_trader_mapping: A mapping between portfolios and traders.
+             Structure: `List[Tuple[Portfolio, ITrader]]`
+            evaluation_offset: How many data rows (from the end of `market_data`) should be traded on
+            timer: The timer to record the phases' wall times in, or None. The phase `RECORD` is up to the caller
+
+        Returns:
+            An iterator over the date of each tick and the outcomes of all portfolios on it, in the order of
+             `portfolio_trader_mapping`
+        """
+        # Cache that holds the latest object of each portfolio. Structure: {portfolio_name => portfolio}
+        portfolio_cache = {}
 
         # And now the clock ticks
         # We start at -`evaluation_offset` and roll through the `market_data` in forward direction until the
         # second-to-last item
         for current_tick in range(-evaluation_offset, 0):
-
-            # Retrieve the stock market data up the current day, i.e. move one tick further in `market_data`
-            current_market_data = get_data_up_to_offset(market_data, current_tick)
-
-            # Retrieve the current date
-            current_date = current_market_data.get_most_recent_trade_day()
+            current_market_data, current_date = PortfolioEvaluator.__get_tick_market_data(market_data, current_tick,
+                                                                                          timer)
 
             portfolio_list = [p_t[0] for p_t in portfolio_trader_mapping]
             logger.debug(f"Start updating portfolios {portfolio_list} on {current_date} (tick {current_tick})")
 
+            steps = []
             for portfolio, trader, color in portfolio_trader_mapping:
-                if current_tick == -evaluation_offset:
-                    # Save the starting state of this portfolio
-                    yesterday = current_date - datetime.timedelta(days=1)
-                    all_portfolios.update({portfolio.name: {yesterday: portfolio}})
-                    portfolio_cache.update({portfolio.name: portfolio})
-
-                # Retrieve latest portfolio object from cache
-                portfolio_to_update = portfolio_cache[portfolio.name]
-
-                # Determine the total portfolio value at this time
-                current_total_portfolio_value = portfolio_to_update.total_value(current_date, current_market_data)
+                portfolio_to_update, current_total_portfolio_value = PortfolioEvaluator.__get_total_value(
+                    portfolio_cache, portfolio, current_tick == -evaluation_offset, current_date, current_market_data,
+                    timer)
 
                 # Ask the trader for its action
                 update = trader.doTrade(portfolio_to_update, current_total_portfolio_value, current_market_data)
 
-                # Update the portfolio that is saved at ILSE - The InnovationLab Stock Exchange ;-)
-                updated_portfolio = portfolio_to_update.update(current_market_data, update)
-
-                # Save the updated portfolio in our dict under the current date as key
-                all_portfolios[updated_portfolio.name][current_date] = updated_portfolio
-                portfolio_cache.update({portfolio.name: updated_portfolio})
+                if timer is not None:
+                    timer.lap(current_date, portfolio.name, DO_TRADE)
 
-                colors[portfolio.name] = color
+                steps.append(PortfolioEvaluator.__update_portfolio(portfolio_cache, portfolio, color,
+                                                                   portfolio_to_update, current_total_portfolio_value,
+                                                                   update, current_date, current_market_data, timer))
 
             logger.debug(f"End updating portfolios {portfolio_list} on {current_date} (tick {current_tick})\n")
 
-        # Draw a diagram of the portfolios' changes over time - if we're not unit testing
-        if self.draw_results:
-            draw(all_portfolios, market_data, colors)
+            yield current_date, steps
 
-        return all_portfolios
+    @staticmethod
+    def __get_tick_market_data(market_data: StockMarketData, current_tick: int,
+                               timer: EvaluationTimer) -> Tuple[StockMarketData, datetime.date]:
+        """
+        Retrieves the stock market data up to the given tick, i.e. moves one tick further in `market_data`
+
+        Returns:
+            The stock market data up to the tick and the tick's date
+        """
+        if timer is not None:
+            timer.start()
+
+        current_market_data = get_data_up_to_offset(market_data, current_tick)
+        current_date = current_market_data.get_most_recent_trade_day()
+
+        if timer is not None:
+            timer.lap(current_date, None, MARKET_DATA)
+
+        return current_market_data, current_date
+
+    @staticmethod
+    def __get_total_value(portfolio_cache: Dict[str, Portfolio], portfolio: Portfolio, first_tick: bool,
+                          current_date: datetime.date, current_market_data: StockMarketData,
+                          timer: EvaluationTimer) -> Tuple[Portfolio, float]:
+        """
+        Retrieves the latest state of `portfolio` before asking its trader, and determines its total value
+
+        Args:
+            portfolio_cache: The latest object of each portfolio. Structure: {portfolio_name => portfolio}
+            portfolio: The portfolio of the mapping being traded
+            first_tick: Whether this is the first tick, which starts with the given state of `portfolio`
+
+        Returns:
+            The portfolio to update and its total value on `current_date`
+        """
+        if first_tick:
+            # Start with the given state of this portfolio
+            portfolio_cache.update({portfolio.name: portfolio})
+
+        # Retrieve latest portfolio object from cache
+        portfolio_to_update = portfolio_cache[portfolio.name]
+
+        if timer is not None:
+            timer.start()
+
+        # Determine the total portfolio value at this time
+        total_value = portfolio_to_update.total_value(current_date, current_market_data)
+
+        if timer is not None:
+            timer.lap(current_date, portfolio.name, TOTAL_VALUE)
+
+        return portfolio_to_update, total_value
+
+    @staticmethod
+    def __update_portfolio(portfolio_cache: Dict[str, Portfolio], portfolio: Portfolio, color: str,
+                           portfolio_to_update: Portfolio, total_value: float, update: OrderList,
+                           current_date: datetime.date, current_market_data: StockMarketData,
+                           timer: EvaluationTimer) -> PortfolioStep:
+        """
+        Applies the orders of a trader to the portfolio returned by `#__get_total_value` and caches the result
+
+        Returns:
+            The outcome of the tick for `portfolio`
+        """
+        if timer is not None:
+            timer.start()
+
+        # Update the portfolio that is saved at ILSE - The InnovationLab Stock Exchange ;-)
+        updated_portfolio = portfolio_to_update.update(current_market_data, update)
+        portfolio_cache.update({portfolio.name: updated_portfolio})
+
+        if timer is not None:
+            timer.lap(current_date, portfolio.name, UPDATE)
+
+        return portfolio, color, updated_portfolio, total_value, update
@@ -0,0 +1,167 @@
+import datetime
+from collections.abc import Mapping
+from typing import Dict
+
+from model.CompanyEnum import CompanyEnum
+from model.Portfolio import Portfolio
+from model.SharesOfCompany import SharesOfCompany
+
+Holdings = Dict[CompanyEnum, int]
+
+
+class PortfolioHistory(Mapping):
+    """
+    Represents the course of one portfolio over time as a read-only mapping `date => Portfolio`.
+
+    Instead of keeping a `Portfolio` object per date only the cash level per date and the changes of the held shares
+    are recorded. `Portfolio` objects are built on demand when they are looked up. To keep lookups cheap the complete
+    holdings are saved additionally after every `CHECKPOINT_INTERVAL`th change
+    """
+    CHECKPOINT_INTERVAL = 64
+
+    def __init__(self, name: str):
+        """
+        Constructor
+
+        Args:
+            name: The name of the portfolio. This is used as name of all `Portfolio` objects built by this history
+        """
+        self.name = name
+
+        # The recorded dates and the cash level on each of them. Structure: {date => position}, [date], [cash]
+        self.__positions = {}
+        self.__dates = []
+        self.__cash = []
+
+        # The changes of the held shares: the position they were recorded at and the changed amounts. An amount of
+        # `None` means that the company isn't held anymore
+        self.__change_positions = []
+        self.__changes = []
+
+        # The complete holdings after every `CHECKPOINT_INTERVAL`th change. Structure: [(count of changes, holdings)]
+        self.__checkpoints = [(0, {})]
+
+        # The holdings after the last recorded change
+        self.__holdings = {}
+
+    def record(self, date: datetime.date, portfolio: Portfolio):
+        """
+        Records the state of `portfolio` on `date`. Recording a date which has already been recorded overwrites its
+        former state only if it is the latest recorded date
+
+        Args:
+            date: The date of the state
+            portfolio: The portfolio whose state to record
+        """
+        holdings = {share.company_enum: share.amount for share in portfolio.shares}
+
+        if date in self.__positions:
+            assert self.__dates[-1] == date, "Only the latest recorded date may be overwritten"
+            position = self.__positions[date]
+            self.__cash[position] = portfolio.cash
+        else:
+            position = len(self.__dates)
+            self.__positions[date] = position
+            self.__dates.append(date)
+            self.__cash.append(portfolio.cash)
+
+        change = {company: amount for company, amount in holdings.items() if self.__holdings.get(company) != amount}
+        change.update({company: None for company in self.__holdings if company not in holdings})
+        if len(change) == 0:
+            return
+
+        self.__change_positions.append(position)
+        self.__changes.append(change)
+        self.__holdings = holdings
+
+        if len(self.__changes) % self.CHECKPOINT_INTERVAL == 0:
+            self.__checkpoints.append((len(self.__changes), dict(holdings)))
+
+    def get_holdings(self, date: datetime.date) -> Holdings:
+        """
+        Rebuilds the held shares on the given `date`
+
+        Args:
+            date: The date to rebuild the held shares for
+
+        Returns:
+            A dict. Structure: {CompanyEnum => amount}
+
+        Raises:
+            KeyError: If `date` has not been recorded
+        """
+        position = self.__positions[date]
+
+        # Count of changes recorded up to (and including) `position`, found by binary search
+        low, high = 0, len(self.__change_positions)
+        while low < high:
+            middle = (low + high) // 2
+            if self.__change_positions[middle] <= position:
+                low = middle + 1
+            else:
+                high = middle
+        change_count = low
+
+        checkpoint_change_count, checkpoint_holdings = self.__checkpoints[change_count // self.CHECKPOINT_INTERVAL]
+        holdings = dict(checkpoint_holdings)
+        for change in self.__changes[checkpoint_change_count:change_count]:
+            for company, amount in change.items():
+                if amount is None:
+                    holdings.pop(company, None)
+                else:
+                    holdings[company] = amount
+
+        return holdings
+
+    def get_cash(self, date: datetime.date) -> float:
+        """
+        Returns the cash level on the given `date`
+
+        Args:
+            date: The date to return the cash level for
+
+        Returns:
+            The cash level
+
+        Raises:
+            KeyError: If `date` has not been recorded
+        """
+        return self.__cash[self.__positions[date]]
+
+    def __getitem__(self, date: datetime.date) -> Portfolio:
+        """
+        Builds the portfolio as it was on the given `date`
+
+        Args:
+            date: The date to build the portfolio for
+
+        Returns:
+            A new `Portfolio` object
+
+        Raises:
+            KeyError: If `date` has not been recorded
+        """
+        holdings = self.get_holdings(date)
+        return Portfolio(self.get_cash(date), [SharesOfCompany(company, amount) for company, amount in holdings.items()],
+                         self.name)
+
+    def __iter__(self):
+        """
+        Returns an iterator over all recorded dates in the order of recording
+
+        Returns:
+            The iterator
+        """
+        return iter(self.__dates)
+
+    def __len__(self) -> int:
+        """
+        Returns the count of recorded dates
+
+        Returns:
+            The count of recorded dates
+        """
+        return len(self.__dates)
+
+    def __repr__(self) -> str:
+        return f"<PortfolioHistory(name=\"{self.name}\", dates={len(self)}, changes={len(self.__changes)})>"
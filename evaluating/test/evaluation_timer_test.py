@@ -0,0 +1,95 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from definitions import PERIOD_3
+from evaluating.evaluation_timer import EvaluationTimer, PHASES, MARKET_DATA, DO_TRADE, UPDATE
+from evaluating.portfolio_evaluator import PortfolioEvaluator
+from model.CompanyEnum import CompanyEnum
+from model.Portfolio import Portfolio
+from predicting.predictor.reference.perfect_predictor import PerfectPredictor
+from trading.trader.reference.buy_and_hold_trader import BuyAndHoldTrader
+from trading.trader.reference.simple_trader import SimpleTrader
+from utils import read_stock_market_data
+
+
+class FakeClock:
+    """Clock advancing by the next of the given steps on each call"""
+
+    def __init__(self, steps):
+        self.steps = iter(steps)
+        self.time = 0.0
+
+    def __call__(self):
+        self.time += next(self.steps)
+        return self.time
+
+
+class EvaluationTimerTest(unittest.TestCase):
+    def setUp(self):
+        self.timer = EvaluationTimer(FakeClock([0.0, 1.0, 2.0, 0.0, 3.0, 4.0]))
+        for day in [date(2017, 1, 2), date(2017, 1, 3)]:
+            self.timer.start()
+            self.timer.lap(day, None, MARKET_DATA)
+            self.timer.lap(day, 'portfolio', DO_TRADE)
+
+    def test_lap(self):
+        self.assertEqual(self.timer.samples, [(date(2017, 1, 2), None, MARKET_DATA, 1.0),
+                                              (date(2017, 1, 2), 'portfolio', DO_TRADE, 2.0),
+                                              (date(2017, 1, 3), None, MARKET_DATA, 3.0),
+                                              (date(2017, 1, 3), 'portfolio', DO_TRADE, 4.0)])
+
+    def test_get_summary(self):
+        summary = self.timer.get_summary()
+
+        self.assertEqual(list(summary.keys()), [MARKET_DATA, DO_TRADE])
+        self.assertEqual(summary[MARKET_DATA]['count'], 2)
+        self.assertEqual(summary[MARKET_DATA]['total'], 4.0)
+        self.assertEqual(summary[MARKET_DATA]['share'], 0.4)
+        self.assertEqual(summary[DO_TRADE]['p50'], 3.0)
+        self.assertAlmostEqual(summary[DO_TRADE]['p95'], 3.9)
+        self.assertEqual(summary[DO_TRADE]['max'], 4.0)
+
+        by_portfolio = self.timer.get_summary(by_portfolio=True)
+        self.assertEqual(list(by_portfolio.keys()), [(None, MARKET_DATA), ('portfolio', DO_TRADE)])
+
+    def test_print_summary(self):
+        output = io.StringIO()
+        self.timer.print_summary(file=output)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('phase'))
+        self.assertEqual(lines[2].split(), [DO_TRADE, '2', '6000.0', '60.0%', '3000.0000', '3900.0000', '4000.0000'])
+
+    def test_to_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'samples.csv')
+            self.timer.to_csv(path)
+            with open(path, newline='') as csv_file:
+                rows = list(csv.reader(csv_file))
+
+        self.assertEqual(rows[0], ['date', 'portfolio', 'phase', 'seconds'])
+        self.assertEqual(rows[1], ['2017-01-02', '', MARKET_DATA, '1.0'])
+        self.assertEqual(rows[4], ['2017-01-03', 'portfolio', DO_TRADE, '4.0'])
+
+    def test_portfolio_evaluator(self):
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+        mappings = [(Portfolio(10000.0, [], 'simple'), SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A),
+                                                                    PerfectPredictor(CompanyEnum.COMPANY_B)), None),
+                    (Portfolio(10000.0, [], 'buy_and_hold'), BuyAndHoldTrader(), None)]
+
+        for processes in [1, 2]:
+            timer = EvaluationTimer()
+            evaluator = PortfolioEvaluator([], processes=processes, timer=timer)
+            evaluator.inspect_over_time_with_mapping(stock_market_data, mappings, 11)
+
+            summary = timer.get_summary(by_portfolio=True)
+            self.assertEqual(set(summary.keys()), {(None, MARKET_DATA)} |
+                             {(name, phase) for name in ['simple', 'buy_and_hold'] for phase in PHASES[1:]})
+            # 10 ticks, each recorded once per process for the market data
+            self.assertEqual(summary[('simple', UPDATE)]['count'], 10)
+            self.assertEqual(summary[(None, MARKET_DATA)]['count'], 10 * processes)
@@ -0,0 +1,167 @@
+import time
+import unittest
+from datetime import date
+
+import numpy
+
+from definitions import PERIOD_3
+from evaluating.isolated_trader import IsolatedTrader, format_latency_summaries, DEADLINE, ERROR
+from evaluating.portfolio_evaluator import PortfolioEvaluator
+from model.Order import OrderList
+from model.CompanyEnum import CompanyEnum
+from model.ITrader import ITrader
+from model.Portfolio import Portfolio
+from model.StockMarketData import StockMarketData
+from predicting.predictor.reference.perfect_predictor import PerfectPredictor
+from trading.trader.reference.simple_trader import SimpleTrader
+from utils import read_stock_market_data
+
+
+class SlowTrader(ITrader):
+    """Trader which answers like `trader`, but takes `delay` seconds on `slow_date` and fails on `failing_date`"""
+
+    def __init__(self, trader: ITrader, slow_date: date = None, delay: float = 0.0, failing_date: date = None):
+        self.trader = trader
+        self.slow_date = slow_date
+        self.delay = delay
+        self.failing_date = failing_date
+
+    def doTrade(self, portfolio, current_portfolio_value, stock_market_data):
+        current_date = stock_market_data.get_most_recent_trade_day()
+        if current_date == self.slow_date:
+            time.sleep(self.delay)
+        if current_date == self.failing_date:
+            raise ValueError(f"Failing on {current_date}")
+        return self.trader.doTrade(portfolio, current_portfolio_value, stock_market_data)
+
+
+class HungTrader(ITrader):
+    """Trader which never answers"""
+
+    def doTrade(self, portfolio, current_portfolio_value, stock_market_data):
+        time.sleep(3600)
+
+
+class MarketDataCheckingTrader(ITrader):
+    """Trader which fails unless all companies of the market data have the same dates, and doesn't order anything"""
+
+    def doTrade(self, portfolio, current_portfolio_value, stock_market_data):
+        dates = [stock_market_data[company].get_dates_array() for company in stock_market_data.get_companies()]
+        if not all(numpy.array_equal(company_dates, dates[0]) for company_dates in dates):
+            raise ValueError('The companies have different dates')
+        return OrderList()
+
+
+class IsolatedTraderTest(unittest.TestCase):
+    def setUp(self):
+        self.market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+        self.traders = []
+
+    def tearDown(self):
+        for trader in self.traders:
+            trader.close()
+
+    def create_trader(self):
+        return SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A), PerfectPredictor(CompanyEnum.COMPANY_B))
+
+    def create_isolated_trader(self, trader: ITrader, deadline: float = 5.0, max_missed_days: int = 10):
+        isolated_trader = IsolatedTrader(trader, deadline, 'isolated', max_missed_days=max_missed_days)
+        self.traders.append(isolated_trader)
+        return isolated_trader
+
+    def evaluate(self, trader: ITrader, evaluation_offset: int = 30):
+        return PortfolioEvaluator([trader]).inspect_over_time(self.market_data, [Portfolio(10000.0, [], 'test')],
+                                                              evaluation_offset)['test']
+
+    def test_do_trade(self):
+        expected = self.evaluate(self.create_trader())
+        isolated_trader = self.create_isolated_trader(self.create_trader())
+
+        self.assertEqual(self.evaluate(isolated_trader), expected)
+        self.assertEqual(len(isolated_trader.latencies), 29)
+        self.assertEqual(isolated_trader.violations, [])
+
+        # A second evaluation starts over with other market data, which the worker has to replace
+        self.assertEqual(self.evaluate(isolated_trader, 20), self.evaluate(self.create_trader(), 20))
+        self.assertEqual(isolated_trader.get_latency_summary()['answered'], 48)
+
+    def test_do_trade__deadline(self):
+        slow_date = date(2017, 10, 2)
+        isolated_trader = self.create_isolated_trader(SlowTrader(self.create_trader(), slow_date, 0.5), 0.2)
+
+        self.evaluate(isolated_trader)
+
+        # The days after the slow one are missed as well until the worker is done with it
+        violations = isolated_trader.violations
+        self.assertEqual(violations[0][:2], (slow_date, DEADLINE))
+        self.assertTrue(all(kind == DEADLINE for _, kind, _ in violations))
+        self.assertLessEqual(len(violations), 3)
+        # Then the worker catches up
+        latency_dates = [latency_date for latency_date, _ in isolated_trader.latencies]
+        self.assertEqual(len(latency_dates) + len(violations), 29)
+        self.assertNotIn(slow_date, latency_dates)
+        self.assertGreater(latency_dates[-1], violations[-1][0])
+
+        summary = isolated_trader.get_latency_summary()
+        self.assertEqual(summary['days'], 29)
+        self.assertEqual(summary['deadline_violations'], len(violations))
+        self.assertLess(summary['max'], 0.2)
+
+    def test_do_trade__hung(self):
+        for max_missed_days, restarts in [(None, 0), (10, 46)]:
+            isolated_trader = self.create_isolated_trader(HungTrader(), 0.001, max_missed_days)
+
+            # Only one request is sent at a time, so the pipe to the hung worker never fills up
+            self.evaluate(isolated_trader, -1)
+
+            self.assertEqual(len(isolated_trader.violations), 466)
+            self.assertTrue(all(kind == DEADLINE for _, kind, _ in isolated_trader.violations))
+            self.assertEqual(isolated_trader.restarts, restarts)
+
+    def test_do_trade__factory(self):
+        created_traders = []
+
+        def create_trader():
+            created_traders.append(self.create_trader())
+            return created_traders[-1]
+
+        isolated_trader = self.create_isolated_trader(create_trader)
+
+        self.assertEqual(self.evaluate(isolated_trader), self.evaluate(self.create_trader()))
+        # The trader has been created in the worker process only
+        self.assertEqual(created_traders, [])
+        self.assertEqual(IsolatedTrader(create_trader).name, 'create_trader')
+
+    def test_do_trade__other_companies(self):
+        isolated_trader = self.create_isolated_trader(MarketDataCheckingTrader())
+
+        # The worker gets all rows again when a company is added
+        all_companies = [CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B]
+        for companies, row_count in [([CompanyEnum.COMPANY_A], 10), (all_companies, 11)]:
+            market_data = StockMarketData({company: self.market_data[company].view_to_offset(row_count)
+                                           for company in companies})
+            isolated_trader.doTrade(Portfolio(10000.0, []), 10000.0, market_data)
+
+        self.assertEqual(isolated_trader.violations, [])
+        self.assertEqual(len(isolated_trader.latencies), 2)
+
+    def test_do_trade__error(self):
+        failing_date = date(2017, 10, 2)
+        isolated_trader = self.create_isolated_trader(SlowTrader(self.create_trader(), failing_date=failing_date))
+
+        self.evaluate(isolated_trader)
+
+        self.assertEqual([(violation_date, kind) for violation_date, kind, _ in isolated_trader.violations],
+                         [(failing_date, ERROR)])
+        self.assertEqual(len(isolated_trader.latencies), 28)
+
+    def test_format_latency_summaries(self):
+        isolated_trader = self.create_isolated_trader(self.create_trader())
+        unused_trader = self.create_isolated_trader(self.create_trader())
+        self.evaluate(isolated_trader, 5)
+
+        lines = format_latency_summaries([isolated_trader, unused_trader]).splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('trader'))
+        self.assertEqual(lines[2].split()[-4:], ['-', '-', '-', '-'])
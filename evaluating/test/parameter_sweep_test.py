@@ -0,0 +1,97 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from evaluating.parameter_sweep import grid_search, random_search, run_sweep, get_configuration_key, \
+    evaluate_dql_trader, CONFIGURATION_COLUMN, ERROR_COLUMN
+
+
+def evaluate_sum(configuration):
+    if configuration['a'] < 0:
+        raise ValueError('a must not be negative')
+    return {'sum': configuration['a'] + configuration['b'], 'pid': os.getpid()}
+
+
+class ParameterSweepTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.results_path = os.path.join(self.directory.name, 'results.csv')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_grid_search(self):
+        configurations = grid_search({'a': [1, 2], 'b': ['x', 'y', 'z']})
+
+        self.assertEqual(len(configurations), 6)
+        self.assertEqual(configurations[0], {'a': 1, 'b': 'x'})
+        self.assertEqual(configurations[-1], {'a': 2, 'b': 'z'})
+
+    def test_random_search(self):
+        space = {'a': [1, 2, 3], 'b': lambda rng: rng.uniform(0.0, 1.0)}
+        configurations = random_search(space, 10, seed=1)
+
+        self.assertEqual(len(configurations), 10)
+        self.assertTrue(all(configuration['a'] in [1, 2, 3] for configuration in configurations))
+        self.assertTrue(all(0.0 <= configuration['b'] <= 1.0 for configuration in configurations))
+        self.assertEqual(random_search(space, 10, seed=1), configurations)
+        # Duplicates are dropped
+        self.assertEqual(len(random_search({'a': [1, 2]}, 10)), 2)
+
+    def test_run_sweep(self):
+        configurations = grid_search({'a': [-1, 1, 2], 'b': [10, 20]})
+        rows = run_sweep(evaluate_sum, configurations, self.results_path, ['sum'])
+
+        self.assertEqual(len(rows), 6)
+        with open(self.results_path, newline='') as results_file:
+            written_rows = list(csv.DictReader(results_file))
+        self.assertEqual(written_rows, rows)
+
+        rows_by_key = {row[CONFIGURATION_COLUMN]: row for row in rows}
+        row = rows_by_key[get_configuration_key({'a': 2, 'b': 20})]
+        self.assertEqual((row['a'], row['b'], row['sum'], row[ERROR_COLUMN]), ('2', '20', '22', ''))
+        row = rows_by_key[get_configuration_key({'a': -1, 'b': 10})]
+        self.assertEqual(row['sum'], '')
+        self.assertEqual(row[ERROR_COLUMN], 'ValueError: a must not be negative')
+
+    def test_run_sweep__resume(self):
+        run_sweep(evaluate_sum, grid_search({'a': [1], 'b': [10, 20]}), self.results_path, ['sum'])
+
+        def fail_on_evaluated(configuration):
+            self.assertNotEqual(configuration['a'], 1)
+            return evaluate_sum(configuration)
+
+        rows = run_sweep(fail_on_evaluated, grid_search({'a': [1, 2], 'b': [10, 20]}), self.results_path, ['sum'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(sorted(row['sum'] for row in rows), ['11', '12', '21', '22'])
+
+        self.assertRaises(ValueError, run_sweep, evaluate_sum, [{'a': 1, 'c': 2}], self.results_path, ['sum'])
+
+    def test_run_sweep__resume_failed(self):
+        configurations = grid_search({'a': [-1, 1], 'b': [10]})
+        run_sweep(evaluate_sum, configurations, self.results_path, ['sum'])
+
+        def evaluate_abs_sum(configuration):
+            self.assertEqual(configuration['a'], -1)
+            return {'sum': abs(configuration['a']) + configuration['b']}
+
+        rows = run_sweep(evaluate_abs_sum, configurations, self.results_path, ['sum'])
+        self.assertEqual([(row['a'], row['sum'], row[ERROR_COLUMN]) for row in rows],
+                         [('1', '11', ''), ('-1', '11', '')])
+        with open(self.results_path, newline='') as results_file:
+            self.assertEqual(len(list(csv.DictReader(results_file))), 3)
+
+        # Evaluated successfully now, so nothing is evaluated again
+        rows = run_sweep(evaluate_sum, configurations, self.results_path, ['sum'])
+        self.assertEqual(len(rows), 2)
+
+    def test_evaluate_dql_trader__no_episodes(self):
+        self.assertRaises(ValueError, evaluate_dql_trader, {'episodes': 0})
+
+    def test_run_sweep__processes(self):
+        configurations = grid_search({'a': [1, 2, 3, 4], 'b': [0]})
+        rows = run_sweep(evaluate_sum, configurations, self.results_path, ['sum', 'pid'], processes=2, chunk_size=4)
+
+        self.assertEqual([row['sum'] for row in rows], ['1', '2', '3', '4'])
+        self.assertNotIn(str(os.getpid()), [row['pid'] for row in rows])
@@ -5,23 +5,50 @@ Module for testing of the evaluating component
 
 @author: Jonas Holtkamp
 """
+import asyncio
+import os
+import tempfile
+import time
 import unittest
 
+import numpy as np
+
 from datetime import date, datetime
 
 from definitions import PERIOD_1, PERIOD_2, PERIOD_3
+from evaluating.evaluator_utils import get_data_up_to_offset, map_in_forked_processes
 from model.StockData import StockData
 from predicting.predictor.reference.perfect_predictor import PerfectPredictor
-from utils import read_stock_market_data
+from utils import read_stock_market_data, read_stock_columns
 from evaluating.portfolio_evaluator import PortfolioEvaluator
 from model.CompanyEnum import CompanyEnum
 from model.Portfolio import Portfolio
 from model.StockMarketData import StockMarketData
+from model.ITrader import ITrader
 from model.Order import SharesOfCompany
 from predicting.predictor.reference.random_predictor import RandomPredictor
+from trading.trader.reference.buy_and_hold_trader import BuyAndHoldTrader
 from trading.trader.reference.simple_trader import SimpleTrader
 
 
+class DelayedTrader(ITrader):
+    """
+    Asynchronous trader which answers like `trader` after waiting for `delay` seconds. The times each call starts and
+    ends are recorded in `calls`
+    """
+
+    def __init__(self, trader: ITrader, delay: float):
+        self.trader = trader
+        self.delay = delay
+        self.calls = []
+
+    async def doTrade(self, portfolio, current_portfolio_value, stock_market_data):
+        start = time.perf_counter()
+        await asyncio.sleep(self.delay)
+        self.calls.append((start, time.perf_counter()))
+        return self.trader.doTrade(portfolio, current_portfolio_value, stock_market_data)
+
+
 class EvaluatorTest(unittest.TestCase):
     def test_different_mappings(self):
         """
@@ -132,8 +159,198 @@ class EvaluatorTest(unittest.TestCase):
         assert date(2017, 1, 2) in portfolio_over_time.keys()
         assert date(2017, 1, 3) not in portfolio_over_time.keys()
 
+    def test_inspect__processes(self):
+        """
+        Tests: Evaluator#inspect_over_time_with_mapping
+
+        Flavour: Evaluate the portfolios in several processes and compare the results to a serial evaluation
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+
+        def create_mappings():
+            return [(Portfolio(10000.0, [], name), SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A),
+                                                                 PerfectPredictor(CompanyEnum.COMPANY_B)), None)
+                    for name in ['first', 'second', 'third', 'first']]
+
+        serial_result = PortfolioEvaluator([]).inspect_over_time_with_mapping(stock_market_data, create_mappings(), 200)
+        parallel_result = PortfolioEvaluator([], processes=3).inspect_over_time_with_mapping(stock_market_data,
+                                                                                            create_mappings(), 200)
+
+        assert list(parallel_result.keys()) == ['first', 'second', 'third']
+        assert parallel_result == serial_result
+
+    def test_inspect__processes_shared_trader(self):
+        """
+        Tests: Evaluator#inspect_over_time_with_mapping
+
+        Flavour: One trader drives two differently named portfolios, so both have to be evaluated by the same process
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+
+        def create_mappings():
+            shared_trader = BuyAndHoldTrader()
+            return [(Portfolio(10000.0, [], 'first'), shared_trader, None),
+                    (Portfolio(10000.0, [], 'second'), BuyAndHoldTrader(), None),
+                    (Portfolio(10000.0, [], 'third'), shared_trader, None)]
+
+        serial_result = PortfolioEvaluator([]).inspect_over_time_with_mapping(stock_market_data, create_mappings(), 50)
+        parallel_result = PortfolioEvaluator([], processes=3).inspect_over_time_with_mapping(stock_market_data,
+                                                                                            create_mappings(), 50)
+
+        assert list(parallel_result.keys()) == ['first', 'second', 'third']
+        assert parallel_result == serial_result
+        # The shared trader only bought for the first portfolio
+        assert serial_result['third'][max(serial_result['third'].keys())].shares == ()
+
+    def test_stream_over_time(self):
+        """
+        Tests: Evaluator#stream_over_time_with_mapping
+
+        Compares the streamed records to the result of `#inspect_over_time_with_mapping`
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+
+        def create_mappings():
+            return [(Portfolio(10000.0, [], name), SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A),
+                                                                 PerfectPredictor(CompanyEnum.COMPANY_B)), None)
+                    for name in ['first', 'second']]
+
+        inspected = PortfolioEvaluator([]).inspect_over_time_with_mapping(stock_market_data, create_mappings(), 100)
+        records = list(PortfolioEvaluator([]).stream_over_time_with_mapping(stock_market_data, create_mappings(), 100))
+
+        assert len(records) == 99
+        for record in records:
+            current_date = record['date']
+            for name, state in record['portfolios'].items():
+                portfolio = inspected[name][current_date]
+                assert state['cash'] == portfolio.cash
+                assert state['holdings'] == {share.company_enum: share.amount for share in portfolio.shares}
+                assert np.isclose(state['total_value'], portfolio.total_value(current_date, stock_market_data))
+        assert any(not record['portfolios']['first']['orders'].is_empty() for record in records)
+
+    def test_inspect_async(self):
+        """
+        Tests: Evaluator#inspect_over_time_with_mapping_async
+
+        Compares asynchronous and synchronous traders answering in any order to a sequential evaluation
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+
+        def create_trader():
+            return SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A), PerfectPredictor(CompanyEnum.COMPANY_B))
+
+        names = ['first', 'second', 'third']
+        serial_result = PortfolioEvaluator([]).inspect_over_time_with_mapping(
+            stock_market_data, [(Portfolio(10000.0, [], name), create_trader(), None) for name in names], 20)
+
+        # The first trader answers last
+        traders = [DelayedTrader(create_trader(), 0.002), DelayedTrader(create_trader(), 0.0), create_trader()]
+        mappings = [(Portfolio(10000.0, [], name), trader, None) for name, trader in zip(names, traders)]
+        loop = asyncio.new_event_loop()
+        async_result = loop.run_until_complete(
+            PortfolioEvaluator([]).inspect_over_time_with_mapping_async(stock_market_data, mappings, 20))
+        loop.close()
+
+        assert list(async_result.keys()) == names
+        assert async_result == serial_result
+
+    def test_inspect_async__concurrent(self):
+        """
+        Tests: Evaluator#inspect_over_time_async
+
+        Flavour: Waiting traders of a tick wait at the same time
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+        traders = [DelayedTrader(SimpleTrader(RandomPredictor(), RandomPredictor()), 0.05) for _ in range(4)]
+        portfolios = [Portfolio(10000.0, [], str(index)) for index in range(4)]
+
+        loop = asyncio.new_event_loop()
+        result = loop.run_until_complete(
+            PortfolioEvaluator(traders).inspect_over_time_async(stock_market_data, portfolios, 5))
+        loop.close()
+
+        assert len(result) == 4
+        # On each of the 4 ticks all traders have been asked before the first one answered
+        assert all(len(trader.calls) == 4 for trader in traders)
+        for calls in zip(*(trader.calls for trader in traders)):
+            assert max(start for start, _ in calls) < min(end for _, end in calls)
+
+    def test_inspect_async__same_name(self):
+        """
+        Tests: Evaluator#inspect_over_time_with_mapping_async
+
+        Flavour: Portfolios sharing a name are traded one after another like in a sequential evaluation
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+
+        def create_mappings():
+            return [(Portfolio(10000.0, [], 'shared'), SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A),
+                                                                    PerfectPredictor(CompanyEnum.COMPANY_B)), None),
+                    (Portfolio(10000.0, [], 'other'), BuyAndHoldTrader(), None),
+                    (Portfolio(10000.0, [], 'shared'), SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A),
+                                                                    PerfectPredictor(CompanyEnum.COMPANY_B)), None)]
+
+        serial_result = PortfolioEvaluator([]).inspect_over_time_with_mapping(stock_market_data, create_mappings(), 20)
+
+        mappings = create_mappings()
+        shared_trader = mappings[0][1]
+        mappings[0] = (mappings[0][0], DelayedTrader(shared_trader, 0.002), None)
+        loop = asyncio.new_event_loop()
+        async_result = loop.run_until_complete(
+            PortfolioEvaluator([]).inspect_over_time_with_mapping_async(stock_market_data, mappings, 20))
+        loop.close()
+
+        assert async_result == serial_result
+
+    def test_stream_over_time__early_stop(self):
+        """
+        Tests: Evaluator#stream_over_time
+
+        Flavour: Stop iterating early, which stops trading
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+        trader = SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A), PerfectPredictor(CompanyEnum.COMPANY_B))
+        trade_days = []
+        do_trade = trader.doTrade
+        trader.doTrade = lambda portfolio, value, data: trade_days.append(data.get_most_recent_trade_day()) \
+            or do_trade(portfolio, value, data)
+
+        stream = PortfolioEvaluator([trader]).stream_over_time(stock_market_data, [Portfolio(10000.0, [])],
+                                                               date_offset=date(2017, 1, 3))
+        for record in stream:
+            if record['date'] == date(2017, 1, 5):
+                break
+
+        assert trade_days == [date(2017, 1, 3), date(2017, 1, 4), date(2017, 1, 5)]
+
 
 class UtilsTest(unittest.TestCase):
+    def test_get_data_up_to_offset(self):
+        """
+        Tests: evaluator_utils.py/get_data_up_to_offset
+
+        Checks that the returned data ends at the given offset and shares the underlying arrays instead of copying them
+        """
+        stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_3])
+        stock_data = stock_market_data[CompanyEnum.COMPANY_A]
+
+        offset_data = get_data_up_to_offset(stock_market_data, -10)
+
+        assert offset_data.get_row_count() == stock_market_data.get_row_count() - 10
+        assert offset_data.get_most_recent_trade_day() == stock_data.get(-11)[0]
+        assert offset_data[CompanyEnum.COMPANY_A].get_values() == stock_data.copy_to_offset(-10).get_values()
+        assert np.shares_memory(offset_data[CompanyEnum.COMPANY_A].get_values_array(), stock_data.get_values_array())
+
+    def test_map_in_forked_processes(self):
+        """
+        Tests: evaluator_utils.py/map_in_forked_processes
+
+        Checks that unpicklable functions work and that the results keep the order of the items
+        """
+        offset = 10
+        assert map_in_forked_processes(lambda item: item + offset, range(5), 2) == [10, 11, 12, 13, 14]
+        assert map_in_forked_processes(lambda item: item + offset, range(5), 1) == [10, 11, 12, 13, 14]
+
     def test_read_stock_market_data(self):
         """
         Tests: evaluator_utils.py/read_stock_market_data
@@ -147,6 +364,101 @@ class UtilsTest(unittest.TestCase):
         assert CompanyEnum.COMPANY_A in stock_market_data.get_companies()
         assert CompanyEnum.COMPANY_B in stock_market_data.get_companies()
 
+    def test_read_stock_market_data__cache(self):
+        """
+        Tests: utils.py/read_stock_market_data
+
+        Read the same data with and without the binary cache and check that both are equal
+        """
+        cached = read_stock_market_data([CompanyEnum.COMPANY_A], [PERIOD_1, PERIOD_2])
+        not_cached = read_stock_market_data([CompanyEnum.COMPANY_A], [PERIOD_1, PERIOD_2], use_cache=False)
+
+        assert list(cached[CompanyEnum.COMPANY_A]) == list(not_cached[CompanyEnum.COMPANY_A])
+
+    def test_read_stock_market_data__shared(self):
+        """
+        Tests: utils.py/read_stock_market_data
+
+        Read the same data twice and check that both results share their data, but not their `StockData` objects
+        """
+        stock_data_1 = read_stock_market_data([CompanyEnum.COMPANY_A], [PERIOD_1, PERIOD_2])[CompanyEnum.COMPANY_A]
+        stock_data_2 = read_stock_market_data([CompanyEnum.COMPANY_A], [PERIOD_1, PERIOD_2])[CompanyEnum.COMPANY_A]
+
+        assert stock_data_1 is not stock_data_2
+        assert np.shares_memory(stock_data_1.get_values_array(), stock_data_2.get_values_array())
+        assert not stock_data_1.get_values_array().flags.writeable
+
+        stock_data_1.append((date(2100, 1, 1), 1.0))
+        assert stock_data_2.get_row_count() == stock_data_1.get_row_count() - 1
+
+    def test_read_stock_columns__cache_invalidation(self):
+        """
+        Tests: utils.py/read_stock_columns
+
+        Read a CSV file twice, change it and check that the cache entry is replaced
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'stock.csv')
+            cache_directory = os.path.join(directory, 'cache')
+
+            with open(filepath, 'w') as file:
+                file.write("Date,Open,High,Low,Close,Adj Close,Volume\n2017-01-02,1.0,2.0,0.5,1.5,1.4,100\n")
+
+            columns = read_stock_columns(filepath, cache_directory)
+            assert os.path.exists(os.path.join(cache_directory, 'stock.csv.npz'))
+            assert columns['date'].tolist() == [date(2017, 1, 2)]
+            assert read_stock_columns(filepath, cache_directory)['adj_close'].tolist() == [1.4]
+
+            with open(filepath, 'a') as file:
+                file.write("2017-01-03,1.5,2.5,1.0,2.0,1.9,200\n")
+
+            columns = read_stock_columns(filepath, cache_directory)
+            assert columns['adj_close'].tolist() == [1.4, 1.9]
+            assert columns['volume'].tolist() == [100, 200]
+
+    def test_read_stock_columns__comments_and_blank_lines(self):
+        """
+        Tests: utils.py/read_stock_columns
+
+        Read a CSV file with comments and blank lines and check that only the data rows are parsed
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'stock.csv')
+            with open(filepath, 'w') as file:
+                file.write("Date,Open,High,Low,Close,Adj Close,Volume\n# comment\n"
+                           "2017-01-02,1.0,2.0,0.5,1.5,1.4,100\n\n2017-01-03,1.5,2.5,1.0,2.0,1.9,200\n")
+
+            columns = read_stock_columns(filepath, None)
+
+            assert columns['date'].dtype == np.dtype('datetime64[D]')
+            assert columns['date'].tolist() == [date(2017, 1, 2), date(2017, 1, 3)]
+            assert columns['open'].tolist() == [1.0, 1.5]
+            assert columns['close'].tolist() == [1.5, 2.0]
+
+    def test_read_stock_columns__malformed_rows(self):
+        """
+        Tests: utils.py/read_stock_columns
+
+        Read CSV files with a missing column, malformed dates and a malformed price and check that parsing fails
+        """
+        malformed_rows = ["2017-01-03,1.5,2.5,1.0,2.0,200\n",
+                          "2017-13-03,1.5,2.5,1.0,2.0,1.9,200\n",
+                          "2017-01-03,1.5,2.5,1.0,two,1.9,200\n",
+                          ",1.5,2.5,1.0,2.0,1.9,200\n",
+                          "NaT,1.5,2.5,1.0,2.0,1.9,200\n",
+                          "2017-01,1.5,2.5,1.0,2.0,1.9,200\n",
+                          "2017-01-03T12:00,1.5,2.5,1.0,2.0,1.9,200\n"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'stock.csv')
+            for malformed_row in malformed_rows:
+                with open(filepath, 'w') as file:
+                    file.write("Date,Open,High,Low,Close,Adj Close,Volume\n2017-01-02,1.0,2.0,0.5,1.5,1.4,100\n" +
+                               malformed_row)
+
+                with self.assertRaisesRegex(ValueError, 'stock.csv:3'):
+                    read_stock_columns(filepath, None)
+
     def test_read_stock_market_data__ignore_missing_file(self):
         """
         Tests: evaluator_utils.py/read_stock_market_data
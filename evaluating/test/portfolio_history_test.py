@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+from datetime import date, timedelta
+
+from evaluating.portfolio_history import PortfolioHistory
+from model.CompanyEnum import CompanyEnum
+from model.Portfolio import Portfolio
+from model.SharesOfCompany import SharesOfCompany
+
+
+class TestPortfolioHistory(TestCase):
+    def test_record_and_get(self):
+        history = PortfolioHistory('test')
+        portfolios = {
+            date(2017, 1, 1): Portfolio(1000.0, [], 'test'),
+            date(2017, 1, 2): Portfolio(900.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 0)], 'test'),
+            date(2017, 1, 3): Portfolio(800.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 5)], 'test'),
+            date(2017, 1, 4): Portfolio(800.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 5)], 'test'),
+            date(2017, 1, 5): Portfolio(700.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 5),
+                                                SharesOfCompany(CompanyEnum.COMPANY_B, 3)], 'test'),
+        }
+        for day, portfolio in portfolios.items():
+            history.record(day, portfolio)
+
+        self.assertEqual(len(history), 5)
+        self.assertEqual(list(history.keys()), list(portfolios.keys()))
+        self.assertEqual(history, portfolios)
+        self.assertEqual(history.get_holdings(date(2017, 1, 2)), {CompanyEnum.COMPANY_A: 0})
+        self.assertEqual(history.get_cash(date(2017, 1, 5)), 700.0)
+        self.assertEqual(history[date(2017, 1, 5)].name, 'test')
+        self.assertNotIn(date(2017, 1, 6), history)
+        self.assertIsNone(history.get(date(2017, 1, 6)))
+
+    def test_record__across_checkpoints(self):
+        history = PortfolioHistory('test')
+        portfolios = {}
+        start = date(2017, 1, 1)
+        for i in range(3 * PortfolioHistory.CHECKPOINT_INTERVAL + 5):
+            shares = [SharesOfCompany(CompanyEnum.COMPANY_A, i // 2)]
+            if i % 3 == 0:
+                shares.append(SharesOfCompany(CompanyEnum.COMPANY_B, i))
+            portfolio = Portfolio(1000.0 - i, shares, 'test')
+            portfolios[start + timedelta(days=i)] = portfolio
+            history.record(start + timedelta(days=i), portfolio)
+
+        self.assertEqual(len(history), len(portfolios))
+        for day, portfolio in portfolios.items():
+            self.assertEqual(history[day], portfolio)
+            self.assertEqual(len(history[day].shares), len(portfolio.shares))
+
+    def test_get__returns_independent_objects(self):
+        history = PortfolioHistory('test')
+        history.record(date(2017, 1, 1), Portfolio(1000.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 10)], 'test'))
+
+        portfolio = history[date(2017, 1, 1)]
+        portfolio.get_or_insert(CompanyEnum.COMPANY_A).amount = 20
+
+        self.assertEqual(history[date(2017, 1, 1)].get_amount(CompanyEnum.COMPANY_A), 10)
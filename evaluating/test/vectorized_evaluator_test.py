@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from definitions import PERIOD_1, PERIOD_2, PERIOD_3
+from evaluating.portfolio_evaluator import PortfolioEvaluator
+from evaluating.vectorized_evaluator import get_price_matrix, get_perfect_signals, get_predictor_signals, \
+    evaluate_signals, evaluate_buy_and_hold
+from model.CompanyEnum import CompanyEnum
+from model.Portfolio import Portfolio
+from model.SharesOfCompany import SharesOfCompany
+from predicting.predictor.reference.perfect_predictor import PerfectPredictor
+from trading.trader.reference.buy_and_hold_trader import BuyAndHoldTrader
+from trading.trader.reference.simple_trader import SimpleTrader
+from utils import read_stock_market_data
+
+EVALUATION_OFFSET = 500
+
+
+class VectorizedEvaluatorTest(unittest.TestCase):
+    def setUp(self):
+        self.companies = [CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B]
+        self.stock_market_data = read_stock_market_data(self.companies, [PERIOD_1, PERIOD_2, PERIOD_3])
+        self.dates, self.prices = get_price_matrix(self.stock_market_data)
+
+    def test_get_price_matrix(self):
+        self.assertEqual(self.prices.shape, (self.stock_market_data.get_row_count(), 2))
+        np.testing.assert_array_equal(self.prices[:, 1], self.stock_market_data[CompanyEnum.COMPANY_B].get_values())
+        self.assertEqual(self.dates[-1].item(), self.stock_market_data.get_most_recent_trade_day())
+
+    def test_evaluate_signals(self):
+        """
+        Tests: evaluate_signals
+
+        Compares the course of a portfolio traded by `SimpleTrader` with `PerfectPredictor`s to the course computed by
+        `PortfolioEvaluator`
+        """
+        trader = SimpleTrader(PerfectPredictor(CompanyEnum.COMPANY_A), PerfectPredictor(CompanyEnum.COMPANY_B))
+        portfolio = Portfolio(10000.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 10)], 'simple')
+        expected = PortfolioEvaluator([]).inspect_over_time_with_mapping(self.stock_market_data,
+                                                                          [(portfolio, trader, None)],
+                                                                          EVALUATION_OFFSET)['simple']
+
+        prices = self.prices[-EVALUATION_OFFSET:-1]
+        signals = get_perfect_signals(self.prices)[-EVALUATION_OFFSET + 1:]
+        result = evaluate_signals(prices, signals, 10000.0, [10, 0])
+
+        dates = self.dates[-EVALUATION_OFFSET:-1]
+        self.assertEqual(result.to_portfolio_history('simple', dates, self.companies), expected)
+        expected_equity = [expected[date].total_value(date, self.stock_market_data) for date in dates.tolist()]
+        self.assertEqual(result.equity.tolist(), expected_equity)
+
+    def test_evaluate_buy_and_hold(self):
+        """
+        Tests: evaluate_buy_and_hold
+
+        Compares the course of a portfolio traded by `BuyAndHoldTrader` to the course computed by `PortfolioEvaluator`
+        """
+        portfolio = Portfolio(10000.0, [], 'buy_and_hold')
+        expected = PortfolioEvaluator([]).inspect_over_time_with_mapping(self.stock_market_data,
+                                                                          [(portfolio, BuyAndHoldTrader(), None)],
+                                                                          EVALUATION_OFFSET)['buy_and_hold']
+
+        result = evaluate_buy_and_hold(self.prices[-EVALUATION_OFFSET:-1], 10000.0)
+
+        dates = self.dates[-EVALUATION_OFFSET:-1]
+        self.assertEqual(result.to_portfolio_history('buy_and_hold', dates, self.companies), expected)
+        expected_equity = [expected[date].total_value(date, self.stock_market_data) for date in dates.tolist()]
+        self.assertEqual(result.equity.tolist(), expected_equity)
+
+    def test_get_predictor_signals(self):
+        stock_data = self.stock_market_data[CompanyEnum.COMPANY_A]
+        row_count = stock_data.get_row_count()
+
+        signals = get_predictor_signals(stock_data, PerfectPredictor(CompanyEnum.COMPANY_A), row_count - 100,
+                                        row_count - 1)
+
+        np.testing.assert_array_equal(signals, get_perfect_signals(self.prices)[-99:, 0])
@@ -0,0 +1,61 @@
+import unittest
+from datetime import date
+
+from definitions import PERIOD_2, PERIOD_3
+from evaluating.walk_forward import get_yearly_windows, walk_forward, get_summary
+from model.CompanyEnum import CompanyEnum
+from trading.trader.reference.buy_and_hold_trader import BuyAndHoldTrader
+from utils import read_stock_market_data
+
+
+class WalkForwardTest(unittest.TestCase):
+    def setUp(self):
+        self.market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B],
+                                                  [PERIOD_2, PERIOD_3])
+
+    def test_get_yearly_windows(self):
+        windows = get_yearly_windows(self.market_data, train_years=2)
+
+        self.assertEqual(len(windows), 4)
+        self.assertEqual(windows[0], (date(2012, 1, 3), date(2014, 1, 2), date(2015, 1, 2)))
+        self.assertEqual(windows[-1], (date(2015, 1, 2), date(2017, 1, 3), None))
+
+        windows = get_yearly_windows(self.market_data, train_years=0, test_years=2, first_test_year=2013)
+        self.assertEqual(windows, [(None, date(2013, 1, 2), date(2015, 1, 2)),
+                                   (None, date(2015, 1, 2), date(2017, 1, 3)),
+                                   (None, date(2017, 1, 3), None)])
+
+    def test_walk_forward(self):
+        histories = []
+
+        def create_trader(history, window):
+            histories.append((history.get_most_recent_trade_day(), window))
+            return BuyAndHoldTrader()
+
+        windows = get_yearly_windows(self.market_data)
+        result = walk_forward(create_trader, self.market_data, windows)
+
+        self.assertEqual(len(result['windows']), 5)
+        self.assertEqual(histories[0], (date(2012, 12, 31), windows[0]))
+        first_window = result['windows'][0]
+        self.assertEqual(first_window['test_start'], date(2013, 1, 2))
+        self.assertEqual(first_window['test_end'], date(2013, 12, 31))
+        self.assertEqual(first_window['initial_value'], 10000.0)
+        self.assertAlmostEqual(first_window['return'], first_window['final_value'] / 10000.0 - 1.0)
+        self.assertEqual(result['windows'][-1]['test_end'], date(2017, 11, 6))
+        self.assertEqual(result['summary'], get_summary(result['windows']))
+        self.assertEqual(result['summary']['windows'], 5)
+
+        # The windows are independent of each other, so the worker processes have to get the same results
+        self.assertEqual(walk_forward(lambda history, window: BuyAndHoldTrader(), self.market_data, windows,
+                                      processes=2), result)
+
+    def test_get_summary(self):
+        summary = get_summary([{'return': 0.5}, {'return': -0.2}])
+
+        self.assertEqual(summary['windows'], 2)
+        self.assertAlmostEqual(summary['mean_return'], 0.15)
+        self.assertAlmostEqual(summary['min_return'], -0.2)
+        self.assertAlmostEqual(summary['positive_share'], 0.5)
+        self.assertAlmostEqual(summary['compound_return'], 0.2)
+        self.assertEqual(get_summary([]), {'windows': 0})
@@ -0,0 +1,263 @@
+import datetime
+from typing import List, Tuple
+
+import numpy
+
+from evaluating.portfolio_history import PortfolioHistory
+from model.CompanyEnum import CompanyEnum
+from model.IPredictor import IPredictor
+from model.Portfolio import Portfolio
+from model.SharesOfCompany import SharesOfCompany
+from model.StockData import StockData
+from model.StockMarketData import StockMarketData
+
+CompanyList = List[CompanyEnum]
+
+"""
+This file comprises a backtest engine for traders whose decisions only depend on prices and predictions (like
+`SimpleTrader` and `BuyAndHoldTrader`). Instead of handing `Portfolio` and `OrderList` objects around for every day it
+works on a price matrix and a matrix of per-day actions. Its results equal those of `PortfolioEvaluator`
+
+All matrices have one row per trade day and one column per company. `PortfolioEvaluator#inspect_over_time` trades on
+all but the last of the `evaluation_offset` last data rows, so these are the rows `[-evaluation_offset:-1]` of the
+matrices returned by `#get_price_matrix`
+"""
+
+BUY = 1
+SELL = -1
+HOLD = 0
+
+
+class BacktestResult:
+    """
+    The course of one portfolio computed by the backtest engine. Row 0 of `cash`, `holdings` and `held` is the starting
+    state, row `i + 1` the state after trading on day `i`
+    """
+
+    def __init__(self, cash: numpy.ndarray, holdings: numpy.ndarray, held: numpy.ndarray, equity: numpy.ndarray):
+        """
+        Constructor
+
+        Args:
+            cash: The cash levels. Shape: `(days + 1,)`
+            holdings: The amounts of shares held per company. Shape: `(days + 1, companies)`. The dtype is `object` if
+             the amounts don't fit into `int64`
+            held: Whether the portfolio contains an entry for a company (possibly with an amount of 0).
+             Shape: `(days + 1, companies)`
+            equity: The total value of the portfolio after trading on each day, based on that day's prices.
+             Shape: `(days,)`
+        """
+        self.cash = cash
+        self.holdings = holdings
+        self.held = held
+        self.equity = equity
+
+    def to_portfolio_history(self, name: str, dates: numpy.ndarray, companies: CompanyList) -> PortfolioHistory:
+        """
+        Converts this result into the structure returned by `PortfolioEvaluator` for one portfolio. The starting state
+        is recorded on the day before the first trade day
+
+        Args:
+            name: The portfolio's name
+            dates: The trade days. Shape: `(days,)`
+            companies: The companies in column order
+
+        Returns:
+            The portfolio's course as `PortfolioHistory`
+        """
+        dates = numpy.asarray(dates, dtype='datetime64[D]').tolist()
+        dates = [dates[0] - datetime.timedelta(days=1)] + dates
+
+        history = PortfolioHistory(name)
+        for row, date in enumerate(dates):
+            shares = [SharesOfCompany(company, amount) for company, amount, held in
+                      zip(companies, self.holdings[row].tolist(), self.held[row].tolist()) if held]
+            history.record(date, Portfolio(self.cash[row].item(), shares, name))
+        return history
+
+
+def get_price_matrix(market_data: StockMarketData, companies: CompanyList = None) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Builds the matrix of prices out of the given market data
+
+    Args:
+        market_data: The market data. All companies need to have the same dates
+        companies: The companies to use as columns, in this order. Default: All companies of `market_data` in the
+         order of `CompanyEnum`, which is the order `SimpleTrader` and `BuyAndHoldTrader` trade in
+
+    Returns:
+        The dates of shape `(days,)` and the prices of shape `(days, companies)`
+    """
+    if companies is None:
+        companies = [company for company in CompanyEnum if market_data[company] is not None]
+    assert market_data.check_data_length()
+
+    dates = market_data[companies[0]].get_dates_array()
+    prices = numpy.stack([market_data[company].get_values_array() for company in companies], axis=1)
+    return dates, prices
+
+
+def get_perfect_signals(prices: numpy.ndarray) -> numpy.ndarray:
+    """
+    Determines the actions `SimpleTrader` takes with `PerfectPredictor`s, which predict the next day's price
+
+    Args:
+        prices: The prices of shape `(days, companies)`
+
+    Returns:
+        The actions (`BUY`, `SELL` or `HOLD`) of shape `(days - 1, companies)`, as there is no next day for the last row
+    """
+    return numpy.sign(numpy.diff(prices, axis=0)).astype('int8')
+
+
+def get_predictor_signals(stock_data: StockData, predictor: IPredictor, start: int, stop: int) -> numpy.ndarray:
+    """
+    Determines the actions `SimpleTrader` takes with the given predictor for one company. This still asks the
+    predictor once per day, but skips everything else `PortfolioEvaluator` does per day
+
+    Args:
+        stock_data: The stock data of the company
+        predictor: The predictor to ask
+        start: The row of the first trade day
+        stop: The row after the last trade day
+
+    Returns:
+        The actions (`BUY`, `SELL` or `HOLD`) of shape `(stop - start,)`
+    """
+    values = stock_data.get_values_array()
+    signals = numpy.empty(stop - start, dtype='int8')
+    for row in range(start, stop):
+        predicted_value = predictor.doPredict(stock_data.view_to_offset(row + 1))
+        signals[row - start] = numpy.sign(predicted_value - values[row])
+    return signals
+
+
+def evaluate_signals(prices: numpy.ndarray, signals: numpy.ndarray, cash: float,
+                     holdings: numpy.ndarray = None) -> BacktestResult:
+    """
+    Computes the course of a portfolio traded by `SimpleTrader` with the given actions: On `BUY` it spends all cash
+    not yet spent on that day on the company's shares, on `SELL` it sells all shares of the company. The companies are
+    traded in column order. Cash and holdings are calculated with exactly the same floating point operations as
+    `SimpleTrader#doTrade` and `Portfolio#update`.
+
+    Buying whole shares makes each day depend on the cash left by the day before, so this is one sequential pass over
+    the days on plain floats. Only the equity curve is computed column-wise afterwards
+
+    Args:
+        prices: The prices of shape `(days, companies)`
+        signals: The actions (`BUY`, `SELL` or `HOLD`) of shape `(days, companies)`
+        cash: The starting cash level
+        holdings: The starting amounts of shares per company. Default: No shares at all
+
+    Returns:
+        The course of the portfolio
+    """
+    prices = numpy.asarray(prices, dtype='float64')
+    signals = numpy.asarray(signals)
+    assert prices.ndim == 2 and signals.shape == prices.shape
+
+    amounts = [0] * prices.shape[1] if holdings is None else list(holdings)
+    held = [amount != 0 for amount in amounts]
+    company_range = range(len(amounts))
+
+    cash_course = [cash]
+    holdings_course = [list(amounts)]
+    held_course = [list(held)]
+
+    for price_row, signal_row in zip(prices.tolist(), signals.tolist()):
+        # `SimpleTrader` plans its purchases with the cash of the morning, `Portfolio#update` applies the orders
+        budget = cash
+        available_cash = cash
+        for company in company_range:
+            signal = signal_row[company]
+            price = price_row[company]
+            if signal > 0:
+                if budget > price:
+                    amount = int(budget // price)
+                    budget = budget - amount * price
+                    held[company] = True
+                    trade_volume = amount * price
+                    if trade_volume <= available_cash:
+                        amounts[company] += amount
+                        cash -= trade_volume
+                        available_cash -= trade_volume
+            elif signal < 0:
+                if held[company]:
+                    cash += amounts[company] * price
+                    amounts[company] = 0
+
+        cash_course.append(cash)
+        holdings_course.append(list(amounts))
+        held_course.append(list(held))
+
+    return __build_result(prices, cash_course, holdings_course, held_course)
+
+
+def evaluate_buy_and_hold(prices: numpy.ndarray, cash: float, holdings: numpy.ndarray = None) -> BacktestResult:
+    """
+    Computes the course of a portfolio traded by `BuyAndHoldTrader`: On the first day the cash is split evenly among
+    all companies and spent on their shares, then the shares are held. As nothing changes after the first day this is
+    fully vectorized
+
+    Args:
+        prices: The prices of shape `(days, companies)`
+        cash: The starting cash level
+        holdings: The starting amounts of shares per company. Default: No shares at all
+
+    Returns:
+        The course of the portfolio
+    """
+    prices = numpy.asarray(prices, dtype='float64')
+    assert prices.ndim == 2 and prices.shape[0] > 0
+    days = prices.shape[0]
+
+    amounts = [0] * prices.shape[1] if holdings is None else list(holdings)
+    starting_amounts = list(amounts)
+    starting_held = [amount != 0 for amount in amounts]
+    starting_cash = cash
+
+    available_cash_per_stock = cash / len(amounts)
+    available_cash = cash
+    for company, price in enumerate(prices[0].tolist()):
+        amount = available_cash_per_stock // price
+        trade_volume = amount * price
+        if trade_volume <= available_cash:
+            amounts[company] += amount
+            cash -= trade_volume
+            available_cash -= trade_volume
+
+    cash_course = numpy.full(days + 1, cash, dtype='float64')
+    cash_course[0] = starting_cash
+    holdings_course = numpy.tile(numpy.array(amounts, dtype='float64'), (days + 1, 1))
+    holdings_course[0] = starting_amounts
+    held_course = numpy.ones(holdings_course.shape, dtype='bool')
+    held_course[0] = starting_held
+
+    return __build_result(prices, cash_course, holdings_course, held_course)
+
+
+def __build_result(prices: numpy.ndarray, cash_course, holdings_course, held_course) -> BacktestResult:
+    """
+    Converts the given courses to arrays and computes the equity curve. The values of the companies are summed up in
+    column order, like `Portfolio#total_value` sums them up in the order of the portfolio's shares
+
+    Args:
+        prices: The prices of shape `(days, companies)`
+        cash_course: The cash levels, starting state included
+        holdings_course: The amounts of shares per company, starting state included
+        held_course: Whether the portfolio contains an entry for a company, starting state included
+
+    Returns:
+        The course of the portfolio
+    """
+    cash = numpy.asarray(cash_course, dtype='float64')
+    # Amounts of shares may exceed the range of `int64` (and the precision of `float64`), then NumPy keeps them as
+    # Python ints in an array of dtype `object`
+    holdings = numpy.asarray(holdings_course)
+    held = numpy.asarray(held_course, dtype='bool')
+
+    shares_value = numpy.zeros(prices.shape[0], dtype='float64')
+    for company in range(prices.shape[1]):
+        shares_value += (holdings[1:, company] * prices[:, company]).astype('float64')
+
+    return BacktestResult(cash, holdings, held, shares_value + cash[1:])
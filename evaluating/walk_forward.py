@@ -0,0 +1,210 @@
+import datetime as dt
+from typing import Callable, Dict, List, Tuple
+
+import numpy
+
+from evaluating.evaluator_utils import map_in_forked_processes
+from evaluating.portfolio_evaluator import PortfolioEvaluator
+from logger import logger
+from model.CompanyEnum import CompanyEnum
+from model.IPredictor import IPredictor
+from model.ITrader import ITrader
+from model.Portfolio import Portfolio
+from model.StockMarketData import StockMarketData
+
+# A walk-forward window: (first day of training or None if there is no training, first test day, first day after the
+# test period or None if the test period reaches until the end of the market data)
+Window = Tuple[dt.date, dt.date, dt.date]
+
+# Creates the trader to test in a window. Gets the market data before the window's first test day and the window, so
+# that it can train the trader (e.g. from the window's first day of training on)
+TraderFactory = Callable[[StockMarketData, Window], ITrader]
+
+"""
+This file comprises a walk-forward evaluation: Instead of evaluating a trader once over a fixed period (like
+`PortfolioEvaluator#inspect_over_time` does) the history is split into rolling windows, e.g. one per year. For each
+window a new trader is created and optionally trained on the years before, and then tested on the window's test period.
+The returns of all windows show how robust a trader is over time.
+
+The windows are evaluated concurrently in forked worker processes (see `evaluator_utils#map_in_forked_processes`).
+The market data is shared with the workers, and each window only uses views on it. Predictions precomputed before
+forking (see `IPredictor#precompute`) are inherited by the workers as well
+"""
+
+# The portfolio traded in each window
+PORTFOLIO_NAME = 'walk-forward portfolio'
+
+
+def get_yearly_windows(market_data: StockMarketData, train_years: int = 1, test_years: int = 1,
+                       first_test_year: int = None, last_test_year: int = None) -> List[Window]:
+    """
+    Splits the history of `market_data` into consecutive test periods of `test_years` calendar years, each one preceded
+    by a training period of `train_years` calendar years
+
+    Args:
+        market_data: The market data to split
+        train_years: The number of years to train on before each test period. 0 disables training. Default: 1
+        test_years: The number of years per test period, which is also the step between two windows. Default: 1
+        first_test_year: The first test year. Default: None, which uses the first year with `train_years` years of data
+         before it
+        last_test_year: The last year a test period may start in. Default: None, which uses the last year of data
+
+    Returns:
+        The windows in chronological order
+    """
+    assert train_years >= 0 and test_years >= 1
+    dates = __get_dates_array(market_data)
+    years = dates.astype('datetime64[Y]').astype(int) + 1970
+    first_test_year = years[0] + train_years if first_test_year is None else first_test_year
+    last_test_year = years[-1] if last_test_year is None else last_test_year
+
+    windows = []
+    for year in range(first_test_year, last_test_year + 1, test_years):
+        train_start_index = numpy.searchsorted(years, year - train_years)
+        test_start_index = numpy.searchsorted(years, year)
+        test_end_index = numpy.searchsorted(years, year + test_years)
+        if test_start_index == len(dates) or (train_years > 0 and train_start_index == test_start_index):
+            # No data to test or to train on
+            continue
+
+        train_start = dates[train_start_index].item() if train_years > 0 else None
+        test_end = dates[test_end_index].item() if test_end_index < len(dates) else None
+        windows.append((train_start, dates[test_start_index].item(), test_end))
+    return windows
+
+
+def walk_forward(trader_factory: TraderFactory, market_data: StockMarketData, windows: List[Window],
+                 cash: float = 10000.0, processes: int = 1,
+                 predictors: List[Tuple[IPredictor, CompanyEnum]] = None) -> Dict:
+    """
+    Evaluates a new trader per window on the window's test period. Each trader starts with a portfolio of `cash`
+    and no shares and trades from the first test day until the day before the window's end
+
+    Args:
+        trader_factory: Creates the trader for a window. It runs in a worker process if `processes` is greater than 1
+        market_data: The market data to evaluate on
+        windows: The windows to evaluate, e.g. from `#get_yearly_windows`
+        cash: The initial cash of each window's portfolio. Default: 10000.0
+        processes: The number of worker processes to evaluate the windows in. Default: 1
+        predictors: Predictors whose outputs are precomputed for the whole `market_data` before the windows are
+         evaluated, so that the same predictors used by the created traders answer from the cache. Structure:
+         `List[Tuple[IPredictor, CompanyEnum]]`. Default: None
+
+    Returns:
+        The results per window and their summary. Structure: `{'windows': [result per window], 'summary': {...}}`,
+         each window result being `{'train_start': date, 'test_start': date, 'test_end': date, 'initial_value': float,
+         'final_value': float, 'return': float}` with `test_end` being the last traded day, and the summary being
+         `{'windows': int, 'mean_return': float, 'std_return': float, 'min_return': float, 'max_return': float,
+         'positive_share': float, 'compound_return': float}`
+    """
+    for predictor, company in predictors or []:
+        predictor.precompute(market_data[company])
+
+    def evaluate_window(window: Window) -> Dict:
+        return __evaluate_window(trader_factory, market_data, window, cash)
+
+    results = map_in_forked_processes(evaluate_window, windows, processes)
+    for result in results:
+        logger.debug(f"walk_forward: {result['test_start']} - {result['test_end']}: return {result['return']:.4f}")
+    return {'windows': results, 'summary': get_summary(results)}
+
+
+def __evaluate_window(trader_factory: TraderFactory, market_data: StockMarketData, window: Window,
+                      cash: float) -> Dict:
+    """
+    Creates the trader of `window` and evaluates it on the window's test period. This runs in a worker process
+
+    Returns:
+        The window's result, see `#walk_forward`
+    """
+    train_start, test_start, test_end = window
+    first_company = next(iter(market_data.get_companies()))
+    test_start_index = market_data[first_company].get_index_by_date(test_start)
+    if test_start_index is None:
+        raise ValueError(f"{test_start} is not contained in the given market data")
+    test_end_index = market_data.get_row_count() if test_end is None \
+        else market_data[first_company].get_index_by_date(test_end)
+    if test_end_index is None:
+        raise ValueError(f"{test_end} is not contained in the given market data")
+
+    trader = trader_factory(__view_to_offset(market_data, test_start_index), window)
+
+    # The evaluator doesn't trade on the last row it gets, so the test data contains the first day after the window
+    test_data = __view_to_offset(market_data, min(test_end_index + 1, market_data.get_row_count()))
+    portfolio_over_time = PortfolioEvaluator([trader]).inspect_over_time(
+        test_data, [Portfolio(cash, [], PORTFOLIO_NAME)], date_offset=test_start)[PORTFOLIO_NAME]
+
+    last_day = max(portfolio_over_time.keys())
+    final_value = portfolio_over_time[last_day].total_value(last_day, test_data)
+    return {'train_start': train_start, 'test_start': test_start, 'test_end': last_day, 'initial_value': cash,
+            'final_value': final_value, 'return': final_value / cash - 1.0}
+
+
+def get_summary(window_results: List[Dict]) -> Dict:
+    """
+    Aggregates the returns of the windows
+
+    Args:
+        window_results: The results of the windows, see `#walk_forward`
+
+    Returns:
+        The summary, see `#walk_forward`
+    """
+    returns = numpy.array([result['return'] for result in window_results], dtype='float64')
+    if len(returns) == 0:
+        return {'windows': 0}
+
+    return {
+        'windows': len(returns),
+        'mean_return': returns.mean().item(),
+        'std_return': returns.std().item(),
+        'min_return': returns.min().item(),
+        'max_return': returns.max().item(),
+        'positive_share': (returns > 0.0).mean().item(),
+        # The return of reinvesting the final value of each window into the next one
+        'compound_return': numpy.prod(1.0 + returns).item() - 1.0,
+    }
+
+
+def __get_dates_array(market_data: StockMarketData) -> numpy.ndarray:
+    """
+    Returns the dates of the first company of `market_data`
+    """
+    first_company = next(iter(market_data.get_companies()))
+    return market_data[first_company].get_dates_array()
+
+
+def __view_to_offset(market_data: StockMarketData, offset: int) -> StockMarketData:
+    """
+    Returns a view on the first `offset` rows of `market_data` without copying anything (unlike
+    `evaluator_utils#get_data_up_to_offset` an `offset` of 0 yields no rows)
+    """
+    return StockMarketData({company: market_data[company].view_to_offset(offset)
+                            for company in market_data.get_companies()})
+
+
+if __name__ == "__main__":
+    from definitions import PERIOD_1, PERIOD_2, PERIOD_3
+    from predicting.predictor.reference.nn_binary_predictor import StockANnBinaryPredictor, StockBNnBinaryPredictor
+    from predicting.predictor.reference.predictor_utils import INPUT_SIZE
+    from trading.trader.reference.dql_trader import DqlTrader
+    from utils import read_stock_market_data
+
+    def create_dql_trader(history: StockMarketData, window: Window) -> ITrader:
+        # Train a new DQL trader on the three years before the test period
+        trader = DqlTrader(StockANnBinaryPredictor(), StockBNnBinaryPredictor(), False, True, 'walk_forward')
+        PortfolioEvaluator([trader]).inspect_over_time(history, [Portfolio(10000.0, [], 'training')],
+                                                       date_offset=window[0])
+        trader.train_while_trading = False
+        return trader
+
+    all_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_1, PERIOD_2, PERIOD_3])
+    # The NN binary predictors need `INPUT_SIZE` days of history, so the first of the 3 training years starts after them
+    first_training_year = __get_dates_array(all_data)[INPUT_SIZE - 1].item().year + 1
+    result = walk_forward(create_dql_trader, all_data,
+                          get_yearly_windows(all_data, 3, first_test_year=first_training_year + 3),
+                          processes=4, predictors=[(StockANnBinaryPredictor(), CompanyEnum.COMPANY_A),
+                                                   (StockBNnBinaryPredictor(), CompanyEnum.COMPANY_B)])
+    for window_result in result['windows']:
+        print(f"{window_result['test_start']} - {window_result['test_end']}: {window_result['return']:+.2%}")
+    print(result['summary'])
@@ -25,3 +25,13 @@ class IPredictor(metaclass=abc.ABCMeta):
           The next predicted stock value of the company
         """
         pass
+
+    def precompute(self, data: StockData):
+        """
+        Optionally prepares predictions for all days of the given historical values at once, so that later calls of
+        `doPredict` with (parts of) these values are answered faster. Does nothing by default
+
+        Args:
+          data: Historical stock values of a company
+        """
+        pass
@@ -13,7 +13,9 @@ class ITrader(metaclass=abc.ABCMeta):
     def doTrade(self, portfolio: Portfolio, current_portfolio_value: float,
                 stock_market_data: StockMarketData) -> OrderList:
         """
-        Generate action to be taken on the "stock market"
+        Generate action to be taken on the "stock market". Implementations may define this as coroutine function
+        (`async def`), e.g. to wait for a remote service. Such traders can only be evaluated by
+        `PortfolioEvaluator#inspect_over_time_with_mapping_async`
 
         Args:
           portfolio: The current Portfolio of this trader
@@ -23,6 +23,7 @@ class Order:
     """
     Represents an action to be taken on a portfolio
     """
+    __slots__ = ('action', 'shares')
 
     def __init__(self, action: OrderType, shares: SharesOfCompany):
         """
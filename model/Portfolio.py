@@ -1,6 +1,5 @@
-from typing import List
+from typing import Dict, List, Tuple
 
-import copy
 import datetime
 
 from model import StockMarketData
@@ -10,12 +9,16 @@ from model.Order import OrderList, OrderType, Order
 from logger import logger
 
 SharesList = List[SharesOfCompany]
+SharesTuple = Tuple[SharesOfCompany, ...]
+SharesDict = Dict[CompanyEnum, SharesOfCompany]
 
 
 class Portfolio:
     """
-    Represents portfolio of a client
+    Represents portfolio of a client. The held shares are kept in a dict indexed by company, so that looking up,
+    inserting and updating the shares of one company are O(1) operations regardless of the number of held companies
     """
+    __slots__ = ('cash', 'name', '__shares')
 
     def __init__(self, cash: float, shares: SharesList, name: str = 'nameless'):
         """
@@ -30,10 +33,39 @@ class Portfolio:
         self.shares = shares
         self.name = name
 
+    @property
+    def shares(self) -> SharesTuple:
+        """
+        Returns the held shares in the order of their insertion. The shares are returned as tuple, so that trying to
+        add or remove shares this way fails instead of being lost (use `#get_or_insert` or the setter instead). The
+        contained `SharesOfCompany` objects are the portfolio's own ones, so changing their amounts changes the
+        portfolio
+
+        Returns:
+            The held shares as a tuple
+        """
+        return tuple(self.__shares.values())
+
+    @shares.setter
+    def shares(self, shares: SharesList):
+        """
+        Replaces the held shares
+
+        Args:
+            shares: The new list of shares. Each company may occur at most once
+
+        Raises:
+            ValueError: If a company occurs more than once in `shares`
+        """
+        shares_dict = {share.company_enum: share for share in shares}
+        if len(shares_dict) != len(shares):
+            raise ValueError(f"The shares of a company may occur only once: {shares}")
+        self.__shares = shares_dict
+
     def total_value(self, date: datetime.date, prices: StockMarketData):
         """
         Calculates the portfolio's total value based on the held shares multiplied by their current value added to the
-        cash level.
+        cash level. The prices are looked up by date in O(1) per held company (see `StockData#get_value_by_date`)
 
         Args:
             date: The date on which the total value should be calculated
@@ -42,9 +74,12 @@ class Portfolio:
         Returns:
             The portfolio's total value
         """
-        values = [share.amount *
-                  [price[1] for price in iter(prices[share.company_enum]) if date == price[0]][0]
-                  for share in self.shares]
+        values = []
+        for share in self.__shares.values():
+            price = prices[share.company_enum].get_value_by_date(date)
+            if price is None:
+                raise ValueError(f"No price of {share.company_enum} available on {date}")
+            values.append(share.amount * price)
 
         return sum(values) + self.cash
 
@@ -58,8 +93,7 @@ class Portfolio:
         Returns:
             `True` if existing, `False` otherwise
         """
-        return len(self.shares) != 0 and len(
-            [share for share in self.shares if share.company_enum == company_enum]) != 0
+        return company_enum in self.__shares
 
     def get_or_insert(self, company_enum: CompanyEnum):
         """
@@ -75,12 +109,12 @@ class Portfolio:
         """
         if not self.__has_stock(company_enum):
             share = SharesOfCompany(company_enum, 0)
-            self.shares.append(share)
+            self.__shares[company_enum] = share
             return share
 
-        return next(share for share in self.shares if share.company_enum == company_enum)
+        return self.__shares[company_enum]
 
-    def __get_by_name(self, company_enum: CompanyEnum) -> SharesOfCompany:
+    def get_shares(self, company_enum: CompanyEnum) -> SharesOfCompany:
         """
         Returns SharesOfCompany for `company_enum`, or None if nothing found
 
@@ -90,7 +124,7 @@ class Portfolio:
         Returns:
             A `SharesOfCompany` object
         """
-        return next((share for share in self.shares if share.company_enum == company_enum), None)
+        return self.__shares.get(company_enum)
 
     def get_amount(self, company_enum: CompanyEnum) -> int:
         """
@@ -103,12 +137,24 @@ class Portfolio:
         Returns:
             The amount of shares of the given company
         """
-        share = self.__get_by_name(company_enum)
+        share = self.get_shares(company_enum)
         if share is not None:
             return share.amount
         else:
             return 0
 
+    def copy(self):
+        """
+        Creates a copy of this portfolio. Only the `SharesOfCompany` objects are copied, as they are the only mutable
+        parts of a portfolio. This is considerably cheaper than `copy.deepcopy`
+
+        Returns:
+            The copied portfolio
+        """
+        return Portfolio(self.cash,
+                         [SharesOfCompany(share.company_enum, share.amount) for share in self.__shares.values()],
+                         self.name)
+
     def update(self, stock_market_data: StockMarketData, order_list: OrderList):
         """
         Iterates through the list of orders (`order_list`), applies those orders and returns an updated
@@ -119,9 +165,9 @@ class Portfolio:
             order_list: The list of orders to apply
 
         Returns:
-            An updated portfolio. This is a deep copy of the given `portfolio` (see `copy.deepcopy`)
+            An updated portfolio. This is a copy of this portfolio (see `#copy`)
         """
-        updated_portfolio = copy.deepcopy(self)
+        updated_portfolio = self.copy()
 
         logger.debug(f"Updating portfolio {self.name}:")
 
@@ -249,20 +295,10 @@ class Portfolio:
         if self.cash != o.cash:
             return False
 
-        if len(self.shares) != len(o.shares):
+        if self.__shares.keys() != o.__shares.keys():
             return False
 
-        for share in self.shares:
-            company = share.company_enum
-            amount = share.amount
-
-            if company not in [share.company_enum for share in o.shares]:
-                return False
-
-            if amount not in [share.amount for share in o.shares if share.company_enum == company]:
-                return False
-
-        return True
+        return all(share.amount == o.__shares[company].amount for company, share in self.__shares.items())
 
     def __repr__(self) -> str:
-        return f"<Portfolio(name=\"{self.name}\", cash={self.cash}, shares={self.shares})>"
+        return f"<Portfolio(name=\"{self.name}\", cash={self.cash}, shares={list(self.shares)})>"
@@ -5,6 +5,7 @@ class SharesOfCompany:
     """
     Represents number of owned shares of one type (company)
     """
+    __slots__ = ('company_enum', 'amount')
 
     def __init__(self, company_enum: CompanyEnum, amount: int):
         """
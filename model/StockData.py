@@ -1,14 +1,17 @@
 import datetime
 from typing import List, Tuple
 
+import numpy
+
 StockDataTuple = Tuple[datetime.date, float]
 StockDataList = List[StockDataTuple]
 
 
 class StockData:
     """
-    Objects of this class comprise a list of tuples which in turn consist of a mapping between dates (type
-    `datetime.date`) and stock prices (type `float`)
+    Objects of this class comprise a mapping between dates (type `datetime.date`) and stock prices (type `float`).
+    Internally the data is kept column-wise in two NumPy arrays: one of dtype `datetime64[D]` for the dates and one of
+    dtype `float64` for the prices. The tuple based API is served from these arrays
     """
 
     def __init__(self, stock_data: StockDataList):
@@ -19,25 +22,68 @@ class StockData:
             stock_data: A list of tuples with dates and the corresponding stock price.
              Structure: `List[Tuple[datetime.date, float]]`
         """
-        self.__stock_data = stock_data
+        dates = numpy.array([item[0] for item in stock_data], dtype='datetime64[D]')
+        values = numpy.array([item[1] for item in stock_data], dtype='float64')
+        self.__set_arrays(dates, values)
+
+    @classmethod
+    def from_arrays(cls, dates: numpy.ndarray, values: numpy.ndarray):
+        """
+        Creates a `StockData` object directly from a date and a price array without building any tuples. Arrays of the
+        right dtype are not copied: the object keeps read-only views on them, so the given arrays must not be changed
+        afterwards. They stay writeable themselves, though
+
+        Args:
+            dates: The dates. Anything convertible to an array of dtype `datetime64[D]`
+            values: The stock prices. Anything convertible to an array of dtype `float64`
+
+        Returns:
+            The created `StockData` object
+        """
+        dates = numpy.asarray(dates, dtype='datetime64[D]')
+        values = numpy.asarray(values, dtype='float64')
+        assert dates.ndim == 1 and dates.shape == values.shape
+
+        stock_data = cls.__new__(cls)
+        stock_data.__set_arrays(dates, values)
+        return stock_data
+
+    def __set_arrays(self, dates: numpy.ndarray, values: numpy.ndarray):
+        """
+        Stores read-only views on the given arrays as the underlying data, so that they can safely be handed out by
+        `#get_dates_array` and `#get_values_array`. The given arrays themselves stay writeable
+
+        Args:
+            dates: The dates as array of dtype `datetime64[D]`
+            values: The stock prices as array of dtype `float64`
+        """
+        dates, values = dates.view(), values.view()
+        dates.flags.writeable = False
+        values.flags.writeable = False
+        self.__dates = dates
+        self.__values = values
+        self.__date_index = None
 
     def append(self, stock_data_item: StockDataTuple):
         """
-        Appends the given stock data item to the list
+        Appends the given stock data item to the list. As the underlying arrays have to be reallocated this is an O(n)
+        operation, so prefer to create `StockData` objects in one go
 
         Args:
             stock_data_item: The stock data to append
         """
-        self.__stock_data.append(stock_data_item)
+        dates = numpy.append(self.__dates, numpy.array([stock_data_item[0]], dtype='datetime64[D]'))
+        values = numpy.append(self.__values, numpy.array([stock_data_item[1]], dtype='float64'))
+        self.__set_arrays(dates, values)
 
     def __iter__(self):
         """
-        Returns an iterator over the underlying list of tuples
+        Returns an iterator over tuples of dates and the corresponding stock price
 
         Returns:
             The iterator
         """
-        return iter(self.__stock_data)
+        return zip(self.__dates.tolist(), self.__values.tolist())
 
     def get(self, index: int):
         """
@@ -49,7 +95,7 @@ class StockData:
         Returns:
             A tuple consisting of a date and the corresponding stock price
         """
-        return self.__stock_data[index]
+        return self.__dates[index].item(), self.__values[index].item()
 
     def get_first(self):
         """
@@ -58,7 +104,7 @@ class StockData:
         Returns:
             A tuple consisting of a date and the corresponding stock price
         """
-        return self.__stock_data[0]
+        return self.get(0)
 
     def get_last(self):
         """
@@ -67,11 +113,12 @@ class StockData:
         Returns:
             A tuple consisting of a date and the corresponding stock price
         """
-        return self.__stock_data[-1]
+        return self.get(-1)
 
     def get_from_offset(self, offset: int):
         """
-        Calls `[offset:]` on the list of underlying stock data
+        Returns `[offset:]` of the underlying stock data as a list of tuples. Use `#get_values_array` to slice windows
+        of prices without any conversion
 
         Args:
             offset: The offset to take
@@ -79,7 +126,7 @@ class StockData:
         Returns:
             A sub-list
         """
-        return self.__stock_data[offset:]
+        return list(zip(self.__dates[offset:].tolist(), self.__values[offset:].tolist()))
 
     def get_row_count(self):
         """
@@ -88,19 +135,25 @@ class StockData:
         Returns:
             The row count
         """
-        return len(self.__stock_data)
+        return len(self.__values)
 
     def index(self, item: StockDataTuple):
         """
-        Calls `#index` on the underlying list of tuples
+        Looks up the index of the first row which equals the given tuple of date and stock price
 
         Args:
             item: The item to look up the index for
 
         Returns:
             The index of the given `item`
+
+        Raises:
+            ValueError: If `item` is not contained
         """
-        return self.__stock_data.index(item)
+        matches = numpy.flatnonzero((self.__dates == numpy.datetime64(item[0], 'D')) & (self.__values == item[1]))
+        if len(matches) == 0:
+            raise ValueError(f"{item} is not in StockData")
+        return int(matches[0])
 
     def copy_to_offset(self, offset: int):
         """
@@ -112,7 +165,67 @@ class StockData:
         Returns:
             A `StockData` object with only the first `offset` data rows
         """
-        return StockData(self.__stock_data.copy()[:offset])
+        return StockData.from_arrays(self.__dates[:offset].copy(), self.__values[:offset].copy())
+
+    def view_to_offset(self, offset: int):
+        """
+        Behaves like `#copy_to_offset` but doesn't copy anything: The returned object shares the underlying arrays
+        with this object and only has a different end index. This makes the operation O(1) regardless of the number of
+        data rows
+
+        Args:
+            offset: The offset to use
+
+        Returns:
+            A `StockData` object with only the first `offset` data rows
+        """
+        view = StockData.from_arrays(self.__dates[:offset], self.__values[:offset])
+        # Views cover a prefix of our rows, so they can share our date index
+        view.__date_index = self.__get_date_index()
+        return view
+
+    def __get_date_index(self):
+        """
+        Returns the date index of the underlying data and builds it on first use. If a date occurs more than once the
+        index of its first occurrence is used
+
+        Returns:
+            A dict. Structure: { datetime.date: int }
+        """
+        if self.__date_index is None:
+            unique_dates, first_indices = numpy.unique(self.__dates, return_index=True)
+            self.__date_index = dict(zip(unique_dates.tolist(), first_indices.tolist()))
+        return self.__date_index
+
+    def get_index_by_date(self, date: datetime.date):
+        """
+        Looks up the row index of the given `date`. This is an O(1) operation
+
+        Args:
+            date: The date to look up the row index for
+
+        Returns:
+            The row index of `date`, or `None` if `date` is not contained
+        """
+        index = self.__get_date_index().get(date)
+        if index is None or index >= len(self.__values):
+            return None
+        return index
+
+    def get_value_by_date(self, date: datetime.date):
+        """
+        Looks up the stock price on the given `date`. This is an O(1) operation
+
+        Args:
+            date: The date to look up the stock price for
+
+        Returns:
+            The stock price on `date`, or `None` if `date` is not contained
+        """
+        index = self.get_index_by_date(date)
+        if index is None:
+            return None
+        return self.__values[index].item()
 
     def get_dates(self) -> List[datetime.date]:
         """
@@ -121,7 +234,7 @@ class StockData:
         Returns:
             All dates out of StockDataList as a list of dates
         """
-        return [data[0] for data in self.__stock_data]
+        return self.__dates.tolist()
 
     def get_values(self) -> List[float]:
         """
@@ -130,4 +243,23 @@ class StockData:
         Returns:
             All values out of StockDataList as a list of floats
         """
-        return [data[1] for data in self.__stock_data]
+        return self.__values.tolist()
+
+    def get_dates_array(self) -> numpy.ndarray:
+        """
+        Returns all dates without any conversion
+
+        Returns:
+            A read-only array of dtype `datetime64[D]`
+        """
+        return self.__dates
+
+    def get_values_array(self) -> numpy.ndarray:
+        """
+        Returns all values without any conversion. Slicing this array (e.g. `[-100:]` for the last 100 prices) yields
+        views and doesn't copy any data
+
+        Returns:
+            A read-only array of dtype `float64`
+        """
+        return self.__values
@@ -185,3 +185,43 @@ class TestPortfolio(TestCase):
         portfolio2 = Portfolio(10.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 200)])
 
         assert portfolio1 == portfolio2
+
+    def test_total_value(self):
+        data = StockData([(date(2017, 1, 1), 150.0), (date(2017, 1, 2), 200.0)])
+        stock_market_data = StockMarketData({CompanyEnum.COMPANY_A: data})
+
+        portfolio = Portfolio(10.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 2)])
+
+        assert portfolio.total_value(date(2017, 1, 1), stock_market_data) == 310.0
+        assert portfolio.total_value(date(2017, 1, 2), stock_market_data) == 410.0
+        self.assertRaises(ValueError, portfolio.total_value, date(2017, 1, 3), stock_market_data)
+
+    def test_eq__different_order(self):
+        portfolio1 = Portfolio(10.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 200),
+                                      SharesOfCompany(CompanyEnum.COMPANY_B, 100)])
+        portfolio2 = Portfolio(10.0, [SharesOfCompany(CompanyEnum.COMPANY_B, 100),
+                                      SharesOfCompany(CompanyEnum.COMPANY_A, 200)])
+
+        assert portfolio1 == portfolio2
+
+    def test_get_or_insert(self):
+        portfolio = Portfolio(10.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 200)])
+
+        assert portfolio.get_or_insert(CompanyEnum.COMPANY_A) is portfolio.get_shares(CompanyEnum.COMPANY_A)
+        assert portfolio.get_shares(CompanyEnum.COMPANY_B) is None
+        assert portfolio.get_amount(CompanyEnum.COMPANY_B) == 0
+
+        portfolio.get_or_insert(CompanyEnum.COMPANY_B).amount = 5
+        assert portfolio.get_amount(CompanyEnum.COMPANY_B) == 5
+        assert [share.company_enum for share in portfolio.shares] == [CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B]
+
+    def test_shares__read_only(self):
+        portfolio = Portfolio(10.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 200)])
+
+        self.assertRaises(AttributeError, lambda: portfolio.shares.append(SharesOfCompany(CompanyEnum.COMPANY_B, 5)))
+        portfolio.shares[0].amount = 100
+        assert portfolio.get_amount(CompanyEnum.COMPANY_A) == 100
+
+    def test_shares__duplicate_company(self):
+        self.assertRaises(ValueError, Portfolio, 10.0, [SharesOfCompany(CompanyEnum.COMPANY_A, 200),
+                                                        SharesOfCompany(CompanyEnum.COMPANY_A, 100)])
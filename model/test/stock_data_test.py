@@ -25,3 +25,81 @@ class TestStockData(TestCase):
         old_implementation = np.array([[x[1] for x in iter(get_test_data())]])[0].tolist()
 
         assert get_test_data().get_values() == old_implementation
+
+    def test_get_dates_array(self):
+        dates = get_test_data().get_dates_array()
+
+        assert dates.dtype == np.dtype('datetime64[D]')
+        assert dates.tolist() == [date(2017, 1, 1), date(2017, 1, 2)]
+
+    def test_get_values_array(self):
+        values = get_test_data().get_values_array()
+
+        assert values.dtype == np.float64
+        assert values[-1:].tolist() == [200.0]
+        assert not values.flags.writeable
+
+    def test_from_arrays(self):
+        stock_data = StockData.from_arrays(np.array(['2017-01-01', '2017-01-02'], dtype='datetime64[D]'),
+                                           np.array([150.0, 200.0]))
+
+        assert list(stock_data) == list(get_test_data())
+        assert stock_data.get_last() == (date(2017, 1, 2), 200.0)
+
+    def test_from_arrays__caller_arrays_stay_writeable(self):
+        dates = np.array(['2017-01-01', '2017-01-02'], dtype='datetime64[D]')
+        values = np.array([150.0, 200.0])
+        stock_data = StockData.from_arrays(dates, values)
+
+        assert dates.flags.writeable and values.flags.writeable
+        assert not stock_data.get_dates_array().flags.writeable
+        assert not stock_data.get_values_array().flags.writeable
+        # The data is shared, not copied
+        assert np.shares_memory(stock_data.get_values_array(), values)
+
+    def test_append(self):
+        stock_data = StockData([])
+        stock_data.append((date(2017, 1, 1), 150.0))
+        stock_data.append((date(2017, 1, 2), 200.0))
+
+        assert stock_data.get_row_count() == 2
+        assert stock_data.get_first() == (date(2017, 1, 1), 150.0)
+        assert stock_data.index((date(2017, 1, 2), 200.0)) == 1
+
+    def test_view_to_offset(self):
+        stock_data = get_test_data()
+        view = stock_data.view_to_offset(-1)
+
+        assert view.get_row_count() == 1
+        assert view.get_last() == (date(2017, 1, 1), 150.0)
+        assert np.shares_memory(view.get_values_array(), stock_data.get_values_array())
+
+    def test_view_to_offset__append_does_not_touch_origin(self):
+        stock_data = get_test_data()
+        view = stock_data.view_to_offset(1)
+        view.append((date(2017, 1, 3), 250.0))
+
+        assert view.get_values() == [150.0, 250.0]
+        assert stock_data.get_values() == [150.0, 200.0]
+
+    def test_get_index_by_date(self):
+        stock_data = get_test_data()
+
+        assert stock_data.get_index_by_date(date(2017, 1, 1)) == 0
+        assert stock_data.get_index_by_date(date(2017, 1, 2)) == 1
+        assert stock_data.get_index_by_date(date(2017, 1, 3)) is None
+
+    def test_get_value_by_date(self):
+        stock_data = get_test_data()
+
+        assert stock_data.get_value_by_date(date(2017, 1, 2)) == 200.0
+        assert stock_data.get_value_by_date(date(2016, 12, 31)) is None
+
+    def test_get_value_by_date__view(self):
+        view = get_test_data().view_to_offset(1)
+
+        assert view.get_value_by_date(date(2017, 1, 1)) == 150.0
+        assert view.get_value_by_date(date(2017, 1, 2)) is None
+
+        view.append((date(2017, 1, 3), 250.0))
+        assert view.get_index_by_date(date(2017, 1, 3)) == 1
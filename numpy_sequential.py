@@ -0,0 +1,287 @@
+'''
+Inference of stored Keras Sequential networks with NumPy only
+'''
+import json
+import os
+from typing import Callable, Dict, List
+
+import numpy
+
+from definitions import ROOT_DIR
+from logger import logger
+
+Layer = Callable[[numpy.ndarray], numpy.ndarray]
+
+
+def __sigmoid(x: numpy.ndarray) -> numpy.ndarray:
+    numpy.negative(x, out=x)
+    numpy.exp(x, out=x)
+    x += 1.0
+    return numpy.reciprocal(x, out=x)
+
+
+def __softmax(x: numpy.ndarray) -> numpy.ndarray:
+    x -= numpy.max(x, axis=-1, keepdims=True)
+    numpy.exp(x, out=x)
+    x /= numpy.sum(x, axis=-1, keepdims=True)
+    return x
+
+
+# Activation functions supported for `Dense` and `Activation` layers. All of them may work in-place
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: numpy.maximum(x, 0.0, out=x),
+    'sigmoid': __sigmoid,
+    'hard_sigmoid': lambda x: numpy.clip(x * numpy.float32(0.2) + numpy.float32(0.5), 0.0, 1.0),
+    'tanh': lambda x: numpy.tanh(x, out=x),
+    'softplus': lambda x: numpy.logaddexp(x, 0.0, out=x),
+    'softmax': __softmax,
+}
+
+
+class NumpySequential:
+    """
+    Evaluates a trained Keras `Sequential` network with NumPy only. It supports stacks of `Dense`, `BatchNormalization`,
+    `Activation`, `ReLU`, `LeakyReLU` and `Dropout` layers - everything the networks of this project consist of.
+
+    Objects of this class offer the same `predict` method as Keras models, so they can replace those whenever a trained
+    network is only used for predictions. The weights are kept in `float32` like in Keras, and a `BatchNormalization`
+    layer directly following a `Dense` layer is merged into this layer's weights. A single prediction therefore costs
+    only a few matrix multiplications instead of a TensorFlow session run
+    """
+
+    def __init__(self, layers: List[Layer]):
+        """
+        Constructor
+
+        Args:
+            layers: The functions to apply one after the other. Each takes and returns a `float32` array. The functions
+             may change the given array in-place
+        """
+        self.layers = layers
+
+    @classmethod
+    def from_config(cls, layer_configs: List[Dict], weights: Dict[str, List[numpy.ndarray]]):
+        """
+        Creates the network from the layer configurations of a Keras `Sequential` and the layers' weights
+
+        Args:
+            layer_configs: The layer configurations as found in the model JSON. Structure: `[{'class_name': ...,
+             'config': {...}}]`
+            weights: The weights of each layer by layer name in the order Keras stores them
+
+        Returns:
+            The created network
+
+        Raises:
+            ValueError: If a layer or an activation function is not supported
+        """
+        layers = []
+        # The weights of the last `Dense` layer as long as they may still be merged with a `BatchNormalization` layer
+        dense = None
+
+        for layer_config in layer_configs:
+            class_name, config = layer_config['class_name'], layer_config['config']
+            layer_weights = weights.get(config['name'], [])
+
+            if class_name == 'BatchNormalization' and dense is not None:
+                kernel, bias = dense
+                scale, shift = cls.__get_normalization(config, layer_weights)
+                dense = (kernel * scale, bias * scale + shift)
+                continue
+
+            if dense is not None:
+                layers.append(cls.__create_dense(*dense))
+                dense = None
+
+            if class_name == 'Dense':
+                kernel = layer_weights[0].astype('float32')
+                bias = layer_weights[1].astype('float32') if config.get('use_bias', True) \
+                    else numpy.zeros(kernel.shape[1], dtype='float32')
+                activation = config.get('activation', 'linear')
+                if activation == 'linear':
+                    # Keep the weights back, a following `BatchNormalization` layer may be merged into them
+                    dense = (kernel, bias)
+                else:
+                    layers.append(cls.__create_dense(kernel, bias))
+                    layers.append(cls.__get_activation(activation))
+            elif class_name == 'BatchNormalization':
+                scale, shift = cls.__get_normalization(config, layer_weights)
+                layers.append(cls.__create_normalization(scale, shift))
+            elif class_name == 'Activation':
+                layers.append(cls.__get_activation(config['activation']))
+            elif class_name in ('ReLU', 'LeakyReLU'):
+                alpha = numpy.float32(config.get('alpha', config.get('negative_slope', 0.0)))
+                layers.append(cls.__create_leaky_relu(alpha))
+            elif class_name not in ('Dropout', 'InputLayer'):
+                raise ValueError(f"Layer {class_name} is not supported")
+
+        if dense is not None:
+            layers.append(cls.__create_dense(*dense))
+
+        return cls(layers)
+
+    @staticmethod
+    def __create_dense(kernel: numpy.ndarray, bias: numpy.ndarray) -> Layer:
+        kernel = kernel.astype('float32')
+        bias = bias.astype('float32')
+        kernel.setflags(write=False)
+        bias.setflags(write=False)
+
+        def dense(x: numpy.ndarray) -> numpy.ndarray:
+            y = numpy.dot(x, kernel)
+            y += bias
+            return y
+
+        return dense
+
+    @staticmethod
+    def __create_normalization(scale: numpy.ndarray, shift: numpy.ndarray) -> Layer:
+        scale.setflags(write=False)
+        shift.setflags(write=False)
+
+        def normalization(x: numpy.ndarray) -> numpy.ndarray:
+            x *= scale
+            x += shift
+            return x
+
+        return normalization
+
+    @staticmethod
+    def __create_leaky_relu(alpha: numpy.float32) -> Layer:
+        def leaky_relu(x: numpy.ndarray) -> numpy.ndarray:
+            return numpy.maximum(x, x * alpha, out=x) if alpha <= 1.0 else numpy.minimum(x, x * alpha, out=x)
+
+        return leaky_relu
+
+    @staticmethod
+    def __get_activation(name: str) -> Layer:
+        if name not in ACTIVATIONS:
+            raise ValueError(f"Activation {name} is not supported")
+        return ACTIVATIONS[name]
+
+    @staticmethod
+    def __get_normalization(config: Dict, weights: List[numpy.ndarray]):
+        """
+        Converts the weights of a `BatchNormalization` layer into a factor and a summand, as it works like
+        `x * scale + shift` at inference time
+
+        Args:
+            config: The layer's configuration
+            weights: The layer's weights in Keras' order: gamma (if `scale`), beta (if `center`), moving mean and
+             moving variance
+
+        Returns:
+            The factor and the summand
+        """
+        weights = list(weights)
+        gamma = weights.pop(0) if config.get('scale', True) else 1.0
+        beta = weights.pop(0) if config.get('center', True) else 0.0
+        moving_mean, moving_variance = weights
+        scale = (gamma / numpy.sqrt(moving_variance + config.get('epsilon', 1e-3))).astype('float32')
+        shift = (beta - moving_mean * scale).astype('float32')
+        return scale, shift
+
+    def predict(self, inputs, batch_size: int = None, verbose: int = 0) -> numpy.ndarray:
+        """
+        Computes the network's output for the given inputs. The parameters `batch_size` and `verbose` only exist for
+        compatibility with Keras' `predict` and are ignored
+
+        Args:
+            inputs: The inputs. Shape: `(samples, input size)`
+
+        Returns:
+            The outputs as `float32` array of shape `(samples, output size)`
+        """
+        x = numpy.array(inputs, dtype='float32', ndmin=2)
+        for layer in self.layers:
+            x = layer(x)
+        return x
+
+
+"""
+Process-wide registry of already loaded networks.
+Structure: {(json path, h5 path) => (tuple of file stats, NumpySequential)}
+"""
+__numpy_sequential_registry = {}
+
+
+def load_numpy_sequential(relative_path: str, file_name_without_extension: str,
+                          use_cache: bool = True) -> NumpySequential:
+    """
+    Loads a Keras Sequential neural network stored by `utils#save_keras_sequential` for inference with NumPy.
+    Neither Keras nor TensorFlow are needed for this
+
+    Args:
+        relative_path : relative path in project
+        file_name_without_extension : file name without extension, will be used for json with models and h5 with weights.
+        use_cache: Whether to use the process-wide registry of already loaded networks. Each network is then read only
+         once per process (until one of its files changes) and all callers share the same read-only object.
+         Default: `True`
+    Returns:
+        NumpySequential, or None if nothing found or error
+    """
+    model_filename_with_path = os.path.join(ROOT_DIR, relative_path, file_name_without_extension + '.json')
+    weights_filename_with_path = os.path.join(ROOT_DIR, relative_path, file_name_without_extension + '.h5')
+
+    if not os.path.exists(model_filename_with_path) or not os.path.exists(weights_filename_with_path):
+        logger.error(f"load_numpy_sequential: model File {model_filename_with_path} "
+                     f"or weights file {weights_filename_with_path} not found!")
+        return None
+
+    if not use_cache:
+        return __read_numpy_sequential(model_filename_with_path, weights_filename_with_path)
+
+    key = (model_filename_with_path, weights_filename_with_path)
+    file_stats = tuple((file_stat.st_size, file_stat.st_mtime_ns) for file_stat in map(os.stat, key))
+    registry_entry = __numpy_sequential_registry.get(key)
+    if registry_entry is not None and registry_entry[0] == file_stats:
+        logger.debug(f"load_numpy_sequential: Reusing Sequential from {model_filename_with_path}")
+        return registry_entry[1]
+
+    model = __read_numpy_sequential(model_filename_with_path, weights_filename_with_path)
+    if model is not None:
+        __numpy_sequential_registry[key] = (file_stats, model)
+    return model
+
+
+def __read_numpy_sequential(model_filename_with_path: str, weights_filename_with_path: str) -> NumpySequential:
+    """
+    Reads a network from the given files, see `load_numpy_sequential`. The weights of the returned network are
+    read-only, so it may be shared
+
+    Args:
+        model_filename_with_path: The path of the json file
+        weights_filename_with_path: The path of the h5 file
+    Returns:
+        NumpySequential, or None if error
+    """
+    try:
+        import h5py
+
+        with open(model_filename_with_path, 'r') as json_file:
+            model_config = json.load(json_file)
+        layer_configs = model_config['config']
+        if isinstance(layer_configs, dict):
+            layer_configs = layer_configs['layers']
+
+        weights = {}
+        with h5py.File(weights_filename_with_path, 'r') as weights_file:
+            if 'model_weights' in weights_file:
+                weights_file = weights_file['model_weights']
+            for layer_name in weights_file.attrs['layer_names']:
+                layer_name = __decode(layer_name)
+                group = weights_file[layer_name]
+                weights[layer_name] = [group[__decode(weight_name)][()] for weight_name in group.attrs['weight_names']]
+
+        model = NumpySequential.from_config(layer_configs, weights)
+        logger.info(f"load_numpy_sequential: Loaded Sequential from {model_filename_with_path} "
+                    f"and {weights_filename_with_path}!")
+        return model
+    except Exception:
+        logger.error(f"load_numpy_sequential: Loading of Sequential {model_filename_with_path} failed!")
+        return None
+
+
+def __decode(name) -> str:
+    return name.decode('utf8') if isinstance(name, bytes) else name
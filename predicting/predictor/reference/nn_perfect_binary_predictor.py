@@ -8,12 +8,11 @@ import numpy as np
 
 from model.StockData import StockData
 from predicting.predictor.reference.predictor_utils import create_model, LOSS_FUNCTION, OPTIMIZER, \
-    calculate_delta, get_data, INPUT_SIZE
-from utils import load_keras_sequential, save_keras_sequential, read_stock_market_data
+    calculate_delta, get_data, INPUT_SIZE, get_network_key, precompute_outputs, get_precomputed_output
+from utils import save_keras_sequential, read_stock_market_data
+from numpy_sequential import load_numpy_sequential
 from model.CompanyEnum import CompanyEnum
 from logger import logger
-from matplotlib import pyplot as plt
-from keras.callbacks import ReduceLROnPlateau
 from definitions import PERIOD_1, PERIOD_2, PERIOD_3
 
 MODEL_FILE_NAME_STOCK_A = 'nn_perfect_binary_predictor_stock_a_network'
@@ -33,16 +32,17 @@ class BaseNnPerfectBinaryPredictor(IPredictor):
         Args:
             nn_filename: The filename to load the trained data from
         """
-        # Try loading a stored trained neural network...
+        # Try loading a stored trained neural network for inference with NumPy...
         self.trained = True
-        self.model = load_keras_sequential(RELATIVE_PATH, nn_filename)
+        self.model = load_numpy_sequential(RELATIVE_PATH, nn_filename)
+        # Outputs of the trained network are shared by all predictors using the same stored network
+        self.network_key = None if self.model is None else get_network_key(RELATIVE_PATH, nn_filename)
         # ... if that wasn't possible, then create a new untrained one
         if self.model is None:
             logger.warn(f"Loading of trained neural network failed, creating a new untrained one.")
             self.trained = False
             self.model = create_model()
-
-        self.model.compile(loss=LOSS_FUNCTION, optimizer=OPTIMIZER)
+            self.model.compile(loss=LOSS_FUNCTION, optimizer=OPTIMIZER)
 
     def doPredict(self, data: StockData) -> float:
         """
@@ -57,19 +57,19 @@ class BaseNnPerfectBinaryPredictor(IPredictor):
         # Assumptions about data: at least INPUT_SIZE pairs of type (_, float)
         assert data is not None and data.get_row_count() >= INPUT_SIZE
 
+        # Use the output computed by `precompute` if there is one
+        prediction = get_precomputed_output(self.network_key, data)
+        if prediction is not None:
+            return data.get_last()[1] + calculate_delta(prediction)
+
         # Extract last INPUT_SIZE floats (here: stock values) as input for neural network
         # (format: numpy array of arrays)
-        input_values = np.array([[x[1] for x in data.get_from_offset(-INPUT_SIZE)]])
+        last_prices = data.get_values_array()[-INPUT_SIZE:]
 
-        normalized_prices = []
+        vector_min = np.min(last_prices)
+        vector_max = np.max(last_prices)
 
-        vector_min = np.min(input_values)
-        vector_max = np.max(input_values)
-
-        for price in input_values:
-            normalized_prices.append((price - vector_min) / (vector_max - vector_min))
-
-        input_values = np.asarray(normalized_prices)
+        input_values = ((last_prices - vector_min) / (vector_max - vector_min)).reshape(1, INPUT_SIZE)
 
         try:
             # Let network predict the next stock value based on last 100 stock values
@@ -79,6 +79,18 @@ class BaseNnPerfectBinaryPredictor(IPredictor):
             logger.error("Error in predicting next stock value.")
             assert False
 
+    def precompute(self, data: StockData):
+        """
+        Runs the trained neural network once over all days of `data`, so that `doPredict` answers from the outputs
+        computed here. The outputs are shared by all predictors using the same stored network, e.g. by the traders of
+        repeated training episodes. Does nothing if the network isn't trained
+
+        Args:
+          data: The historical stock values of a company
+        """
+        if self.network_key is not None and data is not None:
+            precompute_outputs(self.model, self.network_key, data)
+
 
 class StockANnPerfectBinaryPredictor(BaseNnPerfectBinaryPredictor):
     """
@@ -117,6 +129,9 @@ def learn_nn_and_save(data: StockData, filename_to_save: str):
         data: The data to train on
         filename_to_save: The filename to save the trained NN to
     """
+    from keras.callbacks import ReduceLROnPlateau
+    from matplotlib import pyplot as plt
+
     dates = data.get_dates()
     prices = data.get_values()
 
@@ -7,12 +7,14 @@ from model.IPredictor import IPredictor
 import numpy as np
 
 from model.StockData import StockData
-from utils import load_keras_sequential, save_keras_sequential, read_stock_market_data
+from utils import save_keras_sequential, read_stock_market_data
+from numpy_sequential import load_numpy_sequential
 from model.CompanyEnum import CompanyEnum
 from logger import logger
-from matplotlib import pyplot as plt
-from keras.models import Sequential
-from keras.layers import Dense
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from keras.models import Sequential
 
 RELATIVE_PATH = 'predicting/predictor/reference/nn_value_predictor'
 MODEL_FILE_NAME_STOCK_A = 'nn_value_predictor_stock_a_network'
@@ -31,16 +33,15 @@ class BaseNnValuePredictor(IPredictor):
         Args:
             nn_filename: The filename to load the trained data from
         """
-        # Try loading a stored trained neural network...
+        # Try loading a stored trained neural network for inference with NumPy...
         self.trained = True
-        self.model = load_keras_sequential(RELATIVE_PATH, nn_filename)
+        self.model = load_numpy_sequential(RELATIVE_PATH, nn_filename)
         # ... if that wasn't possible, then create a new untrained one
         if self.model is None:
             logger.warn(f"Loading of trained neural network failed, creating a new untrained one.")
             self.trained = False
             self.model = create_model()
-
-        self.model.compile(loss='mean_squared_error', optimizer='adam')
+            self.model.compile(loss='mean_squared_error', optimizer='adam')
 
     def doPredict(self, data: StockData) -> float:
         """ Use the loaded trained neural network to predict the next stock value.
@@ -55,7 +56,7 @@ class BaseNnValuePredictor(IPredictor):
         assert data is not None and data.get_row_count() >= 100
 
         # Extract last 100 floats (here: stock values) as input for neural network (format: numpy array of arrays)
-        input_values = np.array([[x[1] for x in data.get_from_offset(-100)]])
+        input_values = data.get_values_array()[-100:].reshape(1, 100)
 
         try:
             # Let network predict the next stock value based on last 100 stock values
@@ -101,6 +102,8 @@ def learn_nn_and_save(data: StockData, filename_to_save: str):
         data: The data to train on
         filename_to_save: The filename to save the trained NN to
     """
+    from matplotlib import pyplot as plt
+
     dates = data.get_dates()
     prices = data.get_values()
 
@@ -141,7 +144,10 @@ def learn_nn_and_save(data: StockData, filename_to_save: str):
     save_keras_sequential(network, RELATIVE_PATH, filename_to_save)
 
 
-def create_model() -> Sequential:
+def create_model() -> 'Sequential':
+    from keras.models import Sequential
+    from keras.layers import Dense
+
     network = Sequential()
     network.add(Dense(500, activation='relu', input_dim=100))
     network.add(Dense(500, activation='relu'))
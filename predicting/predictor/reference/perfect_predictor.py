@@ -18,20 +18,29 @@ class PerfectPredictor(IPredictor):
     This predictor perfectly predicts the next stock price because it cheats.
     """
 
-    def __init__(self, company: CompanyEnum):
+    def __init__(self, company: CompanyEnum, stock_data: StockData = None):
         """
         Constructor:
             Load all available stock data for the given company.
 
         Args:
             company: The company whose stock values we should predict.
+            stock_data: The stock data to take the future values from, e.g. synthetic data. Default: None, which
+             loads all available stock data of `company`
         """
         # This predictor is for stock A or stock B only!
         assert company in list(CompanyEnum)
 
         # Load all stock data for the given company
-        stock_market_data = read_stock_market_data([company], [PERIOD_1, PERIOD_2, PERIOD_3])
-        self.stock_data = stock_market_data[company]
+        if stock_data is None:
+            stock_market_data = read_stock_market_data([company], [PERIOD_1, PERIOD_2, PERIOD_3])
+            stock_data = stock_market_data[company]
+        self.stock_data = stock_data
+
+        # Precompute the next stock value for each date, so that each prediction is a constant-time lookup
+        dates = self.stock_data.get_dates()
+        values = self.stock_data.get_values()
+        self.next_values = dict(zip(reversed(dates[:-1]), reversed(values[1:])))
 
     def doPredict(self, data: StockData) -> float:
         """
@@ -47,9 +56,8 @@ class PerfectPredictor(IPredictor):
         assert data is not None and data.get_row_count() > 0
 
         (current_date, current_value) = data.get_last()
-        index = self.stock_data.index((current_date, current_value))
-        if index is not None and index < self.stock_data.get_row_count() - 1:
-            (_, next_value) = self.stock_data.get(index + 1)
+        next_value = self.next_values.get(current_date)
+        if next_value is not None:
             return next_value
         else:
             logger.error(f"Couldn't make a perfect prediction for the day after {current_date}")
@@ -1,8 +1,15 @@
-from typing import List
+import itertools
+import os
+from typing import Hashable, List, Optional, TYPE_CHECKING
 
 import numpy as np
-from keras import Sequential
-from keras.layers import Dense, BatchNormalization, LeakyReLU
+from numpy.lib.stride_tricks import as_strided
+
+from definitions import ROOT_DIR
+from model.StockData import StockData
+
+if TYPE_CHECKING:
+    from keras import Sequential
 
 # Neural network configuration
 INPUT_SIZE = 400
@@ -14,75 +21,191 @@ LOSS_FUNCTION = 'binary_crossentropy'
 OPTIMIZER = 'rmsprop'
 METRICS = ['accuracy']
 
+# Number of windows normalized at once by `get_data` and `precompute_outputs`. This bounds the size of temporary
+# float64 arrays
+NORMALIZATION_CHUNK_SIZE = 1024
+
+# The maximal number of outputs kept per network by `precompute_outputs`. The oldest ones are dropped beyond it
+MAX_PRECOMPUTED_OUTPUTS = 100000
 
-def get_data(prices: List[float]):
+# Network outputs computed in advance by `precompute_outputs`, shared by all predictors using the same stored network.
+# Structure: {network key: {(date of the window's last price, hash of the window's prices): network output}}
+__precomputed_outputs = {}
+
+
+def get_data(prices: List[float], input_size: int = INPUT_SIZE):
     """
-    Generates training or test data for the given `prices`
+    Generates training or test data for the given `prices`. Each window of `input_size` consecutive prices is
+    normalized to [0, 1] and labeled with the direction of the following price.
+    The windows are strided views on `prices`, so only the normalized float32 matrix is allocated in full
+
     Args:
         prices: The prices to generate training or test data from
+        input_size: The number of prices per window. Default: `INPUT_SIZE`
 
     Returns:
-        Three lists:
-         * current_prices_for_plot
-         * input_prices
-         * wanted_results
+        Three arrays:
+         * current_prices_for_plot: The price following each window. Shape: `(windows,)`
+         * input_prices: The normalized windows as float32 matrix. Shape: `(windows, input_size)`
+         * wanted_results: 0.0 (sell), 0.5 or 1.0 (buy) for each window. Shape: `(windows,)`
     """
+    prices = np.asarray(prices, dtype='float64')
+    window_count = max(len(prices) - input_size, 0)
+    windows = __get_windows(prices, window_count, input_size)
 
-    input_prices, current_prices_for_plot, wanted_results = [], [], []
+    # Normalize in chunks, so that the float64 intermediate results stay small
+    input_prices = np.empty((window_count, input_size), dtype='float32')
+    for start in range(0, window_count, NORMALIZATION_CHUNK_SIZE):
+        input_prices[start:start + NORMALIZATION_CHUNK_SIZE] = \
+            __normalize_windows(windows[start:start + NORMALIZATION_CHUNK_SIZE])
 
-    for i in range(0, len(prices) - INPUT_SIZE):
-        last_price_vector = prices[i:INPUT_SIZE + i]
+    current_prices_for_plot = prices[input_size:]
+    delta = current_prices_for_plot - prices[input_size - 1:-1]
 
-        normalized_prices = []
+    wanted_results = np.full(window_count, 0.5, dtype='float32')
+    # Sell
+    wanted_results[delta <= -0.0000001] = 0.0
+    # Buy
+    wanted_results[delta >= 0.0000001] = 1.0
 
-        vector_min = np.min(last_price_vector)
-        vector_max = np.max(last_price_vector)
+    return current_prices_for_plot, input_prices, wanted_results
 
-        for price in last_price_vector:
-            normalized_prices.append((price - vector_min) / (vector_max - vector_min))
 
-        last_price_vector = normalized_prices
+def get_network_key(relative_path: str, file_name_without_extension: str) -> Hashable:
+    """
+    Identifies a stored network for `precompute_outputs` and `get_precomputed_output`. The key contains the
+    modification time of the weights file, so outputs of a network are not reused once it has been trained again
 
-        input_prices.append(last_price_vector)
+    Args:
+        relative_path: relative path in project
+        file_name_without_extension: file name without extension of the network's json and h5 files
 
-        current_price = prices[INPUT_SIZE + i]
-        current_prices_for_plot.append(current_price)
+    Returns:
+        The key of the network
+    """
+    weights_filename_with_path = os.path.join(ROOT_DIR, relative_path, file_name_without_extension + '.h5')
+    return weights_filename_with_path, os.path.getmtime(weights_filename_with_path)
 
-        previous_price = prices[INPUT_SIZE + i - 1]
 
-        delta = (current_price - previous_price)
+def precompute_outputs(model, network_key: Hashable, data: StockData, input_size: int = INPUT_SIZE):
+    """
+    Runs the given network once over all windows of `input_size` consecutive prices in `data` and keeps its outputs by
+    the date of each window's last price and a hash of the window's prices. Afterwards `get_precomputed_output` answers
+    for every day of `data` without running the network again. Windows whose outputs are already known are skipped, so
+    calling this once per episode or per trader is cheap. At most `MAX_PRECOMPUTED_OUTPUTS` outputs are kept per
+    network
 
-        direction = 0.5
-        if delta <= -0.0000001:
-            # Sell
-            direction = 0.0
-        elif delta >= 0.0000001:
-            # Buy
-            direction = 1.0
+    Args:
+        model: The network. Anything with a Keras-like `predict` method
+        network_key: The key of the network as returned by `get_network_key`
+        data: The stock data to compute the outputs for
+        input_size: The number of prices per window. Default: `INPUT_SIZE`
+    """
+    prices = np.asarray(data.get_values_array(), dtype='float64')
+    window_count = max(len(prices) - input_size + 1, 0)
+    dates = data.get_dates_array()[input_size - 1:].tolist()
 
-        wanted_results.append(direction)
+    # Row `i` is the window ending with the price of `dates[i]`
+    windows = __get_windows(prices, window_count, input_size)
+    keys = [(date, __hash_window(window)) for date, window in zip(dates, windows)]
 
-    return current_prices_for_plot, input_prices, wanted_results
+    outputs = __precomputed_outputs.setdefault(network_key, {})
+    missing = [row for row, key in enumerate(keys) if key not in outputs]
+    if not missing:
+        return
 
+    for start in range(0, len(missing), NORMALIZATION_CHUNK_SIZE):
+        chunk_rows = missing[start:start + NORMALIZATION_CHUNK_SIZE]
+        input_prices = __normalize_windows(windows[chunk_rows])
+        predictions = model.predict(input_prices, batch_size=NORMALIZATION_CHUNK_SIZE)[:, 0].tolist()
+        for row, prediction in zip(chunk_rows, predictions):
+            outputs[keys[row]] = prediction
 
-def create_model() -> Sequential:
+    # Dicts keep their insertion order, so the oldest outputs come first
+    for key in list(itertools.islice(outputs, max(len(outputs) - MAX_PRECOMPUTED_OUTPUTS, 0))):
+        del outputs[key]
+
+
+def get_precomputed_output(network_key: Hashable, data: StockData, input_size: int = INPUT_SIZE) -> Optional[float]:
+    """
+    Looks up the output of the given network for the window of the last `input_size` rows of `data`. An output only
+    counts if it was computed for a window of the same date and prices, so outputs computed for other data of the same
+    dates are not returned
+
+    Args:
+        network_key: The key of the network as returned by `get_network_key`
+        data: The stock data to predict the next value for
+        input_size: The number of prices per window. Default: `INPUT_SIZE`
+
+    Returns:
+        The network's output, or None if it has not been computed by `precompute_outputs`
+    """
+    outputs = __precomputed_outputs.get(network_key)
+    if not outputs or data.get_row_count() < input_size:
+        return None
+
+    window = np.asarray(data.get_values_array()[-input_size:], dtype='float64')
+    return outputs.get((data.get_last()[0], __hash_window(window)))
+
+
+def clear_precomputed_outputs():
+    """
+    Forgets all outputs computed by `precompute_outputs`
+    """
+    __precomputed_outputs.clear()
+
+
+def __hash_window(window: np.ndarray) -> int:
+    """
+    Hashes the prices of a window, which identifies it together with the date of its last price
+    """
+    return hash(window.tobytes())
+
+
+def __get_windows(prices: np.ndarray, window_count: int, input_size: int) -> np.ndarray:
+    """
+    Returns a read-only view on `prices` whose row `i` is `prices[i:i + input_size]`, without copying anything
+    """
+    return as_strided(prices, shape=(window_count, input_size), strides=(prices.strides[0], prices.strides[0]),
+                      writeable=False)
+
+
+def __normalize_windows(windows: np.ndarray) -> np.ndarray:
+    """
+    Normalizes each row of `windows` to [0, 1] like the predictors do before asking their network
+    """
+    vector_min = windows.min(axis=1, keepdims=True)
+    vector_max = windows.max(axis=1, keepdims=True)
+    return ((windows - vector_min) / (vector_max - vector_min)).astype('float32')
+
+
+def create_model(input_size: int = INPUT_SIZE, first_layer_size: int = FIRST_LAYER_SIZE,
+                 second_layer_size: int = SECOND_LAYER_SIZE) -> 'Sequential':
     # Shape and configuration of network is optimized for binary classification problems
     # see: https://keras.io/getting-started/sequential-model-guide/
     """
     Creates a neural network model
 
+    Args:
+        input_size: The number of prices per input window. Default: `INPUT_SIZE`
+        first_layer_size: The size of the first hidden layer. Default: `FIRST_LAYER_SIZE`
+        second_layer_size: The size of the second hidden layer. Default: `SECOND_LAYER_SIZE`
+
     Returns:
         The created network
     """
+    from keras import Sequential
+    from keras.layers import Dense, BatchNormalization, LeakyReLU
+
     network = Sequential()
 
     # Input layer and first hidden layer
-    network.add(Dense(FIRST_LAYER_SIZE, input_dim=INPUT_SIZE))
+    network.add(Dense(first_layer_size, input_dim=input_size))
     network.add(BatchNormalization())
     network.add(LeakyReLU())
 
     # Second hidden layer
-    network.add(Dense(SECOND_LAYER_SIZE))
+    network.add(Dense(second_layer_size))
     network.add(BatchNormalization())
     network.add(LeakyReLU())
 
@@ -9,10 +9,12 @@ from model.StockData import StockData
 from utils import load_keras_sequential, save_keras_sequential, read_stock_market_data
 from model.CompanyEnum import CompanyEnum
 from logger import logger
-from matplotlib import pyplot as plt
-from keras.models import Sequential
 from definitions import PERIOD_1, PERIOD_2
-from keras.callbacks import History
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from keras.models import Sequential
+    from keras.callbacks import History
 
 TEAM_NAME = "team_green"
 
@@ -95,7 +97,9 @@ def learn_nn_and_save(training_data: StockData, test_data: StockData, filename_t
     save_keras_sequential(network, RELATIVE_PATH, filename_to_save)
 
 
-def create_model() -> Sequential:
+def create_model() -> 'Sequential':
+    from keras.models import Sequential
+
     network = Sequential()
 
     # TODO: build model
@@ -103,7 +107,9 @@ def create_model() -> Sequential:
     return network
 
 
-def draw_history(history: History):
+def draw_history(history: 'History'):
+    from matplotlib import pyplot as plt
+
     plt.figure()
     plt.plot(history.history['loss'])
     plt.title('training loss / testing loss by epoch')
@@ -113,6 +119,8 @@ def draw_history(history: History):
 
 
 def draw_prediction(dates: list, awaited_results: list, prediction_results: list):
+    from matplotlib import pyplot as plt
+
     plt.figure()
 
     plt.plot(dates[INPUT_SIZE:], awaited_results, color="black")  # current prices in reality
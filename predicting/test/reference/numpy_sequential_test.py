@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from numpy_sequential import NumpySequential, load_numpy_sequential
+from definitions import ROOT_DIR
+from predicting.predictor.reference.nn_binary_predictor import RELATIVE_PATH, MODEL_FILE_NAME_STOCK_A
+from predicting.predictor.reference.predictor_utils import INPUT_SIZE
+
+
+def dense(name, units, activation='linear'):
+    return {'class_name': 'Dense', 'config': {'name': name, 'units': units, 'activation': activation}}
+
+
+def batch_normalization(name):
+    return {'class_name': 'BatchNormalization', 'config': {'name': name, 'epsilon': 0.001}}
+
+
+def leaky_re_lu(name):
+    return {'class_name': 'LeakyReLU', 'config': {'name': name, 'alpha': 0.3}}
+
+
+class NumpySequentialTest(unittest.TestCase):
+    def testPredict(self):
+        random = np.random.RandomState(42)
+        layer_configs = [dense('dense_1', 8), batch_normalization('bn_1'), leaky_re_lu('leaky_1'),
+                         dense('dense_2', 4, 'relu'), dense('dense_3', 1, 'sigmoid')]
+        weights = {
+            'dense_1': [random.randn(5, 8), random.randn(8)],
+            'bn_1': [random.rand(8) + 0.5, random.randn(8), random.randn(8), random.rand(8) + 0.1],
+            'dense_2': [random.randn(8, 4), random.randn(4)],
+            'dense_3': [random.randn(4, 1), random.randn(1)],
+        }
+        inputs = random.rand(3, 5)
+
+        # Straightforward implementation of the layers
+        x = inputs.dot(weights['dense_1'][0]) + weights['dense_1'][1]
+        gamma, beta, mean, variance = weights['bn_1']
+        x = (x - mean) / np.sqrt(variance + 0.001) * gamma + beta
+        x = np.where(x > 0, x, 0.3 * x)
+        x = np.maximum(x.dot(weights['dense_2'][0]) + weights['dense_2'][1], 0.0)
+        expected = 1.0 / (1.0 + np.exp(-(x.dot(weights['dense_3'][0]) + weights['dense_3'][1])))
+
+        model = NumpySequential.from_config(layer_configs, weights)
+        outputs = model.predict(inputs)
+
+        self.assertEqual(outputs.dtype, np.float32)
+        np.testing.assert_allclose(outputs, expected, rtol=1e-5)
+        np.testing.assert_allclose(model.predict(inputs[0]), expected[:1], rtol=1e-5)
+
+    def testUnsupportedLayer(self):
+        self.assertRaises(ValueError, NumpySequential.from_config, [{'class_name': 'LSTM', 'config': {'name': 'x'}}],
+                          {})
+        self.assertRaises(ValueError, NumpySequential.from_config, [dense('dense_1', 1, 'selu')],
+                          {'dense_1': [np.ones((1, 1)), np.ones(1)]})
+
+    def testLoadStoredNetwork(self):
+        model = load_numpy_sequential(RELATIVE_PATH, MODEL_FILE_NAME_STOCK_A)
+        self.assertIsNotNone(model)
+
+        outputs = model.predict(np.linspace(0.0, 1.0, INPUT_SIZE).reshape(1, INPUT_SIZE))
+        self.assertEqual(outputs.shape, (1, 1))
+        self.assertTrue(0.0 <= outputs[0][0] <= 1.0)
+
+        self.assertIsNone(load_numpy_sequential(RELATIVE_PATH, 'missing_network'))
+
+    def testLoadStoredNetwork__shared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for extension in ('.json', '.h5'):
+                shutil.copy(os.path.join(ROOT_DIR, RELATIVE_PATH, MODEL_FILE_NAME_STOCK_A + extension), directory)
+
+            model = load_numpy_sequential(directory, MODEL_FILE_NAME_STOCK_A)
+            self.assertIs(load_numpy_sequential(directory, MODEL_FILE_NAME_STOCK_A), model)
+            self.assertIsNot(load_numpy_sequential(directory, MODEL_FILE_NAME_STOCK_A, use_cache=False), model)
+
+            # Predicting works on copies, so the shared network stays unchanged
+            inputs = np.linspace(0.0, 1.0, INPUT_SIZE).reshape(1, INPUT_SIZE)
+            outputs = model.predict(inputs)
+            np.testing.assert_array_equal(model.predict(inputs), outputs)
+
+            # A changed file is read again
+            weights_path = os.path.join(directory, MODEL_FILE_NAME_STOCK_A + '.h5')
+            os.utime(weights_path, ns=(0, os.stat(weights_path).st_mtime_ns + 10 ** 9))
+            self.assertIsNot(load_numpy_sequential(directory, MODEL_FILE_NAME_STOCK_A), model)
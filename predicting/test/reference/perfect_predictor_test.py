@@ -67,3 +67,18 @@ class PerfectPredictorTest(unittest.TestCase):
         current_value = StockData([(dt.date(2012, 1, 3), 159.145142)])
         future_value = 158.495911
         self.assertEqual(predictor.doPredict(current_value), future_value)
+
+    def testDoPredictWithoutNextValue(self):
+        predictor = PerfectPredictor(CompanyEnum.COMPANY_A)
+
+        # no possible value: the last known date and an unknown date
+        self.assertRaises(AssertionError, predictor.doPredict, StockData([predictor.stock_data.get_last()]))
+        self.assertRaises(AssertionError, predictor.doPredict, StockData([(dt.date(1900, 1, 1), 1.0)]))
+
+    def testDoPredictWithGivenStockData(self):
+        stock_data = StockData([(dt.date(2017, 1, 2), 1.0), (dt.date(2017, 1, 3), 2.0), (dt.date(2017, 1, 4), 1.5)])
+        predictor = PerfectPredictor(CompanyEnum.COMPANY_A, stock_data)
+
+        self.assertIs(predictor.stock_data, stock_data)
+        self.assertEqual(predictor.doPredict(stock_data.view_to_offset(1)), 2.0)
+        self.assertEqual(predictor.doPredict(stock_data.view_to_offset(2)), 1.5)
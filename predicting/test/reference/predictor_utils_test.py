@@ -0,0 +1,127 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from model.CompanyEnum import CompanyEnum
+from model.StockData import StockData
+from predicting.predictor.reference import predictor_utils
+from predicting.predictor.reference.nn_binary_predictor import StockANnBinaryPredictor
+from predicting.predictor.reference.predictor_utils import get_data, INPUT_SIZE, precompute_outputs, \
+    get_precomputed_output, clear_precomputed_outputs
+from utils import read_stock_market_data
+from definitions import PERIOD_1, PERIOD_2
+
+
+class LastValueModel:
+    """Model returning the last value of each window and counting the predicted windows"""
+
+    def __init__(self):
+        self.predicted_windows = 0
+
+    def predict(self, inputs, batch_size=None):
+        self.predicted_windows += len(inputs)
+        return inputs[:, -1:]
+
+
+class PredictorUtilsTest(unittest.TestCase):
+    def tearDown(self):
+        clear_precomputed_outputs()
+
+    def testGetData(self):
+        prices = [10.0, 11.0, 11.0, 9.0, 12.0, 12.00000001, 8.5, 9.0]
+
+        current_prices, input_prices, wanted_results = get_data(prices, 3)
+
+        self.assertEqual(input_prices.dtype, np.float32)
+        self.assertEqual(input_prices.shape, (5, 3))
+        np.testing.assert_array_equal(current_prices, prices[3:])
+        for i, window in enumerate(input_prices):
+            last_prices = prices[i:i + 3]
+            expected = [(price - min(last_prices)) / (max(last_prices) - min(last_prices)) for price in last_prices]
+            np.testing.assert_allclose(window, expected, rtol=1e-6)
+        np.testing.assert_array_equal(wanted_results, [0.0, 1.0, 0.5, 0.0, 1.0])
+
+    def testGetData__default_input_size(self):
+        prices = np.linspace(1.0, 2.0, INPUT_SIZE + 10)
+
+        current_prices, input_prices, wanted_results = get_data(prices)
+
+        self.assertEqual(input_prices.shape, (10, INPUT_SIZE))
+        np.testing.assert_allclose(input_prices[:, 0], 0.0)
+        np.testing.assert_allclose(input_prices[:, -1], 1.0)
+        np.testing.assert_array_equal(wanted_results, np.ones(10))
+
+    def testGetData__too_few_prices(self):
+        current_prices, input_prices, wanted_results = get_data([1.0, 2.0], 3)
+
+        self.assertEqual(input_prices.shape, (0, 3))
+        self.assertEqual(len(current_prices), 0)
+        self.assertEqual(len(wanted_results), 0)
+
+    def testPrecomputeOutputs(self):
+        dates = np.arange('2017-01-01', '2017-01-09', dtype='datetime64[D]')
+        prices = np.array([10.0, 11.0, 11.0, 9.0, 12.0, 12.5, 8.5, 9.0])
+        data = StockData.from_arrays(dates, prices)
+        model = LastValueModel()
+
+        precompute_outputs(model, 'network', data, 3)
+
+        self.assertEqual(model.predicted_windows, 6)
+        for row in range(2, len(prices)):
+            last_prices = prices[row - 2:row + 1]
+            expected = (last_prices[-1] - last_prices.min()) / (last_prices.max() - last_prices.min())
+            self.assertAlmostEqual(get_precomputed_output('network', data.view_to_offset(row + 1), 3), expected,
+                                   6)
+
+        # Known windows aren't predicted again
+        precompute_outputs(model, 'network', data, 3)
+        self.assertEqual(model.predicted_windows, 6)
+
+    def testGetPrecomputedOutput__unknown(self):
+        dates = np.arange('2017-01-01', '2017-01-05', dtype='datetime64[D]')
+        data = StockData.from_arrays(dates, np.array([1.0, 2.0, 3.0, 4.0]))
+        precompute_outputs(LastValueModel(), 'network', data, 3)
+
+        self.assertEqual(get_precomputed_output('network', data, 3), 1.0)
+        self.assertIsNone(get_precomputed_output('other network', data, 3))
+        self.assertIsNone(get_precomputed_output('network', data.view_to_offset(2), 3))
+        other_data = StockData.from_arrays(dates, np.array([1.0, 2.0, 3.0, 5.0]))
+        self.assertIsNone(get_precomputed_output('network', other_data, 3))
+        self.assertIsNone(get_precomputed_output(None, data, 3))
+
+    def testGetPrecomputedOutput__same_last_date_and_price(self):
+        dates = np.arange('2017-01-01', '2017-01-05', dtype='datetime64[D]')
+        data = StockData.from_arrays(dates, np.array([1.0, 2.0, 3.0, 4.0]))
+        other_data = StockData.from_arrays(dates, np.array([1.0, 5.0, 3.0, 4.0]))
+        precompute_outputs(LastValueModel(), 'network', data, 3)
+
+        # Both windows end with the same date and price, but only `data`'s window is known
+        self.assertIsNone(get_precomputed_output('network', other_data, 3))
+        precompute_outputs(LastValueModel(), 'network', other_data, 3)
+        self.assertEqual(get_precomputed_output('network', data, 3), 1.0)
+        self.assertAlmostEqual(get_precomputed_output('network', other_data, 3), 0.5, 6)
+
+    def testPrecomputeOutputs__bounded(self):
+        dates = np.arange('2017-01-01', '2017-01-09', dtype='datetime64[D]')
+        data = StockData.from_arrays(dates, np.arange(1.0, 9.0))
+
+        with mock.patch.object(predictor_utils, 'MAX_PRECOMPUTED_OUTPUTS', 4):
+            precompute_outputs(LastValueModel(), 'network', data, 3)
+
+        # Only the 4 latest of the 6 windows are kept
+        self.assertIsNone(get_precomputed_output('network', data.view_to_offset(4), 3))
+        self.assertIsNotNone(get_precomputed_output('network', data.view_to_offset(5), 3))
+        self.assertIsNotNone(get_precomputed_output('network', data, 3))
+
+    def testPrecompute__nn_binary_predictor(self):
+        stock_data = read_stock_market_data([CompanyEnum.COMPANY_A], [PERIOD_1, PERIOD_2])[CompanyEnum.COMPANY_A]
+        predictor = StockANnBinaryPredictor()
+        row_count = stock_data.get_row_count()
+        expected = [predictor.doPredict(stock_data.view_to_offset(row)) for row in range(row_count - 50, row_count)]
+
+        StockANnBinaryPredictor().precompute(stock_data)
+
+        self.assertIsNotNone(get_precomputed_output(predictor.network_key, stock_data))
+        actual = [predictor.doPredict(stock_data.view_to_offset(row)) for row in range(row_count - 50, row_count)]
+        self.assertEqual(actual, expected)
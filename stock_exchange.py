@@ -1,56 +1,78 @@
 # Start evaluation traders:
 # Compare their performance over the testing period (2012-2017) against a buy-and-hold trader.
 from evaluating.evaluator_utils import initialize_portfolios
+from evaluating.isolated_trader import IsolatedTrader, format_latency_summaries
 from utils import read_stock_market_data
 from evaluating.portfolio_evaluator import PortfolioEvaluator
 from model.CompanyEnum import CompanyEnum
-from dependency_injection_containers import Traders
+from dependency_injection_containers import Traders, Predictors
 import datetime
 from definitions import PERIOD_1, PERIOD_2
 
+# Set this to a number of seconds to run each trader in a worker process of its own with this time budget per trade day
+# (see `IsolatedTrader`). A trader missing it doesn't trade on that day. Each trader is created in its worker process
+# then, as the Keras models of the DQL traders must not be forked. Default: None, which runs all traders in turn
+TRADER_DEADLINE = None
+
 if __name__ == "__main__":
     # Load stock market data for training and testing period
     stock_market_data = read_stock_market_data([CompanyEnum.COMPANY_A, CompanyEnum.COMPANY_B], [PERIOD_1, PERIOD_2])
 
-    # Define portfolio-name/trader mappings
+    # Compute the predictions of the NN predictors for all days once, the predictors of all traders answer from them
+    for predictor, company in [(Predictors.StockANnBinaryPredictor(), CompanyEnum.COMPANY_A),
+                               (Predictors.StockBNnBinaryPredictor(), CompanyEnum.COMPANY_B),
+                               (Predictors.StockANnPerfectBinaryPredictor(), CompanyEnum.COMPANY_A),
+                               (Predictors.StockBNnPerfectBinaryPredictor(), CompanyEnum.COMPANY_B)]:
+        predictor.precompute(stock_market_data[company])
+
+    # Define portfolio-name/trader mappings. The traders are given by their providers, which create them
     portfolio_name_trader_mappings = [
         # Benchmark trader
-        ('Buy-and-hold Trader', Traders.BuyAndHoldTrader(), 'chartreuse'),
+        ('Buy-and-hold Trader', Traders.BuyAndHoldTrader, 'chartreuse'),
 
         # Simple traders
-        ('Simple Trader (perfect prediction)', Traders.SimpleTrader_with_perfect_prediction(), 'pink'),
-        ('Simple Trader (NN binary perfect prediction)', Traders.SimpleTrader_with_nn_binary_perfect_prediction(),
+        ('Simple Trader (perfect prediction)', Traders.SimpleTrader_with_perfect_prediction, 'pink'),
+        ('Simple Trader (NN binary perfect prediction)', Traders.SimpleTrader_with_nn_binary_perfect_prediction,
          'yellow'),
-        ('Simple Trader (NN binary prediction)', Traders.SimpleTrader_with_nn_binary_prediction(), 'brown'),
+        ('Simple Trader (NN binary prediction)', Traders.SimpleTrader_with_nn_binary_prediction, 'brown'),
 
         # Deep Q-Learning traders
-        ('DQL Trader (perfect prediction)', Traders.DqlTrader_with_perfect_prediction(), 'gray'),
-        ('DQL Trader (NN binary perfect prediction)', Traders.DqlTrader_with_nn_binary_perfect_prediction(), 'magenta'),
-        ('DQL Trader (NN binary prediction)', Traders.DqlTrader_with_nn_binary_prediction(), 'burlywood'),
+        ('DQL Trader (perfect prediction)', Traders.DqlTrader_with_perfect_prediction, 'gray'),
+        ('DQL Trader (NN binary perfect prediction)', Traders.DqlTrader_with_nn_binary_perfect_prediction, 'magenta'),
+        ('DQL Trader (NN binary prediction)', Traders.DqlTrader_with_nn_binary_prediction, 'burlywood'),
 
         # Code-Camp Task 0 traders
         (
-        'Team Blue Simple Trader (perfect prediction)', Traders.TeamBlueSimpleTrader_with_perfect_prediction(), 'blue'),
-        ('Team Green Simple Trader (perfect prediction)', Traders.TeamGreenSimpleTrader_with_perfect_prediction(),
+        'Team Blue Simple Trader (perfect prediction)', Traders.TeamBlueSimpleTrader_with_perfect_prediction, 'blue'),
+        ('Team Green Simple Trader (perfect prediction)', Traders.TeamGreenSimpleTrader_with_perfect_prediction,
          'green'),
-        ('Team Black Simple Trader (perfect prediction)', Traders.TeamBlackSimpleTrader_with_perfect_prediction(),
+        ('Team Black Simple Trader (perfect prediction)', Traders.TeamBlackSimpleTrader_with_perfect_prediction,
          'black'),
-        ('Team Red Simple Trader (perfect prediction)', Traders.TeamRedSimpleTrader_with_perfect_prediction(), 'red'),
+        ('Team Red Simple Trader (perfect prediction)', Traders.TeamRedSimpleTrader_with_perfect_prediction, 'red'),
 
         # Code-Camp Task 1 traders
-        ('Simple Trader (Team Blue prediction)', Traders.SimpleTrader_with_team_blue_prediction(), 'blue'),
-        ('Simple Trader (Team Green prediction)', Traders.SimpleTrader_with_team_green_prediction(), 'green'),
-        ('Simple Trader (Team Black prediction)', Traders.SimpleTrader_with_team_black_prediction(), 'black'),
-        ('Simple Trader (Team Red prediction)', Traders.SimpleTrader_with_team_red_prediction(), 'red'),
+        ('Simple Trader (Team Blue prediction)', Traders.SimpleTrader_with_team_blue_prediction, 'blue'),
+        ('Simple Trader (Team Green prediction)', Traders.SimpleTrader_with_team_green_prediction, 'green'),
+        ('Simple Trader (Team Black prediction)', Traders.SimpleTrader_with_team_black_prediction, 'black'),
+        ('Simple Trader (Team Red prediction)', Traders.SimpleTrader_with_team_red_prediction, 'red'),
 
         # Code-Camp Task 2 traders    
-        ('Team Blue DQL Trader (perfect prediction)', Traders.TeamBlueDqlTrader_with_perfect_prediction(), 'blue'),
-        ('Team Green DQL Trader (perfect prediction)', Traders.TeamGreenDqlTrader_with_perfect_prediction(), 'green'),
-        ('Team Black DQL Trader (perfect prediction)', Traders.TeamBlackDqlTrader_with_perfect_prediction(), 'black'),
-        ('Team Red DQL Trader (perfect prediction)', Traders.TeamRedDqlTrader_with_perfect_prediction(), 'red')
+        ('Team Blue DQL Trader (perfect prediction)', Traders.TeamBlueDqlTrader_with_perfect_prediction, 'blue'),
+        ('Team Green DQL Trader (perfect prediction)', Traders.TeamGreenDqlTrader_with_perfect_prediction, 'green'),
+        ('Team Black DQL Trader (perfect prediction)', Traders.TeamBlackDqlTrader_with_perfect_prediction, 'black'),
+        ('Team Red DQL Trader (perfect prediction)', Traders.TeamRedDqlTrader_with_perfect_prediction, 'red')
 
     ]
 
+    if TRADER_DEADLINE is None:
+        portfolio_name_trader_mappings = [(name, create_trader(), color)
+                                          for name, create_trader, color in portfolio_name_trader_mappings]
+    else:
+        # The worker process of each trader calls the provider, so that the DQL traders load their Keras models there
+        # (this is how the DQL traders have to be isolated, see `IsolatedTrader`)
+        portfolio_name_trader_mappings = [(name, IsolatedTrader(create_trader, TRADER_DEADLINE, name), color)
+                                          for name, create_trader, color in portfolio_name_trader_mappings]
+
     # Define portfolios for the traders and create a portfolio/trader mapping
     portfolio_trader_mappings = initialize_portfolios(10000.0, portfolio_name_trader_mappings)
 
@@ -58,3 +80,10 @@ if __name__ == "__main__":
     evaluator = PortfolioEvaluator([], True)
     evaluator.inspect_over_time_with_mapping(stock_market_data, portfolio_trader_mappings,
                                              date_offset=datetime.date(2012, 1, 3))
+
+    if TRADER_DEADLINE is not None:
+        # Show the latency distribution and the missed days per trader
+        isolated_traders = [trader for _, trader, _ in portfolio_trader_mappings]
+        print(format_latency_summaries(isolated_traders))
+        for trader in isolated_traders:
+            trader.close()
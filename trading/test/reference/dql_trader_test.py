@@ -7,6 +7,8 @@ Module for testing of deep q-learning trader.
 """
 import unittest
 
+import numpy as np
+
 from definitions import PERIOD_3
 from utils import read_stock_market_data
 from model.SharesOfCompany import SharesOfCompany
@@ -46,6 +48,26 @@ class DqlTraderTest(unittest.TestCase):
             self.assertLessEqual(action_a, 1.0)
             self.assertLessEqual(action_b, 1.0)
 
+    def testTrainModel(self):
+        trader = DqlTrader(PerfectPredictor(CompanyEnum.COMPANY_A), PerfectPredictor(CompanyEnum.COMPANY_B), False)
+        trader.model = RecordingModel(trader.action_size)
+        for i in range(trader.batch_size):
+            state = State(1000, 0, 0, 10, 10, 10 + i % 2, 10 - i % 3).to_model_input()[0]
+            trader.memory.append(state, i % trader.action_size, float(i), state)
+
+        trader.train_model()
+
+        # One forward pass and one training step for the whole batch
+        self.assertEqual(len(trader.model.predict_calls), 1)
+        self.assertEqual(len(trader.model.fit_calls), 1)
+        inputs, targets = trader.model.fit_calls[0]
+        self.assertEqual(inputs.shape, (trader.batch_size, trader.state_size))
+        self.assertEqual(targets.shape, (trader.batch_size, trader.action_size))
+        for target in targets:
+            # Only the value of the taken action is replaced by its reward
+            index = int(np.flatnonzero(target != -1.0)[0])
+            self.assertEqual(int(target[index]) % trader.action_size, index)
+
     def testCreateActionList(self):
         trader = DqlTrader(PerfectPredictor(CompanyEnum.COMPANY_A), PerfectPredictor(CompanyEnum.COMPANY_B), False)
         self.assertIsNotNone(trader)
@@ -122,3 +144,21 @@ class DqlTraderTest(unittest.TestCase):
         self.assertEqual(order_2.action, OrderType.SELL)
         self.assertEqual(order_2.shares.company_enum, CompanyEnum.COMPANY_B)
         self.assertEqual(order_2.shares.amount, 2)
+
+
+class RecordingModel:
+    """
+    Stands in for the trader's neural network: predicts -1.0 for all actions and records all calls
+    """
+
+    def __init__(self, action_size: int):
+        self.action_size = action_size
+        self.predict_calls = []
+        self.fit_calls = []
+
+    def predict(self, inputs, batch_size=None):
+        self.predict_calls.append(inputs)
+        return np.full((len(inputs), self.action_size), -1.0)
+
+    def fit(self, inputs, targets, batch_size=None, epochs=1, verbose=1):
+        self.fit_calls.append((inputs, targets))
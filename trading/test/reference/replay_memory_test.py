@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from trading.trader.reference.replay_memory import ReplayMemory
+
+
+class ReplayMemoryTest(unittest.TestCase):
+    def testAppendAndSample(self):
+        memory = ReplayMemory(10, 2)
+        self.assertEqual(len(memory), 0)
+
+        for i in range(5):
+            memory.append(np.array([i, i]), i, float(i), np.array([i + 1, i + 1]))
+        self.assertEqual(len(memory), 5)
+
+        states, action_indices, rewards, next_states = memory.sample(5)
+        self.assertEqual(states.shape, (5, 2))
+        self.assertEqual(sorted(action_indices.tolist()), [0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(states[:, 0], action_indices)
+        np.testing.assert_array_equal(rewards, action_indices)
+        np.testing.assert_array_equal(next_states, states + 1)
+
+        self.assertRaises(ValueError, memory.sample, 6)
+
+    def testOverwriteOldest(self):
+        memory = ReplayMemory(3, 1)
+        for i in range(5):
+            memory.append(np.array([i]), i, float(i), np.array([i]))
+
+        self.assertEqual(len(memory), 3)
+        _, action_indices, _, _ = memory.sample(3)
+        self.assertEqual(sorted(action_indices.tolist()), [2, 3, 4])
+
+    def testPersistence(self):
+        with tempfile.TemporaryDirectory() as directory:
+            memory = ReplayMemory(4, 2, directory)
+            for i in range(6):
+                memory.append(np.array([i, -i]), i, float(i), np.array([i, i]))
+            memory.flush()
+            del memory
+
+            memory = ReplayMemory(4, 2, directory)
+            self.assertEqual(len(memory), 4)
+            states, action_indices, _, _ = memory.sample(4)
+            self.assertEqual(sorted(action_indices.tolist()), [2, 3, 4, 5])
+            np.testing.assert_array_equal(states[:, 1], -action_indices)
+
+            memory.append(np.array([6, -6]), 6, 6.0, np.array([6, 6]))
+            _, action_indices, _, _ = memory.sample(4)
+            self.assertEqual(sorted(action_indices.tolist()), [3, 4, 5, 6])
+            del memory
+
+            # A memory of another capacity starts from scratch
+            memory = ReplayMemory(8, 2, directory)
+            self.assertEqual(len(memory), 0)
+            self.assertTrue(os.path.isfile(os.path.join(directory, 'states.npy')))
+            del memory
+
+    def testPersistence__missing_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            memory = ReplayMemory(4, 2, directory)
+            for i in range(3):
+                memory.append(np.array([i, -i]), i, float(i), np.array([i, i]))
+            memory.flush()
+            del memory
+            os.remove(os.path.join(directory, 'states.npy'))
+
+            # The remaining files don't make up a memory, so it starts from scratch
+            memory = ReplayMemory(4, 2, directory)
+            self.assertEqual(len(memory), 0)
+            memory.append(np.array([7, -7]), 7, 7.0, np.array([7, 7]))
+            states, action_indices, _, _ = memory.sample(1)
+            self.assertEqual(action_indices.tolist(), [7])
+            np.testing.assert_array_equal(states, [[7, -7]])
+            del memory
@@ -4,7 +4,6 @@ Created on 19.11.2017
 @author: rmueller
 """
 import random
-from collections import deque
 import numpy as np
 import datetime as dt
 
@@ -15,13 +14,12 @@ from model.StockMarketData import StockMarketData
 from model.IPredictor import IPredictor
 from model.ITrader import ITrader
 from model.Order import OrderList
-from keras.models import Sequential
-from keras.layers import Dense
-from keras.optimizers import Adam
 from model.Order import CompanyEnum
 from utils import save_keras_sequential, load_keras_sequential, read_stock_market_data
+from numpy_sequential import load_numpy_sequential
 from logger import logger
 from predicting.predictor.reference.nn_binary_predictor import StockANnBinaryPredictor, StockBNnBinaryPredictor
+from trading.trader.reference.replay_memory import ReplayMemory
 
 
 class State:
@@ -106,7 +104,9 @@ class DqlTrader(ITrader):
 
     def __init__(self, stock_a_predictor: IPredictor, stock_b_predictor: IPredictor,
                  load_trained_model: bool=True,
-                 train_while_trading: bool=False, name: str='dql_trader'):
+                 train_while_trading: bool=False, name: str='dql_trader',
+                 hidden_size: int=50, learning_rate: float=0.001, epsilon_decay: float=0.999, batch_size: int=64,
+                 stock_actions: list=None):
         """
         Constructor
         Args:
@@ -114,6 +114,13 @@ class DqlTrader(ITrader):
             stock_b_predictor: Predictor for stock B
             load_trained_model: Flag to trigger loading an already trained neural network
             train_while_trading: Flag to trigger on-the-fly training while trading
+            name: The name of this trader, which is also the file name of its trained neural network
+            hidden_size: The size of the second hidden layer of the neural network, the first one is twice as big
+            learning_rate: The learning rate of the optimizer
+            epsilon_decay: The factor to decrease the probability of random actions by after each trade
+            batch_size: The number of experiences to train the neural network with at once
+            stock_actions: The actions to choose from. Default: `STOCK_ACTIONS`. A trained neural network can only be
+             loaded if it was trained with the same number of actions
         """
         # Save predictors, training mode and name
         assert stock_a_predictor is not None and stock_b_predictor is not None
@@ -121,20 +128,23 @@ class DqlTrader(ITrader):
         self.stock_b_predictor = stock_b_predictor
         self.train_while_trading = train_while_trading
         self.name = name
+        if stock_actions is not None:
+            self.STOCK_ACTIONS = [tuple(action) for action in stock_actions]
 
         # Parameters for neural network
         self.state_size = 2
         self.action_size = len(self.STOCK_ACTIONS)
-        self.hidden_size = 50
+        self.action_indices = {action: self.STOCK_ACTIONS.index(action) for action in self.STOCK_ACTIONS}
+        self.hidden_size = hidden_size
 
         # Parameters for deep Q-learning
-        self.learning_rate = 0.001
+        self.learning_rate = learning_rate
         self.epsilon = 1.0
-        self.epsilon_decay = 0.999
+        self.epsilon_decay = epsilon_decay
         self.epsilon_min = 0.01
-        self.batch_size = 64
+        self.batch_size = batch_size
         self.min_size_of_memory_before_training = 1000  # should be way bigger than batch_size, but smaller than memory
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayMemory(2000, self.state_size)
 
         # Attributes necessary to remember our last actions and fill our memory with experiences
         self.last_state = None
@@ -144,18 +154,30 @@ class DqlTrader(ITrader):
 
         # Create main model, either as trained model (from file) or as untrained model (from scratch)
         self.model = None
-        if load_trained_model:
+        if load_trained_model and not train_while_trading:
+            # The model is only used for predictions, so NumPy is sufficient to evaluate it
+            logger.debug(f"DQL Trader: Try to load trained model for inference")
+            self.model = load_numpy_sequential(self.RELATIVE_DATA_DIRECTORY, self.name)
+            logger.debug(f"DQL Trader: Loaded trained model for inference")
+        elif load_trained_model:
             logger.debug(f"DQL Trader: Try to load trained model")
             self.model = load_keras_sequential(self.RELATIVE_DATA_DIRECTORY, self.name)
+            if self.model is not None:
+                from keras.optimizers import Adam
+                self.model.compile(loss='mse', optimizer=Adam(lr=self.learning_rate))
             logger.debug(f"DQL Trader: Loaded trained model")
         if self.model is None:  # loading failed or we didn't want to use a trained model
+            from keras.models import Sequential
+            from keras.layers import Dense
+            from keras.optimizers import Adam
+
             self.model = Sequential()
             self.model.add(Dense(self.hidden_size * 2, input_dim=self.state_size, activation='relu'))
             self.model.add(Dense(self.hidden_size, activation='relu'))
             self.model.add(Dense(self.action_size, activation='linear'))
+            self.model.compile(loss='mse', optimizer=Adam(lr=self.learning_rate))
             logger.info(f"DQL Trader: Created new untrained model")
         assert self.model is not None
-        self.model.compile(loss='mse', optimizer=Adam(lr=self.learning_rate))
 
     def save_trained_model(self):
         """
@@ -210,27 +232,19 @@ class DqlTrader(ITrader):
     def train_model(self):
         """
         Train the neural network using a small random batch of the stored experiences in memory.
+        The whole batch is processed at once: one forward pass computes the action values of all sampled states and one
+        call of `fit` trains the network on all of them.
         """
         # Take a random sample (of size batch_size) from our memory
-        batch = random.sample(self.memory, self.batch_size)
+        inputs, indices, rewards, _ = self.memory.sample(self.batch_size)
 
         # Train the neural net by using the immediate reward as desired output (this ignores all future rewards)
-        for state, actionA, actionB, reward, _ in batch:
-            output_values = self.model.predict(state.to_model_input())
-            index = self.STOCK_ACTIONS.index((actionA, actionB))
-            logger.debug(
-                f"DQL Trader: actionA: {actionA}, actionB: {actionB}, index of action to target: {index}, reward: {reward}")
-            target_action_values = self.model.predict(state.to_model_input())
-            target_action_values[0][index] = reward
-            logger.debug(
-                f"DQL Trader: Before training: Input {state.to_model_input()} Output {output_values} Expected {target_action_values}")
-
-            # Finally train the model for one epoch
-            self.model.fit(state.to_model_input(), target_action_values, batch_size=self.batch_size, epochs=1,
-                           verbose=0)
-            output_values = self.model.predict(state.to_model_input())
-            logger.debug(
-                f"DQL Trader: After training: Input {state.to_model_input()} Output {output_values} Expected {target_action_values}")
+        target_action_values = self.model.predict(inputs, batch_size=self.batch_size)
+        target_action_values[np.arange(self.batch_size), indices] = rewards
+        logger.debug(f"DQL Trader: Indices of actions to target: {indices}, rewards: {rewards}")
+
+        # Finally train the model for one epoch
+        self.model.fit(inputs, target_action_values, batch_size=self.batch_size, epochs=1, verbose=0)
 
     def doTrade(self, portfolio: Portfolio, current_portfolio_value: float,
                 stock_market_data: StockMarketData) -> OrderList:
@@ -262,8 +276,9 @@ class DqlTrader(ITrader):
         # Store experience and train the neural network only if doTrade was called before at least once
         if self.train_while_trading and self.last_state is not None:
             reward = self.calculate_reward(self.last_portfolio_value, current_portfolio_value)
-            memory_tuple = (self.last_state, self.last_action_a, self.last_action_b, reward, current_state)
-            self.memory.append(memory_tuple)
+            self.memory.append(self.last_state.to_model_input()[0],
+                               self.action_indices[(self.last_action_a, self.last_action_b)], reward,
+                               current_state.to_model_input()[0])
             if len(self.memory) > self.batch_size + self.min_size_of_memory_before_training:
                 self.train_model()
 
@@ -336,6 +351,10 @@ if __name__ == "__main__":
     # trader = DqlTrader(StockANnPerfectBinaryPredictor(), StockBNnPerfectBinaryPredictor(), False, True, DQLTRADER_PERFECT_NN_BINARY_PREDICTOR)
     trader = DqlTrader(StockANnBinaryPredictor(), StockBNnBinaryPredictor(), False, True, DQLTRADER_NN_BINARY_PREDICTOR)
 
+    # Compute the predictions for all days once, the predictors of all episodes answer from them
+    trader.stock_a_predictor.precompute(test_data[CompanyEnum.COMPANY_A])
+    trader.stock_b_predictor.precompute(test_data[CompanyEnum.COMPANY_B])
+
     # Start evaluation and train correspondingly; don't display the results in a plot but display final portfolio value
     evaluator = PortfolioEvaluator([trader], False)
     final_values_training, final_values_test = [], []
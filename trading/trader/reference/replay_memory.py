@@ -0,0 +1,122 @@
+import os
+import random
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+Batch = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class ReplayMemory:
+    """
+    Fixed-capacity memory of experiences for deep Q-learning traders. An experience consists of a state, the index of
+    the chosen action, the received reward and the next state.
+
+    All experiences are kept in preallocated NumPy arrays which are used as ring buffer: once the memory is full, each
+    new experience overwrites the oldest one. Sampling a batch only draws indices and copies the corresponding rows.
+    Optionally the arrays are memory-mapped `.npy` files in a directory, so that the memory survives restarts and may
+    be larger than the available RAM
+    """
+    FILE_NAMES = ('states', 'action_indices', 'rewards', 'next_states', 'position')
+
+    def __init__(self, capacity: int, state_size: int, directory: str = None):
+        """
+        Constructor
+
+        Args:
+            capacity: The maximal number of experiences
+            state_size: The length of the state vectors
+            directory: If this is set, the memory is memory-mapped from files in this directory. Existing files are
+             reused if all of them exist and their shapes match `capacity` and `state_size`, otherwise all of them are
+             overwritten. Default: `None`, which keeps the memory in RAM
+        """
+        assert capacity > 0 and state_size > 0
+        self.capacity = capacity
+        self.state_size = state_size
+        self.directory = directory
+
+        shapes = [(capacity, state_size), (capacity,), (capacity,), (capacity, state_size), (2,)]
+        dtypes = ['float32', 'int32', 'float32', 'float32', 'int64']
+        if directory is None:
+            arrays = [np.zeros(shape, dtype=dtype) for shape, dtype in zip(shapes, dtypes)]
+        else:
+            os.makedirs(directory, exist_ok=True)
+            arrays = None
+            if all(os.path.isfile(self.__get_path(name)) for name in self.FILE_NAMES):
+                arrays = [open_memmap(self.__get_path(name), mode='r+') for name in self.FILE_NAMES]
+                if not all(array.shape == shape for array, shape in zip(arrays, shapes)) \
+                        or not all(array.dtype == dtype for array, dtype in zip(arrays, dtypes)):
+                    arrays = None
+            if arrays is None:
+                # Files are missing or belong to a memory of another size, so start from scratch. Even the existing
+                # files are overwritten, as the position wouldn't match experiences filled with zeros
+                arrays = [open_memmap(self.__get_path(name), mode='w+', dtype=dtype, shape=shape)
+                          for name, shape, dtype in zip(self.FILE_NAMES, shapes, dtypes)]
+
+        self.__states, self.__action_indices, self.__rewards, self.__next_states, self.__position = arrays
+
+    def __get_path(self, name: str) -> str:
+        """
+        Returns the path of the file with the given `name`
+
+        Args:
+            name: One of `FILE_NAMES`
+
+        Returns:
+            The path of the `.npy` file
+        """
+        return os.path.join(self.directory, name + '.npy')
+
+    def __len__(self) -> int:
+        """
+        Returns the number of stored experiences
+
+        Returns:
+            The number of stored experiences, at most `capacity`
+        """
+        return int(self.__position[1])
+
+    def append(self, state: np.ndarray, action_index: int, reward: float, next_state: np.ndarray):
+        """
+        Stores an experience. If the memory is full, the oldest experience is overwritten
+
+        Args:
+            state: The state vector
+            action_index: The index of the chosen action
+            reward: The received reward
+            next_state: The vector of the following state
+        """
+        position, size = self.__position
+        self.__states[position] = state
+        self.__action_indices[position] = action_index
+        self.__rewards[position] = reward
+        self.__next_states[position] = next_state
+        self.__position[0] = (position + 1) % self.capacity
+        self.__position[1] = min(size + 1, self.capacity)
+
+    def sample(self, batch_size: int) -> Batch:
+        """
+        Draws `batch_size` distinct experiences at random
+
+        Args:
+            batch_size: The number of experiences to draw
+
+        Returns:
+            The states, action indices, rewards and next states of the drawn experiences, each as array with
+            `batch_size` rows
+
+        Raises:
+            ValueError: If less than `batch_size` experiences are stored
+        """
+        indices = random.sample(range(len(self)), batch_size)
+        return self.__states[indices], self.__action_indices[indices], self.__rewards[indices], \
+            self.__next_states[indices]
+
+    def flush(self):
+        """
+        Writes all changes to disk if the memory is memory-mapped from files. Does nothing otherwise
+        """
+        if self.directory is not None:
+            for array in (self.__states, self.__action_indices, self.__rewards, self.__next_states, self.__position):
+                array.flush()
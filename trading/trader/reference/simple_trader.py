@@ -9,10 +9,8 @@ from model.StockMarketData import StockMarketData
 from model.ITrader import ITrader
 from model.Order import OrderList
 from model.Order import OrderType
-from model.Order import SharesOfCompany
 from model.Order import CompanyEnum
 from model.IPredictor import IPredictor
-import copy
 from logger import logger
 
 
@@ -41,7 +39,7 @@ class SimpleTrader(ITrader):
         Returns:
           A OrderList instance, may be empty never None
         """
-        local_portfolio = copy.deepcopy(portfolio)
+        local_portfolio = portfolio.copy()
 
         result = OrderList()
 
@@ -81,7 +79,7 @@ class SimpleTrader(ITrader):
 
         elif order == OrderType.SELL:
             # Check if something can be selled
-            shares_in_portfolio = self.__find_shares_of_company(company_enum, portfolio.shares)
+            shares_in_portfolio = portfolio.get_shares(company_enum)
             if shares_in_portfolio is not None:
                 # Sell everything
                 result_order_list.sell(company_enum, shares_in_portfolio.amount)
@@ -96,20 +94,3 @@ class SimpleTrader(ITrader):
             action = OrderType.SELL
 
         return action
-
-    def __find_shares_of_company(self, company_enum: CompanyEnum, shares: list) -> SharesOfCompany:
-        """
-        Finds SharesOfCompany in list by company name
-    
-        Args:
-          company_enum : company to find
-          shares: list with SharesOfCompany
-
-        Returns:
-          SharesOfCompany for given company or None 
-        """
-        for shares_of_company in shares:
-            if isinstance(shares_of_company, SharesOfCompany) and shares_of_company.company_enum == company_enum:
-                return shares_of_company
-
-        return None
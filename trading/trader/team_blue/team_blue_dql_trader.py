@@ -13,9 +13,6 @@ from model.StockMarketData import StockMarketData
 from model.IPredictor import IPredictor
 from model.ITrader import ITrader
 from model.Order import OrderList
-from keras.models import Sequential
-from keras.layers import Dense
-from keras.optimizers import Adam
 from model.Order import CompanyEnum
 from utils import save_keras_sequential, load_keras_sequential, read_stock_market_data
 from logger import logger
@@ -75,12 +72,16 @@ class TeamBlueDqlTrader(ITrader):
             logger.debug(f"DQL Trader: Try to load trained model")
             self.model = load_keras_sequential(self.RELATIVE_DATA_DIRECTORY, self.network_filename)
         if self.model is None:  # loading failed or we didn't want to use a trained model
+            from keras.models import Sequential
+            from keras.layers import Dense
+
             self.model = Sequential()
             self.model.add(Dense(self.hidden_size * 2, input_dim=self.state_size, activation='relu'))
             self.model.add(Dense(self.hidden_size, activation='relu'))
             self.model.add(Dense(self.action_size, activation='linear'))
             logger.info(f"DQL Trader: Created new untrained model")
         assert self.model is not None
+        from keras.optimizers import Adam
         self.model.compile(loss='mse', optimizer=Adam(lr=self.learning_rate))
 
     def doTrade(self, portfolio: Portfolio, current_portfolio_value: float,
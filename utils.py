@@ -6,19 +6,21 @@ Utility functions
 @author: jtymoszuk
 '''
 import os
-from keras.models import Sequential
-from keras.models import model_from_json
-from definitions import ROOT_DIR, DATASETS_DIR
+import itertools
+from definitions import ROOT_DIR, DATASETS_DIR, DATASETS_CACHE_DIR
 from model.StockData import StockData
 from model.StockMarketData import StockMarketData
 import numpy
 from model.CompanyEnum import CompanyEnum
-import datetime as dt
-from typing import List, Dict, Tuple
+from typing import List, Dict, TYPE_CHECKING
 from logger import logger
 
+if TYPE_CHECKING:
+    # Keras (and TensorFlow) are imported on first use only, as they take seconds to import
+    from keras.models import Sequential
 
-def save_keras_sequential(model: Sequential, relative_path: str, file_name_without_extension: str) -> bool:
+
+def save_keras_sequential(model: 'Sequential', relative_path: str, file_name_without_extension: str) -> bool:
     """
     Saves a Keras Sequential in File System
     
@@ -52,13 +54,25 @@ def save_keras_sequential(model: Sequential, relative_path: str, file_name_witho
         return False
 
 
-def load_keras_sequential(relative_path: str, file_name_without_extension: str) -> Sequential:
+"""
+Process-wide registry of already read Keras networks.
+Structure: {(json path, h5 path) => (tuple of file stats, model JSON, list of read-only weight arrays)}
+"""
+__keras_sequential_registry = {}
+
+
+def load_keras_sequential(relative_path: str, file_name_without_extension: str,
+                          use_cache: bool = True) -> 'Sequential':
     """
     Loads a Keras Sequential neural network from file system
     
     Args:
         relative_path : relative path in project
         file_name_without_extension : file name without extension, will be used for json with models and h5 with weights.
+        use_cache: Whether to use the process-wide registry of already read networks. The files of each network are
+         then read only once per process (until one of them changes). Every call still returns a new model, whose
+         weights are copied from the shared read-only arrays, so the model may be compiled and trained independently.
+         Default: `True`
     Returns:
         Sequential, or None if nothing found or error
     """
@@ -68,11 +82,28 @@ def load_keras_sequential(relative_path: str, file_name_without_extension: str)
 
     if os.path.exists(model_filename_with_path) and os.path.exists(weights_filename_with_path):
         try:
+            from keras.models import model_from_json
+
+            key = (model_filename_with_path, weights_filename_with_path)
+            file_stats = __get_file_stats(key)
+            registry_entry = __keras_sequential_registry.get(key) if use_cache else None
+            if registry_entry is not None and registry_entry[0] == file_stats:
+                _, loaded_model_json, weights = registry_entry
+                model = model_from_json(loaded_model_json)
+                model.set_weights(weights)
+                logger.debug(f"load_keras_sequential: Reused Sequential from {model_filename_with_path}")
+                return model
+
             json_file = open(model_filename_with_path, 'r')
             loaded_model_json = json_file.read()
             json_file.close()
             model = model_from_json(loaded_model_json)
             model.load_weights(weights_filename_with_path)
+            if use_cache:
+                weights = model.get_weights()
+                for weight in weights:
+                    weight.setflags(write=False)
+                __keras_sequential_registry[key] = (file_stats, loaded_model_json, weights)
             logger.info(f"load_keras_sequential: Loaded Sequential from {model_filename_with_path} "
                         f"and {weights_filename_with_path}!")
             return model
@@ -89,7 +120,7 @@ StockList = List[CompanyEnum]
 PeriodList = List[str]
 
 
-def read_stock_market_data(stocks: StockList, periods: PeriodList) -> StockMarketData:
+def read_stock_market_data(stocks: StockList, periods: PeriodList, use_cache: bool = True) -> StockMarketData:
     """
     Reads the "cross product" from `stocks` and `periods` from CSV files and creates a `StockMarketData` object from
     this. For each defined stock in `stocks` the corresponding value from `CompanyEnum` is used as logical name. If
@@ -98,9 +129,12 @@ def read_stock_market_data(stocks: StockList, periods: PeriodList) -> StockMarke
     Args:
         stocks: The company names for which to read the stock data. *Important:* These values need to be stated in `CompanyEnum`
         periods: The periods to read. If not empty each period is appended to the filename like this: `[stock_name]_[period].csv`
+        use_cache: Whether to use the process-wide registry of already read data and the binary cache of parsed CSV
+         files in `DATASETS_CACHE_DIR` (see `read_stock_columns`). Default: `True`
 
     Returns:
-        The created `StockMarketData` object
+        The created `StockMarketData` object. If `use_cache` is set, its `StockData` objects are views on read-only
+        arrays which are shared process-wide
 
     Examples:
         * Preface: Provided stock names are supposed to be part to `CompanyEnum`. They are stated plaintext-ish here to show the point:
@@ -129,48 +163,270 @@ def read_stock_market_data(stocks: StockList, periods: PeriodList) -> StockMarke
     # Read *all* available data
     for stock in stocks:
         filename = stock.value
-        if len(periods) is 0:
-            data[stock] = StockData(__read_stock_market_data([[stock, filename]])[stock])
+        if len(periods) == 0:
+            filenames = [filename]
         else:
-            period_data = list()
-            for period in periods:
-                period_data.append(__read_stock_market_data([[stock, ('%s_%s' % (filename, period))]]))
-            data[stock] = StockData(
-                [item for period_dict in period_data if period_dict is not None for item in period_dict[stock]])
+            filenames = ['%s_%s' % (filename, period) for period in periods]
+
+        filepaths = [os.path.join(DATASETS_DIR, name + '.csv') for name in filenames]
+        if use_cache:
+            data[stock] = __get_registered_stock_data(filepaths)
+        else:
+            data[stock] = __read_stock_data(filepaths, None)
 
     return StockMarketData(data)
 
 
+"""
+Process-wide registry of already read stock data. Structure: {tuple of CSV paths => (tuple of CSV stats, StockData)}
+"""
+__stock_data_registry = {}
+
+
+def __get_registered_stock_data(filepaths: List[str]) -> StockData:
+    """
+    Returns the stock data read from `filepaths` (see `__read_stock_data`). Each combination of CSV files is read only
+    once per process, later calls return views on the same read-only arrays. A registry entry is replaced as soon as
+    one of the CSV files changes
+
+    Args:
+        filepaths: The CSV files to read
+
+    Returns:
+        A `StockData` object sharing its data with all other objects returned for `filepaths`
+    """
+    key = tuple(filepaths)
+    file_stats = __get_file_stats(filepaths)
+
+    registry_entry = __stock_data_registry.get(key)
+    if registry_entry is None or registry_entry[0] != file_stats:
+        registry_entry = (file_stats, __read_stock_data(filepaths, DATASETS_CACHE_DIR))
+        __stock_data_registry[key] = registry_entry
+
+    stock_data = registry_entry[1]
+    return stock_data.view_to_offset(stock_data.get_row_count())
+
+
+def __get_file_stats(filepaths) -> tuple:
+    """
+    Returns size and modification time of each given file, to detect changes of files read into a registry
+
+    Args:
+        filepaths: The files
+
+    Returns:
+        One `(size, mtime in ns)` pair per file, or None for a file that doesn't exist
+    """
+    file_stats = []
+    for filepath in filepaths:
+        if os.path.exists(filepath):
+            file_stat = os.stat(filepath)
+            file_stats.append((file_stat.st_size, file_stat.st_mtime_ns))
+        else:
+            file_stats.append(None)
+    return tuple(file_stats)
+
+
+def __read_stock_data(filepaths: List[str], cache_directory: str) -> StockData:
+    """
+    Reads the given CSV files and concatenates their dates and adjusted close prices. Missing files are ignored
+
+    Args:
+        filepaths: The CSV files to read
+        cache_directory: The directory to cache the parsed columns in (see `read_stock_columns`)
+
+    Returns:
+        A `StockData` object
+    """
+    all_columns = [read_stock_columns(filepath, cache_directory) for filepath in filepaths]
+    all_columns = [columns for columns in all_columns if columns is not None]
+
+    dates = numpy.concatenate([columns[COLUMN_NAMES[DATE]] for columns in all_columns] +
+                              [numpy.empty(0, dtype='datetime64[D]')])
+    values = numpy.concatenate([columns[COLUMN_NAMES[ADJ_CLOSE]] for columns in all_columns] +
+                               [numpy.empty(0, dtype='float64')])
+    return StockData.from_arrays(dates, values)
+
+
 """
 The csv's column keys
 """
 DATE, OPEN, HIGH, LOW, CLOSE, ADJ_CLOSE, VOLUME = range(7)
+COLUMN_NAMES = ['date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
+COLUMN_DTYPES = ['datetime64[D]', 'float64', 'float64', 'float64', 'float64', 'float64', 'int64']
+
+# Count of CSV rows which are converted at once
+CSV_CHUNK_SIZE = 100000
+
+
+def read_stock_columns(filepath: str, cache_directory: str = DATASETS_CACHE_DIR) -> Dict[str, numpy.ndarray]:
+    """
+    Reads the CSV file `filepath` column-wise. If `cache_directory` is given the parsed columns are cached there as
+    `.npz` file. The cache entry is keyed by the CSV's path, size and modification time, so it is invalidated
+    automatically as soon as the CSV changes
+
+    Args:
+        filepath: The CSV file to read
+        cache_directory: The directory to cache the parsed columns in. `None` disables caching
+
+    Returns:
+        A dict with one array per column (see `COLUMN_NAMES`), or `None` if `filepath` doesn't exist
+    """
+    if not os.path.exists(filepath):
+        return None
+
+    if cache_directory is None:
+        return __parse_csv(filepath)
 
+    filepath = os.path.abspath(filepath)
+    file_stat = os.stat(filepath)
+    cache_key = (filepath, file_stat.st_size, file_stat.st_mtime_ns)
+    cache_filepath = os.path.join(cache_directory, os.path.basename(filepath) + '.npz')
 
-def __read_stock_market_data(names_and_filenames: list) -> Dict[CompanyEnum, List[Tuple[dt.datetime.date, float]]]:
+    columns = __load_cached_columns(cache_filepath, cache_key)
+    if columns is None:
+        columns = __parse_csv(filepath)
+        __save_cached_columns(cache_filepath, cache_key, columns)
+
+    return columns
+
+
+def __load_cached_columns(cache_filepath: str, cache_key: tuple) -> Dict[str, numpy.ndarray]:
     """
-    Reads CSV files from "../`DATASETS_DIR`/`name`.csv" and creates a `StockMarketData` object from this
+    Loads cached columns from `cache_filepath` if the cache entry exists and matches `cache_key`
 
     Args:
-        names_and_filenames: Tuples of filenames and logical names used as dict keys
+        cache_filepath: The `.npz` file to load
+        cache_key: The expected key of the cache entry. Structure: (CSV path, CSV size, CSV mtime in ns)
 
     Returns:
-        A dict. Structure: { CompanyEnum: List[Tuple[dt.datetime.date, float]] }
+        A dict with one array per column, or `None` if there is no valid cache entry
     """
-    data = {}
-    for company_enum, filename in names_and_filenames:
-        filepath = os.path.join(DATASETS_DIR, filename + '.csv')
+    if not os.path.exists(cache_filepath):
+        return None
 
-        if not os.path.exists(filepath):
-            continue
+    try:
+        with numpy.load(cache_filepath, allow_pickle=False) as cache_file:
+            if (str(cache_file['source']), int(cache_file['size']), int(cache_file['mtime_ns'])) != cache_key:
+                logger.debug(f"read_stock_columns: Cache {cache_filepath} is outdated")
+                return None
+            return {name: cache_file[name] for name in COLUMN_NAMES}
+    except:
+        logger.warning(f"read_stock_columns: Cache {cache_filepath} is unreadable and will be rebuilt")
+        return None
+
+
+def __save_cached_columns(cache_filepath: str, cache_key: tuple, columns: Dict[str, numpy.ndarray]):
+    """
+    Saves `columns` to `cache_filepath`. The file is written to a temporary file first and moved in place afterwards,
+    so that concurrent readers never see a partially written cache entry. Failing to write the cache is not an error
 
-        na_portfolio = numpy.loadtxt(filepath, dtype='|S15,f8,f8,f8,f8,f8,i8',
-                                     delimiter=',', comments="#", skiprows=1)
-        dates = list()
-        for day in na_portfolio:
-            date = dt.datetime.strptime(day[DATE].decode('UTF-8'), '%Y-%m-%d').date()
-            dates.append((date, day[ADJ_CLOSE]))
+    Args:
+        cache_filepath: The `.npz` file to write
+        cache_key: The key of the cache entry. Structure: (CSV path, CSV size, CSV mtime in ns)
+        columns: The columns to cache
+    """
+    source, size, mtime_ns = cache_key
+    temporary_filepath = f"{cache_filepath}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(cache_filepath), exist_ok=True)
+        with open(temporary_filepath, 'wb') as temporary_file:
+            numpy.savez(temporary_file, source=source, size=size, mtime_ns=mtime_ns, **columns)
+        os.replace(temporary_filepath, cache_filepath)
+    except OSError:
+        logger.warning(f"read_stock_columns: Writing of cache {cache_filepath} failed")
+
+
+def __parse_csv(filepath: str) -> Dict[str, numpy.ndarray]:
+    """
+    Parses the CSV file `filepath`. The file is expected to have a header line and the columns stated in
+    `COLUMN_NAMES`. Blank lines and lines starting with "#" are ignored.
 
-        data[company_enum] = dates
+    The file is parsed in chunks of `CSV_CHUNK_SIZE` rows. Each chunk is converted column-wise by NumPy (the ISO dates
+    directly to `datetime64[D]`), so there is no per-row Python conversion and the run time grows linearly with the
+    file size while the memory needed for intermediate strings stays bounded.
 
-    return data if len(data) > 0 else None
+    Args:
+        filepath: The CSV file to parse
+
+    Returns:
+        A dict with one array per column. Structure: { column name: numpy.ndarray }
+
+    Raises:
+        ValueError: If a row doesn't consist of exactly `len(COLUMN_NAMES)` valid values, or its date isn't a complete
+         date of the format YYYY-MM-DD
+    """
+    chunks = []
+
+    with open(filepath, 'r', encoding='UTF-8') as csv_file:
+        # Skip the header line
+        next(csv_file, None)
+        line_number = 1
+
+        while True:
+            lines = list(itertools.islice(csv_file, CSV_CHUNK_SIZE))
+            if len(lines) == 0:
+                break
+
+            rows, line_numbers = [], []
+            for line in lines:
+                line_number += 1
+                line = line.strip()
+                if len(line) > 0 and not line.startswith('#'):
+                    rows.append(line)
+                    line_numbers.append(line_number)
+
+            if len(rows) > 0:
+                chunks.append(__parse_csv_rows(filepath, rows, line_numbers))
+
+    return {name: numpy.concatenate([chunk[name] for chunk in chunks] + [numpy.empty(0, dtype=dtype)])
+            for name, dtype in zip(COLUMN_NAMES, COLUMN_DTYPES)}
+
+
+def __parse_csv_rows(filepath: str, rows: List[str], line_numbers: List[int]) -> Dict[str, numpy.ndarray]:
+    """
+    Converts the given CSV rows column-wise into arrays
+
+    Args:
+        filepath: The CSV file the rows stem from. Only used for error messages
+        rows: The rows to convert, without line breaks
+        line_numbers: The line number of each row. Only used for error messages
+
+    Returns:
+        A dict with one array per column. Structure: { column name: numpy.ndarray }
+
+    Raises:
+        ValueError: If a row doesn't consist of exactly `len(COLUMN_NAMES)` valid values, or its date isn't a complete
+         date of the format YYYY-MM-DD
+    """
+    separator_counts = numpy.char.count(numpy.array(rows), ',')
+    malformed_rows = numpy.flatnonzero(separator_counts != len(COLUMN_NAMES) - 1)
+    if len(malformed_rows) > 0:
+        index = malformed_rows[0]
+        raise ValueError(f"{filepath}:{line_numbers[index]}: Expected {len(COLUMN_NAMES)} columns, "
+                         f"got {separator_counts[index] + 1}")
+
+    fields = numpy.array(','.join(rows).split(',')).reshape(len(rows), len(COLUMN_NAMES))
+
+    columns = {}
+    for column, (name, dtype) in enumerate(zip(COLUMN_NAMES, COLUMN_DTYPES)):
+        try:
+            columns[name] = fields[:, column].astype(dtype)
+        except ValueError:
+            # Slow path for the error message only: find the first value that can't be converted
+            for index, value in enumerate(fields[:, column]):
+                try:
+                    numpy.array(value).astype(dtype)
+                except ValueError:
+                    raise ValueError(f"{filepath}:{line_numbers[index]}: Malformed {name} value '{value}'")
+            raise
+
+    # Converting to days accepts incomplete dates (e.g. '2017-01'), times of day and NaT, so only complete dates pass
+    dates = fields[:, COLUMN_NAMES.index('date')]
+    malformed_dates = numpy.flatnonzero((numpy.char.str_len(dates) != len('YYYY-MM-DD')) | numpy.isnat(columns['date']))
+    if len(malformed_dates) > 0:
+        index = malformed_dates[0]
+        raise ValueError(f"{filepath}:{line_numbers[index]}: Malformed date value '{dates[index]}'")
+
+    return columns